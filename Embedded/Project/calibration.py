@@ -0,0 +1,195 @@
+"""
+多点标定（设备端）：最小二乘拟合两片传感器各自的增益，可选低阶多项式。
+
+模型::
+
+    x1 = (c1 - ref1) / norm,  x2 = (c2 - ref2) / norm,  t = x1 + x2
+    w  = b + a1*x1 + a2*x2 + d2*t**2 + d3*t**3 ...
+
+c1/c2 为两片HX711的平均读数。减去参考点（第一个标定点的读数）再除以 norm，
+使法方程里的数值保持在个位数量级，ESP32 上的单精度浮点也不会失去精度。
+标定点逐个累加进法方程 (AᵀA, Aᵀw)，不保存设计矩阵；解方程用高斯消元。
+
+calib.json 仍写入旧格式的 offset/scale（总读数 = offset + scale*重量 的等效值），
+旧文件只有这两项时按两片增益相同的模型载入。
+"""
+import json
+import os
+
+# 读数归一化的除数：满量程约 1e6 计数，归一化后 |x| 不超过十几
+NORM = 100000
+# 消元后主元与该列原对角元之比（该特征不能被前面各列解释的部分）小于此值视为奇异，
+# 如所有点放在同一位置，两片读数成比例，分片增益无法区分
+SINGULAR_TOL = 1e-4
+
+
+class Calibration:
+    def __init__(self, coeffs=(0.0, 1.0, 1.0), ref=(0, 0), norm=1, residuals=()):
+        """
+        :param coeffs: [b, a1, a2, d2, d3, ...]
+        :param ref: 参考读数 (ref1, ref2)
+        :param norm: 归一化除数
+        :param residuals: 各标定点的残差（预测 - 真值，克），仅用于显示与保存
+        """
+        self.coeffs = list(coeffs)
+        self.ref = (int(ref[0]), int(ref[1]))
+        self.norm = norm
+        self.residuals = list(residuals)
+
+    def value(self, c1, c2):
+        k = self.coeffs
+        inv = 1 / self.norm
+        x1 = (c1 - self.ref[0]) * inv
+        x2 = (c2 - self.ref[1]) * inv
+        w = k[0] + k[1] * x1 + k[2] * x2
+        if len(k) > 3:
+            t = x1 + x2
+            p = t
+            for d in k[3:]:
+                p *= t
+                w += d * p
+        return w
+
+    def legacy(self):
+        """等效的旧格式 (offset, scale)：总读数 = offset + scale*重量（取两片增益的平均，忽略多项式项）"""
+        gain = (self.coeffs[1] + self.coeffs[2]) / 2  # 克 / (norm 计数)
+        if not gain:
+            return 0, 1
+        scale = self.norm / gain
+        offset = self.ref[0] + self.ref[1] - self.coeffs[0] * scale
+        return offset, scale
+
+    def to_dict(self):
+        offset, scale = self.legacy()
+        return {
+            'offset': offset,
+            'scale': scale,
+            'ref': list(self.ref),
+            'norm': self.norm,
+            'coeffs': self.coeffs,
+            'residuals': self.residuals,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if 'coeffs' in data:
+            return cls(data['coeffs'], data.get('ref', (0, 0)), data.get('norm', 1), data.get('residuals', ()))
+        # 旧格式：(c1 + c2 - offset) / scale；整数部分放进参考点，保持单精度下的精度
+        offset = data.get('offset', 0)
+        scale = data.get('scale', 1)
+        ref = int(offset)
+        return cls((-(offset - ref) / scale, 1 / scale, 1 / scale), (ref, 0), 1)
+
+
+def load(path):
+    if path in os.listdir():
+        with open(path, 'r') as f:
+            return Calibration.from_dict(json.load(f))
+    return Calibration()
+
+
+def save(path, calib):
+    with open(path, 'w') as f:
+        json.dump(calib.to_dict(), f)
+
+
+class NormalEquations:
+    """增量累加 AᵀA 与 Aᵀy，只存 n×n 与 n 个数"""
+
+    def __init__(self, n):
+        self.n = n
+        self.ata = [[0.0] * n for _ in range(n)]
+        self.aty = [0.0] * n
+        self.count = 0
+
+    def add(self, row, y):
+        n = self.n
+        ata = self.ata
+        for i in range(n):
+            ri = row[i]
+            if not ri:
+                continue
+            self.aty[i] += ri * y
+            line = ata[i]
+            for j in range(i, n):
+                line[j] += ri * row[j]
+        self.count += 1
+
+    def solve(self):
+        """返回最小二乘解，欠定或奇异时返回 None"""
+        n = self.n
+        if self.count < n:
+            return None
+        # 补全下三角，构造增广矩阵
+        m = [[self.ata[min(i, j)][max(i, j)] for j in range(n)] + [self.aty[i]] for i in range(n)]
+        # AᵀA 对称正定，按对角线顺序消元即可，不必选主元
+        for col in range(n):
+            if m[col][col] <= SINGULAR_TOL * self.ata[col][col]:
+                return None
+            p = m[col]
+            for r in range(col + 1, n):
+                f = m[r][col] / p[col]
+                if f:
+                    row = m[r]
+                    for c in range(col, n + 1):
+                        row[c] -= f * p[c]
+        x = [0.0] * n
+        for i in range(n - 1, -1, -1):
+            s = m[i][n]
+            for j in range(i + 1, n):
+                s -= m[i][j] * x[j]
+            x[i] = s / m[i][i]
+        return x
+
+
+class CalibrationFit:
+    def __init__(self, degree=1, per_cell=True, norm=NORM):
+        """
+        :param degree: 多项式阶数，1 为纯线性
+        :param per_cell: 是否分别拟合两片的增益；点数不多于未知数或摆放位置不够分散时自动退回共用增益
+        """
+        self.degree = degree
+        self.per_cell = per_cell
+        self.norm = norm
+        self.clear()
+
+    def clear(self):
+        self.points = []
+        self.ref = None
+        # 两套法方程同时累加：分片增益 [1, x1, x2, t², ...] 与共用增益 [1, t, t², ...]
+        extra = self.degree - 1
+        self._cells = NormalEquations(3 + extra)
+        self._total = NormalEquations(2 + extra)
+
+    def add_point(self, c1, c2, weight):
+        if self.ref is None:
+            self.ref = (c1, c2)
+        self.points.append((c1, c2, weight))
+        inv = 1 / self.norm
+        x1 = (c1 - self.ref[0]) * inv
+        x2 = (c2 - self.ref[1]) * inv
+        t = x1 + x2
+        powers = []
+        p = t
+        for _ in range(self.degree - 1):
+            p *= t
+            powers.append(p)
+        self._cells.add([1.0, x1, x2] + powers, weight)
+        self._total.add([1.0, t] + powers, weight)
+
+    def fit(self):
+        """
+        返回 Calibration（含各点残差），点数不足或无法求解时返回 None。
+        分片增益只在点数多于未知数时采用：恰好定解时噪声全部进入两片增益、残差恒为 0，
+        不如共用增益（按键流程的 3 个点还余 1 个自由度，残差可以用来检查标定）。
+        """
+        cells = self._cells
+        coeffs = cells.solve() if self.per_cell and cells.count > cells.n else None
+        if coeffs is None:
+            solved = self._total.solve()
+            if solved is None:
+                return None
+            coeffs = [solved[0], solved[1], solved[1]] + solved[2:]
+        calib = Calibration(coeffs, self.ref, self.norm)
+        calib.residuals = [calib.value(c1, c2) - w for c1, c2, w in self.points]
+        return calib
@@ -0,0 +1,68 @@
+"""
+零点漂移补偿（设备端）：从标定后的重量中减去按温度与开机时长估计的漂移量。
+
+模型::
+
+    drift = kt*(T - t_ref) + Σ a_i*(1 - exp(-elapsed/tau_i))
+
+T 为温度（℃），elapsed 为开机后的秒数；指数项描述上电预热与传感器蠕变，随时间趋于饱和，
+长时间运行也不会外推出无界的修正。系数由上位机 drift_fit.py 用静态记录拟合，
+保存为 drift.json（与 calib.json 放在一起）。没有温度读数时只用时间项。
+"""
+import json
+import os
+from math import exp
+
+DRIFT_FILE = 'drift.json'
+
+
+class DriftModel:
+    def __init__(self, temp_coeff=0.0, temp_ref=25.0, amplitudes=(), taus=()):
+        """
+        :param temp_coeff: 温度系数（克/℃）
+        :param temp_ref: 参考温度（℃），此温度下温度项为 0
+        :param amplitudes: 各指数项的幅度（克）
+        :param taus: 各指数项的时间常数（秒）
+        """
+        self.temp_coeff = temp_coeff
+        self.temp_ref = temp_ref
+        self.amplitudes = list(amplitudes)
+        self.taus = list(taus)
+
+    def enabled(self):
+        return bool(self.temp_coeff or self.amplitudes)
+
+    def offset(self, temp, elapsed_s):
+        """漂移量（克），temp 为 None 时忽略温度项"""
+        d = 0.0
+        if temp is not None and self.temp_coeff:
+            d += self.temp_coeff * (temp - self.temp_ref)
+        for a, tau in zip(self.amplitudes, self.taus):
+            d += a * (1 - exp(-elapsed_s / tau))
+        return d
+
+    def to_dict(self):
+        return {
+            'temp_coeff': self.temp_coeff,
+            'temp_ref': self.temp_ref,
+            'amplitudes': self.amplitudes,
+            'taus': self.taus,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('temp_coeff', 0.0), data.get('temp_ref', 25.0),
+                   data.get('amplitudes', ()), data.get('taus', ()))
+
+
+def load(path=DRIFT_FILE):
+    # 没有 drift.json 时返回不做补偿的模型
+    if path in os.listdir():
+        with open(path, 'r') as f:
+            return DriftModel.from_dict(json.load(f))
+    return DriftModel()
+
+
+def save(path, model):
+    with open(path, 'w') as f:
+        json.dump(model.to_dict(), f)
@@ -0,0 +1,186 @@
+"""
+耗材消耗速率与剩余时间的流式估计，设备端与上位机通用。
+
+输入（滤波后的）重量序列，先按 interval 秒分桶求平均，再在最近 window 个桶上
+做滑动线性回归：回归所需的各项和随样本增减 O(1) 更新，每满一个窗口以最老的点为
+原点重算一次（均摊 O(1)），既限制了数值范围，也让单精度浮点的设备端可用。
+
+偏离当前拟合线超过 gate_sigma 倍残差标准差的桶视为振动/碰撞异常，不进入回归；
+连续被拒绝超过 max_rejects 次则认为重量真的发生了跳变（换料、取放），重新开始估计。
+"""
+import math
+import sys
+from array import array
+
+_FLOAT = 'f' if sys.implementation.name == 'micropython' else 'd'
+
+# 95% 置信区间
+Z95 = 1.96
+
+
+class ConsumptionEstimator:
+    def __init__(self, window=600, interval=1.0, empty_weight=0.0,
+                 gate_sigma=4.0, min_sigma=0.5, min_points=30, max_rejects=30):
+        """
+        :param window: 回归窗口的桶数
+        :param interval: 每个桶的时长（秒），window * interval 即回归时间跨度
+        :param empty_weight: 耗材用完时的读数（g），剩余量 = 当前重量 - empty_weight
+        :param gate_sigma: 异常值门限（残差标准差的倍数）
+        :param min_sigma: 残差标准差下限（g），避免拟合过好时门限过窄
+        :param min_points: 开始输出估计与启用门限所需的最少桶数
+        :param max_rejects: 连续拒绝多少个桶后重新开始
+        """
+        self.window = window
+        self.interval = interval
+        self.empty_weight = empty_weight
+        self.gate_sigma = gate_sigma
+        self.min_sigma = min_sigma
+        self.min_points = min_points
+        self.max_rejects = max_rejects
+        self.xs = array(_FLOAT, [0.0] * window)
+        self.ys = array(_FLOAT, [0.0] * window)
+        self.rejected = 0
+        self.restarts = 0
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.pos = 0
+        self.t_ref = None  # 回归原点（时间，秒）
+        self.y_ref = 0.0   # 回归原点（重量）
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+        self._since_rebase = 0
+        self._consecutive = 0
+        self._bucket_start = None
+        self._bucket_sum = 0.0
+        self._bucket_n = 0
+
+    def update(self, t, weight):
+        """
+        输入一个样本。
+
+        :param t: 时间（秒），单调递增
+        :param weight: 重量（g）
+        """
+        if self._bucket_start is None:
+            self._bucket_start = t
+        elif t - self._bucket_start >= self.interval:
+            self._push(self._bucket_start + self.interval * 0.5, self._bucket_sum / self._bucket_n)
+            self._bucket_start = t
+            self._bucket_sum = 0.0
+            self._bucket_n = 0
+        self._bucket_sum += weight
+        self._bucket_n += 1
+
+    def _push(self, t, y):
+        if self.t_ref is None:
+            self.t_ref = t
+            self.y_ref = y
+        weight = y
+        x = t - self.t_ref
+        y -= self.y_ref
+        if self.n >= self.min_points:
+            a, b = self._fit()
+            if abs(y - (a + b * x)) > self.gate_sigma * max(self._sigma(a, b), self.min_sigma):
+                self.rejected += 1
+                self._consecutive += 1
+                if self._consecutive <= self.max_rejects:
+                    return
+                # 持续偏离：重量发生了真实跳变，从这一点重新开始
+                self.restarts += 1
+                self.reset()
+                self._push(t, weight)
+                return
+        self._consecutive = 0
+
+        pos = self.pos
+        if self.n == self.window:
+            ox = self.xs[pos]
+            oy = self.ys[pos]
+            self.sx -= ox
+            self.sy -= oy
+            self.sxx -= ox * ox
+            self.sxy -= ox * oy
+            self.syy -= oy * oy
+        else:
+            self.n += 1
+        self.xs[pos] = x
+        self.ys[pos] = y
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        self.syy += y * y
+        pos += 1
+        self.pos = 0 if pos == self.window else pos
+
+        self._since_rebase += 1
+        if self._since_rebase >= self.window:
+            self._rebase()
+
+    def _rebase(self):
+        # 以窗口内最老的点为新原点，重算各项和
+        n = self.n
+        oldest = self.pos if n == self.window else 0
+        dx = self.xs[oldest]
+        dy = self.ys[oldest]
+        self.t_ref += dx
+        self.y_ref += dy
+        sx = sy = sxx = sxy = syy = 0.0
+        xs = self.xs
+        ys = self.ys
+        for i in range(n):
+            x = xs[i] - dx
+            y = ys[i] - dy
+            xs[i] = x
+            ys[i] = y
+            sx += x
+            sy += y
+            sxx += x * x
+            sxy += x * y
+            syy += y * y
+        self.sx, self.sy, self.sxx, self.sxy, self.syy = sx, sy, sxx, sxy, syy
+        self._since_rebase = 0
+
+    def _fit(self):
+        n = self.n
+        den = n * self.sxx - self.sx * self.sx
+        if den <= 0:
+            return self.sy / n, 0.0
+        b = (n * self.sxy - self.sx * self.sy) / den
+        a = (self.sy - b * self.sx) / n
+        return a, b
+
+    def _sigma(self, a, b):
+        if self.n < 3:
+            return 0.0
+        sse = self.syy - a * self.sy - b * self.sxy
+        return math.sqrt(max(sse, 0.0) / (self.n - 2))
+
+    def ready(self):
+        return self.n >= self.min_points
+
+    def estimate(self):
+        """
+        返回 (消耗速率 g/min, 速率置信半宽 g/min, 剩余量 g, 剩余时间 min, 剩余时间下限, 剩余时间上限)。
+
+        速率为正表示重量在减少；速率区间不排除 0 时剩余时间上限为 inf，
+        数据不足时返回 None。
+        """
+        if not self.ready():
+            return None
+        a, b = self._fit()
+        n = self.n
+        sxx_c = self.sxx - self.sx * self.sx / n
+        se = self._sigma(a, b) / math.sqrt(sxx_c) if sxx_c > 0 else 0.0
+        rate = -b * 60.0
+        ci = Z95 * se * 60.0
+        last_x = self.xs[self.pos - 1]
+        remaining = a + b * last_x + self.y_ref - self.empty_weight
+        if remaining <= 0:
+            return rate, ci, remaining, 0.0, 0.0, 0.0
+        inf = float('inf')
+        tte = remaining / rate if rate > 0 else inf
+        tte_low = remaining / (rate + ci) if rate + ci > 0 else inf
+        tte_high = remaining / (rate - ci) if rate - ci > 0 else inf
+        return rate, ci, remaining, tte, tte_low, tte_high
@@ -0,0 +1,153 @@
+"""
+重量信号的流式滤波器，设备端（MicroPython）与上位机通用。
+
+每个滤波器都提供 update(x) -> y 和 reset()，状态在构造时一次性分配，
+可以用 FilterChain 任意串联。
+"""
+import math
+import sys
+from array import array
+
+# MicroPython 上浮点为单精度
+_FLOAT = 'f' if sys.implementation.name == 'micropython' else 'd'
+
+
+class MovingMedian:
+    def __init__(self, window=5):
+        """
+        滑动中值，去除振动引起的尖峰。
+
+        维护一个有序窗口：新值替换最老的值后做一次插入排序的移动，
+        窗口固定时每个样本的开销是常数。
+
+        :param window: 窗口长度
+        """
+        self.window = window
+        self.history = array(_FLOAT, [0.0] * window)  # 按到达顺序
+        self.ordered = array(_FLOAT, [0.0] * window)  # 升序
+        self.reset()
+
+    def reset(self):
+        self.pos = 0
+        self.count = 0
+
+    def update(self, x):
+        history = self.history
+        ordered = self.ordered
+        n = self.count
+        if n < self.window:
+            # 窗口未满：直接插入
+            i = n
+            n += 1
+            self.count = n
+        else:
+            # 找到最老的值，原地替换
+            old = history[self.pos]
+            i = 0
+            while ordered[i] != old:
+                i += 1
+        history[self.pos] = x
+        self.pos += 1
+        if self.pos == self.window:
+            self.pos = 0
+        # 向左或向右移动到有序位置
+        while i > 0 and ordered[i - 1] > x:
+            ordered[i] = ordered[i - 1]
+            i -= 1
+        while i < n - 1 and ordered[i + 1] < x:
+            ordered[i] = ordered[i + 1]
+            i += 1
+        ordered[i] = x
+        half = n >> 1
+        if n & 1:
+            return ordered[half]
+        return (ordered[half - 1] + ordered[half]) * 0.5
+
+
+class LowPass:
+    def __init__(self, cutoff, sample_rate, q=0.7071):
+        """
+        二阶巴特沃斯低通（RBJ biquad，直接II型转置）。
+
+        :param cutoff: 截止频率（Hz）
+        :param sample_rate: 采样率（Hz）
+        :param q: 品质因数，默认 1/sqrt(2)
+        """
+        w0 = 2 * math.pi * cutoff / sample_rate
+        cos_w0 = math.cos(w0)
+        alpha = math.sin(w0) / (2 * q)
+        a0 = 1 + alpha
+        # 系数按 a0 归一化
+        self.b0 = (1 - cos_w0) / 2 / a0
+        self.b1 = (1 - cos_w0) / a0
+        self.b2 = self.b0
+        self.a1 = -2 * cos_w0 / a0
+        self.a2 = (1 - alpha) / a0
+        self.reset()
+
+    def reset(self):
+        self.z1 = 0.0
+        self.z2 = 0.0
+        self.primed = False
+
+    def update(self, x):
+        if not self.primed:
+            # 以第一个样本作为稳态初值，避免从0开始的启动瞬态
+            self.z1 = (1 - self.b0) * x
+            self.z2 = (self.b2 - self.a2) * x
+            self.primed = True
+        y = self.b0 * x + self.z1
+        self.z1 = self.b1 * x - self.a1 * y + self.z2
+        self.z2 = self.b2 * x - self.a2 * y
+        return y
+
+
+class Kalman:
+    def __init__(self, process_noise=0.01, measurement_noise=4.0, restart_sigma=0.0):
+        """
+        标量卡尔曼滤波，状态模型为随机游走。
+
+        随机游走模型的增益很小，真实的阶跃（放上/取下料盘）要上百个样本才能追上；
+        给出 restart_sigma 时，新值偏离当前估计超过 restart_sigma 倍测量噪声标准差就直接以新值重新开始。
+        单点尖峰同样会触发，需要时在前面串一个 MovingMedian；信号本身波动大于门限时平滑效果随之变差。
+
+        :param process_noise: 过程噪声方差 q（g^2/样本），越大跟踪越快
+        :param measurement_noise: 测量噪声方差 r（g^2）
+        :param restart_sigma: 重新开始的门限（倍 sqrt(r)），0 为不启用
+        """
+        self.q = process_noise
+        self.r = measurement_noise
+        self.gate = restart_sigma * math.sqrt(measurement_noise)
+        self.reset()
+
+    def reset(self):
+        self.x = 0.0
+        self.p = 0.0
+        self.primed = False
+
+    def update(self, z):
+        if not self.primed or (self.gate and abs(z - self.x) > self.gate):
+            self.x = z
+            self.p = self.r
+            self.primed = True
+            return z
+        p = self.p + self.q
+        k = p / (p + self.r)
+        self.x += k * (z - self.x)
+        self.p = (1 - k) * p
+        return self.x
+
+
+class FilterChain:
+    def __init__(self, *filters):
+        """按顺序串联多个滤波器；不传参数时原样输出"""
+        self.filters = filters
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
+
+    def update(self, x):
+        for f in self.filters:
+            x = f.update(x)
+        return x
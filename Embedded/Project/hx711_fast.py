@@ -0,0 +1,123 @@
+"""
+HX711 移位读取的 native/viper 版本，main.py 导入成功时挂到 HX711/DualHX711 上。
+
+固件没有编译 native 代码发射器时，这里的装饰器无法编译、导入失败，
+main.py 退回类里不加装饰器的 cached 写法，viper 读取方式不可用。
+"""
+import micropython
+from micropython import const
+
+# ESP32-C3 GPIO 寄存器相对 GPIO_BASE 的偏移，以 32 位字为单位
+GPIO_OUT_W1TS = const(2)  # 0x60004008，写 1 置位
+GPIO_OUT_W1TC = const(3)  # 0x6000400C，写 1 清零
+GPIO_IN = const(15)       # 0x6000403C，输入电平
+# viper 路径每个时钟相位额外读几次 GPIO_IN 作延时，保证 PD_SCK 高/低电平都不短于 0.2us
+VIPER_HOLD_READS = const(4)
+
+
+@micropython.native
+def shift_in_cached(self):
+    # 每次 Pin.value 调用本身就要数微秒，足以满足 PD_SCK 的 0.2us 最小脉宽，不再 sleep
+    clk = self._clk
+    data = self._data
+    count = 0
+    for _ in range(24):
+        clk(1)
+        count = count << 1
+        clk(0)
+        if data():
+            count += 1
+    for _ in range(self._gain_pulses):
+        clk(1)
+        clk(0)
+    count ^= 0x800000
+    return count
+
+
+@micropython.viper
+def shift_in_viper(self) -> int:
+    gpio = ptr32(int(self._gpio))
+    clk = int(self._clk_mask)
+    data = int(self._data_mask)
+    count = 0
+    for i in range(24):
+        gpio[GPIO_OUT_W1TS] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+        gpio[GPIO_OUT_W1TC] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+        count = count << 1
+        if gpio[GPIO_IN] & data:
+            count += 1
+    for i in range(int(self._gain_pulses)):
+        gpio[GPIO_OUT_W1TS] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+        gpio[GPIO_OUT_W1TC] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+    count ^= 0x800000
+    return count
+
+
+@micropython.native
+def shift_in_pair_cached(self):
+    clk = self._clk
+    data = self._data
+    data2 = self._data2
+    count = 0
+    count2 = 0
+    for _ in range(24):
+        clk(1)
+        count = count << 1
+        count2 = count2 << 1
+        clk(0)
+        if data():
+            count += 1
+        if data2():
+            count2 += 1
+    for _ in range(self._gain_pulses):
+        clk(1)
+        clk(0)
+    count ^= 0x800000
+    count2 ^= 0x800000
+    self.pair[0] = count
+    self.pair[1] = count2
+
+
+@micropython.viper
+def shift_in_pair_viper(self):
+    # 一次读 GPIO_IN 同时取两路数据位
+    gpio = ptr32(int(self._gpio))
+    pair = ptr32(self.pair)
+    clk = int(self._clk_mask)
+    data = int(self._data_mask)
+    data2 = int(self._data2_mask)
+    count = 0
+    count2 = 0
+    for i in range(24):
+        gpio[GPIO_OUT_W1TS] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+        gpio[GPIO_OUT_W1TC] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+        count = count << 1
+        count2 = count2 << 1
+        bits = gpio[GPIO_IN]
+        if bits & data:
+            count += 1
+        if bits & data2:
+            count2 += 1
+    for i in range(int(self._gain_pulses)):
+        gpio[GPIO_OUT_W1TS] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+        gpio[GPIO_OUT_W1TC] = clk
+        for j in range(VIPER_HOLD_READS):
+            gpio[GPIO_IN]
+    count ^= 0x800000
+    count2 ^= 0x800000
+    pair[0] = count
+    pair[1] = count2
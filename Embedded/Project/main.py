@@ -1,22 +1,161 @@
 import machine
+import sys
 import time
-import json
-import os
+import micropython
+from array import array
+
+import calibration
+import drift
+import filters
+import protocol
+import profiler
+import seg_driver
+try:
+    # native/viper 读取路径：固件没有 native 代码发射器时导入失败，退回纯 Python 的 cached 写法
+    import hx711_fast
+except (ImportError, SyntaxError):
+    hx711_fast = None
+from profiler import ACQUIRE, FILTER, FORMAT, TRANSMIT, IDLE, OTHER, IRQ
+
+try:
+    import select
+except ImportError:
+    select = None
+
+try:
+    import esp32
+except ImportError:
+    esp32 = None
+
+# 中断处理函数出错时也能打印异常
+micropython.alloc_emergency_exception_buf(100)
+
+
+# 单生产者单消费者环形缓冲区
+class RingBuffer:
+    def __init__(self, size=16):
+        # 容量取2的幂，用位与代替取模；存储空间一次性分配，中断里写入不再分配内存
+        n = 1
+        while n < size:
+            n <<= 1
+        self.buf = array('i', [0] * n)
+        self.mask = n - 1
+        self.head = 0  # 写位置，只由中断修改
+        self.tail = 0  # 读位置，只由主循环修改
+        self.overruns = 0  # 缓冲区满时丢弃的样本数
+
+    def put(self, value):
+        head = self.head
+        nxt = (head + 1) & self.mask
+        if nxt == self.tail:
+            self.overruns += 1
+            return
+        self.buf[head] = value
+        self.head = nxt
+
+    def available(self):
+        return (self.head - self.tail) & self.mask
+
+    def get(self):
+        tail = self.tail
+        value = self.buf[tail]
+        self.tail = (tail + 1) & self.mask
+        return value
+
+    def clear(self):
+        self.tail = self.head
+
+
+# 移位读取方式（构造时选择）
+READ_BASIC = 'basic'    # 原始写法：每位经属性查找调用 Pin.value，并 sleep_us(1)
+READ_CACHED = 'cached'  # 预先绑定 Pin.value 方法，有 native 代码发射器时用 hx711_fast 的 native 版本；各移植通用
+READ_VIPER = 'viper'    # viper 直接读写 ESP32-C3 GPIO 寄存器，仅适用于 ESP32-C3，需要 hx711_fast
+
+# ESP32-C3 GPIO 寄存器基地址（各寄存器偏移见 hx711_fast.py）
+GPIO_BASE = 0x60004000
+
+
+# 增益/通道 -> 24位数据之后的时钟脉冲数（共 25/26/27 个），作用于下一次转换
+GAIN_PULSES = {
+    128: 1,  # 通道A，增益128
+    32: 2,   # 通道B，增益32
+    64: 3,   # 通道A，增益64
+}
+# RATE 引脚：低电平 10 SPS，高电平 80 SPS
+RATES = (10, 80)
+
 
 # HX711类定义
 class HX711:
-    def __init__(self, data_pin, clock_pin, gain=128):
+    def __init__(self, data_pin, clock_pin, gain=128, buffer_size=16, read_mode=READ_CACHED,
+                 rate_pin=None, rate=10):
         self.DATA = machine.Pin(data_pin, machine.Pin.IN, machine.Pin.PULL_UP)
         self.CLK = machine.Pin(clock_pin, machine.Pin.OUT)
         self.CLK.value(0)
+        self.set_gain(gain)
+        # RATE 引脚由 GPIO 驱动时才需要 rate_pin；硬件上直接接死的用 detect_rate() 测出
+        self.RATE = None
+        self.rate = rate
+        if rate_pin is not None:
+            self.RATE = machine.Pin(rate_pin, machine.Pin.OUT)
+            self.set_rate(rate)
+        self.read_mode = read_mode
+        # 快速路径用到的预绑定方法与寄存器位掩码
+        self._clk = self.CLK.value
+        self._data = self.DATA.value
+        self._gpio = GPIO_BASE
+        self._clk_mask = 1 << clock_pin
+        self._data_mask = 1 << data_pin
+        if read_mode == READ_CACHED:
+            self._shift_in = self._shift_in_cached
+        elif read_mode == READ_VIPER:
+            if hx711_fast is None:
+                raise ValueError("viper read_mode needs firmware built with the native emitter")
+            self._shift_in = self._shift_in_viper
+        elif read_mode != READ_BASIC:
+            raise ValueError("unknown read_mode: %s" % read_mode)
+        # 中断采集到的样本
+        self.ring = RingBuffer(buffer_size)
+        self._busy = False  # 正在移位读取，期间的中断直接忽略
+        self._irq_handler = self._on_data_ready  # 预先绑定，避免每次注册时分配
+        self.profiler = None  # 设置后累计中断里的移位耗时
+
+    def set_gain(self, gain):
+        # 新的增益从下一次读取之后的那次转换开始生效，紧接着的一个结果仍是旧设置
+        if gain not in GAIN_PULSES:
+            raise ValueError("gain must be 128, 64 or 32")
         self.GAIN = gain
+        self._gain_pulses = GAIN_PULSES[gain]
+
+    def set_rate(self, rate):
+        if rate not in RATES:
+            raise ValueError("rate must be 10 or 80")
+        if self.RATE is None:
+            raise ValueError("no RATE pin configured")
+        self.RATE.value(1 if rate == 80 else 0)
+        self.rate = rate
+
+    def measure_rate(self, conversions=4):
+        # 阻塞地连续读取，按相邻就绪的间隔算出每秒转换次数；需在 start() 之前调用
+        self.read_count()
+        t0 = time.ticks_us()
+        for _ in range(conversions):
+            self.read_count()
+        return conversions * 1000000 / time.ticks_diff(time.ticks_us(), t0)
+
+    def detect_rate(self):
+        # 10 与 80 SPS 相差很大，取几何中点作判断
+        self.rate = 80 if self.measure_rate() > 28 else 10
+        return self.rate
 
     def read_count(self):
-        count = 0
         # 等待数据引脚为低，表示数据准备好
         while self.DATA.value():
             pass
+        return self._shift_in()
 
+    def _shift_in(self):
+        count = 0
         for _ in range(24):
             self.CLK.value(1)
             count = count << 1
@@ -25,13 +164,36 @@ class HX711:
                 count += 1
             time.sleep_us(1)  # 确保信号稳定
 
-        # 第25个脉冲用于设置增益和读取最后一个脉冲
-        self.CLK.value(1)
+        # 第25~27个脉冲选择下一次转换的通道与增益
+        for _ in range(self._gain_pulses):
+            self.CLK.value(1)
+            self.CLK.value(0)
         count ^= 0x800000  # 转换为补码
-        self.CLK.value(0)
 
         return count
 
+    def _shift_in_cached(self):
+        # 每次 Pin.value 调用本身就要数微秒，足以满足 PD_SCK 的 0.2us 最小脉宽，不再 sleep
+        clk = self._clk
+        data = self._data
+        count = 0
+        for _ in range(24):
+            clk(1)
+            count = count << 1
+            clk(0)
+            if data():
+                count += 1
+        for _ in range(self._gain_pulses):
+            clk(1)
+            clk(0)
+        count ^= 0x800000
+        return count
+
+    if hx711_fast is not None:
+        # 同样的写法由 native 代码发射器编译，另有 viper 版本
+        _shift_in_cached = hx711_fast.shift_in_cached
+        _shift_in_viper = hx711_fast.shift_in_viper
+
     def read_average(self, times=10):
         total = 0
         for _ in range(times):
@@ -42,33 +204,206 @@ class HX711:
     def get_raw(self):
         return self.read_average()
 
-# 校准数据文件路径
-CALIB_FILE = 'calib.json'
+    def start(self):
+        # 开启数据就绪中断（DOUT下降沿），转换结果写入 self.ring
+        self.DATA.irq(handler=self._irq_handler, trigger=machine.Pin.IRQ_FALLING)
+
+    def stop(self):
+        self.DATA.irq(handler=None)
+
+    def _on_data_ready(self, pin):
+        # 移位过程中数据位的下降沿同样会触发中断，等轮到执行时DOUT已被第25个脉冲拉高，直接忽略
+        if self._busy or pin.value():
+            return
+        self._busy = True
+        t0 = time.ticks_us()
+        self.ring.put(self._shift_in())
+        if self.profiler:
+            self.profiler.add(IRQ, time.ticks_diff(time.ticks_us(), t0))
+        self._busy = False
+
+    def poll(self):
+        # 主循环兜底：结果没被读走时DOUT一直保持低电平，不会再产生下降沿
+        if self._busy:
+            return
+        self._busy = True
+        if not self.DATA.value():
+            self.ring.put(self._shift_in())
+        self._busy = False
+
+
+# 双通道HX711：两片共用一根时钟线，每个脉冲同时移出两路数据位
+class DualHX711(HX711):
+    def __init__(self, data_pin, data_pin2, clock_pin, gain=128, buffer_size=16, read_mode=READ_CACHED,
+                 rate_pin=None, rate=10):
+        # 两片共用时钟线，增益脉冲同时作用于两片；RATE 引脚也应并联
+        super().__init__(data_pin, clock_pin, gain, buffer_size, read_mode, rate_pin, rate)
+        self.DATA2 = machine.Pin(data_pin2, machine.Pin.IN, machine.Pin.PULL_UP)
+        self.ring2 = RingBuffer(buffer_size)
+        self.pair = array('i', [0, 0])  # 最近一次成对读数，复用避免分配
+        self._data2 = self.DATA2.value
+        self._data2_mask = 1 << data_pin2
+        if read_mode == READ_CACHED:
+            self._shift_in_pair = self._shift_in_pair_cached
+        elif read_mode == READ_VIPER:
+            self._shift_in_pair = self._shift_in_pair_viper
+
+    def read_pair(self):
+        # 等待两片都准备好，再同步读取
+        while self.DATA.value() or self.DATA2.value():
+            pass
+        self._shift_in_pair()
+        return self.pair
 
-# 加载校准数据
-def load_calibration():
-    if CALIB_FILE in os.listdir():
-        with open(CALIB_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get('offset', 0), data.get('scale', 1)
-    else:
-        return 0, 1
+    def read_count(self):
+        # 同一时刻两路之和
+        pair = self.read_pair()
+        return pair[0] + pair[1]
 
-# 保存校准数据
-def save_calibration(offset, scale):
-    data = {
-        'offset': offset,
-        'scale': scale
-    }
-    with open(CALIB_FILE, 'w') as f:
-        json.dump(data, f)
+    def _shift_in_pair(self):
+        count = 0
+        count2 = 0
+        for _ in range(24):
+            self.CLK.value(1)
+            count = count << 1
+            count2 = count2 << 1
+            self.CLK.value(0)
+            if self.DATA.value():
+                count += 1
+            if self.DATA2.value():
+                count2 += 1
+            time.sleep_us(1)  # 确保信号稳定
+
+        # 第25~27个脉冲同时设置两片的通道与增益
+        for _ in range(self._gain_pulses):
+            self.CLK.value(1)
+            self.CLK.value(0)
+        count ^= 0x800000
+        count2 ^= 0x800000
+
+        self.pair[0] = count
+        self.pair[1] = count2
+
+    def _shift_in_pair_cached(self):
+        clk = self._clk
+        data = self._data
+        data2 = self._data2
+        count = 0
+        count2 = 0
+        for _ in range(24):
+            clk(1)
+            count = count << 1
+            count2 = count2 << 1
+            clk(0)
+            if data():
+                count += 1
+            if data2():
+                count2 += 1
+        for _ in range(self._gain_pulses):
+            clk(1)
+            clk(0)
+        count ^= 0x800000
+        count2 ^= 0x800000
+        self.pair[0] = count
+        self.pair[1] = count2
+
+    if hx711_fast is not None:
+        _shift_in_pair_cached = hx711_fast.shift_in_pair_cached
+        _shift_in_pair_viper = hx711_fast.shift_in_pair_viper
+
+    def start(self):
+        # 任一片就绪都触发，两片都就绪时才读取
+        self.DATA.irq(handler=self._irq_handler, trigger=machine.Pin.IRQ_FALLING)
+        self.DATA2.irq(handler=self._irq_handler, trigger=machine.Pin.IRQ_FALLING)
+
+    def stop(self):
+        self.DATA.irq(handler=None)
+        self.DATA2.irq(handler=None)
+
+    def _on_data_ready(self, pin):
+        if self._busy or self.DATA.value() or self.DATA2.value():
+            return
+        self._busy = True
+        t0 = time.ticks_us()
+        self._shift_in_pair()
+        self.ring.put(self.pair[0])
+        self.ring2.put(self.pair[1])
+        if self.profiler:
+            self.profiler.add(IRQ, time.ticks_diff(time.ticks_us(), t0))
+        self._busy = False
+
+    def poll(self):
+        if self._busy:
+            return
+        self._busy = True
+        if not self.DATA.value() and not self.DATA2.value():
+            self._shift_in_pair()
+            self.ring.put(self.pair[0])
+            self.ring2.put(self.pair[1])
+        self._busy = False
+
+# 校准数据文件路径（格式见 calibration.py，兼容只有 offset/scale 的旧文件）
+CALIB_FILE = 'calib.json'
+# 标定模型：多项式阶数，以及是否分别拟合两片传感器的增益；
+# 分片增益要求点数多于未知数（线性时 4 个以上，按键流程只有 3 个点，可用 "cal <重量>" 在不同位置补点），否则用共用增益
+CALIB_DEGREE = 1
+CALIB_PER_CELL = True
+
+# 两片HX711是否共用时钟线（共用时把第二片的SCK也接到GPIO2）
+SHARED_CLOCK = False
+# 移位读取方式，ESP32-C3 上可改为 READ_VIPER
+READ_MODE = READ_CACHED
+# 增益/通道：128（A）噪声最低；64（A）量程加倍；32 为通道B
+HX711_GAIN = 128
+# RATE 引脚接到 GPIO 时填引脚号，上电按 HX711_RATE 驱动；None 表示硬件接死，启动时测出
+RATE_PIN = None
+HX711_RATE = 10
 
 # 初始化HX711实例
-hx1 = HX711(data_pin=1, clock_pin=2)
-hx2 = HX711(data_pin=8, clock_pin=9)
+if SHARED_CLOCK:
+    hx_dual = DualHX711(data_pin=1, data_pin2=8, clock_pin=2, gain=HX711_GAIN, read_mode=READ_MODE,
+                        rate_pin=RATE_PIN, rate=HX711_RATE)
+    sensors = (hx_dual,)
+    rings = (hx_dual.ring, hx_dual.ring2)
+else:
+    hx1 = HX711(data_pin=1, clock_pin=2, gain=HX711_GAIN, read_mode=READ_MODE,
+                rate_pin=RATE_PIN, rate=HX711_RATE)
+    hx2 = HX711(data_pin=8, clock_pin=9, gain=HX711_GAIN, read_mode=READ_MODE,
+                rate_pin=RATE_PIN, rate=HX711_RATE)
+    sensors = (hx1, hx2)
+    rings = (hx1.ring, hx2.ring)
 
 # 加载校准数据
-offset, scale = load_calibration()
+calib = calibration.load(CALIB_FILE)
+calib_fit = calibration.CalibrationFit(CALIB_DEGREE, CALIB_PER_CELL)
+
+# 漂移补偿（见 drift.py）：每隔 DRIFT_INTERVAL_MS 读一次温度、更新一次漂移量，输出时直接减去
+drift_model = drift.load(drift.DRIFT_FILE)
+DRIFT_INTERVAL_MS = 1000
+
+def read_temperature():
+    # 默认用芯片内部温度传感器（esp32.mcu_temperature，ESP32-C3/S2/S3）；
+    # 接了外部探头（如 DS18B20）时替换这个函数，返回 ℃，读不到返回 None
+    if esp32 is not None and hasattr(esp32, 'mcu_temperature'):
+        return esp32.mcu_temperature()
+    return None
+
+temperature = read_temperature()
+drift_offset = 0.0     # 当前漂移量（克）
+uptime_ms = 0          # 开机后的毫秒数，按 ticks 差累加，不受回绕影响
+last_drift_ms = time.ticks_ms()
+
+def update_drift():
+    global temperature, drift_offset, uptime_ms, last_drift_ms
+    now = time.ticks_ms()
+    elapsed = time.ticks_diff(now, last_drift_ms)
+    if elapsed < DRIFT_INTERVAL_MS:
+        return
+    last_drift_ms = now
+    uptime_ms += elapsed
+    temperature = read_temperature()
+    if drift_model.enabled():
+        drift_offset = drift_model.offset(temperature, uptime_ms / 1000)
 
 # 初始化GPIO
 gpio12 = machine.Pin(12, machine.Pin.OUT)
@@ -79,6 +414,46 @@ gpio13.value(0)  # 默认熄灭
 # 按键初始化
 button = machine.Pin(10, machine.Pin.IN, machine.Pin.PULL_UP)
 
+# 数码管（见 seg_driver.py）：显示滤波后的重量，定时器中断扫描，不占用主循环
+# seg_driver 的默认引脚与 HX711（1/2/8/9）、按键（10）、LED（12/13）冲突，按实际接线修改后再启用
+DISPLAY_ENABLED = False
+DISPLAY_SEGMENT_PINS = seg_driver.SEGMENT_PINS  # A-G、DP
+DISPLAY_DIGIT_PINS = seg_driver.DIGIT_PINS      # 从左到右
+DISPLAY_REFRESH_HZ = seg_driver.DEFAULT_REFRESH_HZ
+DISPLAY_TIMER = 0
+DISPLAY_DECIMALS = 1  # 最多显示的小数位数，整数部分放不下时自动减少
+DISPLAY_SCALE = 10 ** DISPLAY_DECIMALS
+
+display = None
+display_value = None  # 当前显示的定点值，只在它变化时重新格式化
+
+def init_display():
+    global display
+    if not DISPLAY_ENABLED:
+        return
+    display = seg_driver.SegDisplay(DISPLAY_SEGMENT_PINS, DISPLAY_DIGIT_PINS, DISPLAY_REFRESH_HZ, DISPLAY_TIMER)
+    display.show('----')
+    display.start()
+
+def update_display(weight):
+    # 先按显示精度取整，与当前显示相同则直接返回；扫描由定时器完成，这里不碰引脚
+    global display_value
+    if display is None:
+        return
+    value = int(weight * DISPLAY_SCALE + (0.5 if weight >= 0 else -0.5))
+    if value == display_value:
+        return
+    display_value = value
+    display.show(seg_driver.format_fixed(value, DISPLAY_DECIMALS, display.digits))
+
+def show_display_text(text):
+    # 标定等状态下显示提示文字；回到默认状态后的第一个重量会重新格式化
+    global display_value
+    if display is None:
+        return
+    display_value = None
+    display.show(text)
+
 # 状态机定义
 STATE_DEFAULT = 0
 STATE_CALIB_ENTER = 1
@@ -105,50 +480,184 @@ blink_interval_slow = 500  # 毫秒
 last_blink = 0
 blink_state = False
 
-# 存储校准记录
-calib_records = []
+# 每次输出平均的样本数（每个通道）
+AVERAGE_TIMES = 10
+# 输出前的滤波（文本行、二进制帧与数码管共用），默认只用 3 点中值去掉单点尖峰：阶跃（放上/换料盘）
+# 两次输出后即到位，上位机按设备时间检测重量突变也不受拖尾影响。需要更平滑时在上位机选择滤波，
+# 或在这里串上 filters.Kalman(0.01, 4.0, restart_sigma=6.0)（随机游走卡尔曼不设门限时阶跃要上百次输出才能追上）；
+# 不需要滤波时改为 filters.FilterChain()
+WEIGHT_FILTER = filters.FilterChain(filters.MovingMedian(3))
+weight_filter = WEIGHT_FILTER
+# 二进制帧输出：每对原始样本发一帧（见 protocol.py），不做平均；
+# False 时输出文本行 "Weight: <重量> <序号> <ticks_us> <平均样本数> [<温度>]"
+BINARY_OUTPUT = False
+# 主循环空闲时的休眠时间（毫秒），采样由中断完成，不受它限制
+LOOP_IDLE_MS = 1
+# 分段计时的定期输出间隔（毫秒），0 为只在串口收到 "stats" 命令时输出；
+# 超过约 17 分钟时，输出的是 profiler 自动重新开始后的那一段窗口
+STATS_INTERVAL_MS = 0
+
+# 主循环分段计时（acquire/filter/format/transmit/idle/other，另计中断移位耗时）
+prof = profiler.PhaseProfiler()
+last_stats_ms = time.ticks_ms()
+for hx in sensors:
+    hx.profiler = prof
+
+acc_sum = [0, 0]  # 当前输出窗口内各通道的累加值
+acc_n = [0, 0]    # 当前输出窗口内各通道的样本数
+avg = [0, 0]      # 最近一次输出窗口各通道的平均读数
+
+def drain_samples():
+    # 取出中断已采集的样本；两个通道都攒够 AVERAGE_TIMES 个时把平均值写入 avg 并返回 True
+    for hx in sensors:
+        hx.poll()
+    for i in range(2):
+        ring = rings[i]
+        while acc_n[i] < AVERAGE_TIMES and ring.available():
+            acc_sum[i] += ring.get()
+            acc_n[i] += 1
+    if acc_n[0] < AVERAGE_TIMES or acc_n[1] < AVERAGE_TIMES:
+        return False
+    avg[0] = acc_sum[0] // AVERAGE_TIMES
+    avg[1] = acc_sum[1] // AVERAGE_TIMES
+    acc_sum[0] = acc_sum[1] = 0
+    acc_n[0] = acc_n[1] = 0
+    return True
 
-def read_total_sum():
-    sum1 = hx1.get_raw()
-    sum2 = hx2.get_raw()
-    total = sum1 + sum2
-    return total
+frame_encoder = protocol.FrameEncoder()
+serial_out = getattr(sys.stdout, 'buffer', sys.stdout)
+text_seq = 0  # 文本行序号，与帧序号一样按 16 位回绕，上位机据此统计丢行
+
+def emit_frames():
+    # 二进制模式：两个通道各取一个样本配成一帧发送
+    ring1 = rings[0]
+    ring2 = rings[1]
+    lap = prof.lap
+    updated = False
+    for hx in sensors:
+        hx.poll()
+    lap(ACQUIRE)
+    while ring1.available() and ring2.available():
+        raw1 = ring1.get()
+        raw2 = ring2.get()
+        lap(ACQUIRE)
+        weight = weight_filter.update(get_calibrated_value(raw1, raw2))
+        lap(FILTER)
+        frame = frame_encoder.encode(time.ticks_us(), raw1, raw2, weight)
+        lap(FORMAT)
+        serial_out.write(frame)
+        lap(TRANSMIT)
+        updated = True
+    if updated:
+        # 每批只更新一次显示，80 SPS 时也不必逐帧格式化
+        update_display(weight)
+        lap(FORMAT)
+
+def reset_samples():
+    for ring in rings:
+        ring.clear()
+    acc_sum[0] = acc_sum[1] = 0
+    acc_n[0] = acc_n[1] = 0
+
+def read_averages():
+    # 阻塞读取一次各通道的平均读数（标定用），先丢弃缓冲区中按键/命令之前的旧样本
+    reset_samples()
+    while not drain_samples():
+        time.sleep_ms(LOOP_IDLE_MS)
+    return avg[0], avg[1]
+
+def add_calibration_point(target_value):
+    c1, c2 = read_averages()
+    # 输出会减去当前漂移量，标定点按同样的基准记录
+    calib_fit.add_point(c1, c2, target_value + drift_offset)
+    print(f"Calibrating: Recorded {c1} {c2} for Target={target_value} ({len(calib_fit.points)} points)")
+
+def finish_calibration():
+    # 用已记录的全部点做最小二乘拟合，成功则保存并立即生效
+    global calib
+    result = calib_fit.fit()
+    if result is None:
+        print("Error: not enough independent points. Calibration not updated.")
+    else:
+        calib = result
+        calibration.save(CALIB_FILE, calib)
+        weight_filter.reset()  # 滤波器里还是旧标定下的重量
+        print(f"Calibration completed with {len(calib_fit.points)} points:")
+        print(f"  Coeffs = {calib.coeffs}")
+        if calib.coeffs[1] == calib.coeffs[2] and CALIB_PER_CELL:
+            print("  Per-cell gains need more points than unknowns and the weight moved between points; "
+                  "shared gain used")
+        for (c1, c2, w), r in zip(calib_fit.points, calib.residuals):
+            print(f"  {w}: residual {r:.2f}")
+    calib_fit.clear()
 
 def handle_calibration_step(target_value):
-    global offset, scale, calib_records
-    total = read_total_sum()
-    calib_records.append((total, target_value))
-    print(f"Calibrating: Recorded Sum={total} for Target={target_value}")
-
-    # 当收集到三个校准点时，进行线性回归计算
-    if len(calib_records) == 3:
-        # 提取目标值和读取值
-        x = [record[1] for record in calib_records]  # 目标值
-        y = [record[0] for record in calib_records]  # 读取总和
-
-        # 计算线性回归参数
-        n = 3
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-        sum_x2 = sum(xi ** 2 for xi in x)
-
-        denominator = n * sum_x2 - sum_x ** 2
-        if denominator != 0:
-            scale = (n * sum_xy - sum_x * sum_y) / denominator
-            offset = (sum_y - scale * sum_x) / n
-            save_calibration(offset, scale)
-            print(f"Calibration completed via linear regression:")
-            print(f"  Offset = {offset}")
-            print(f"  Scale = {scale}")
-        else:
-            print("Error: Denominator for linear regression is zero. Calibration not updated.")
-
-        # 清空校准记录以便下次校准
-        calib_records = []
+    add_calibration_point(target_value)
+    # 按键流程的最后一个点记录后拟合
+    if len(calib_fit.points) >= len(calib_steps):
+        finish_calibration()
+
+# 串口命令：主循环每次迭代非阻塞地检查输入，收到整行后执行
+command_in = sys.stdin
+command_poll = None
+command_buf = ''
+
+def init_commands(stream=None):
+    global command_in, command_poll
+    if stream is not None:
+        command_in = stream
+    if select is None or not hasattr(select, 'poll'):
+        return
+    try:
+        command_poll = select.poll()
+        command_poll.register(command_in, select.POLLIN)
+    except (OSError, ValueError, TypeError, AttributeError):
+        # 输入不支持 poll（如被重定向为内存文件），关闭命令功能
+        command_poll = None
+
+def poll_commands():
+    global command_buf, command_poll
+    if command_poll is None:
+        return
+    while command_poll.poll(0):
+        ch = command_in.read(1)
+        if not ch:
+            command_poll = None  # 输入已关闭
+            return
+        if ch in '\r\n':
+            if command_buf:
+                handle_command(command_buf.strip())
+                command_buf = ''
+        elif len(command_buf) < 32:
+            command_buf += ch
+
+def handle_command(cmd):
+    if cmd == 'stats':
+        # 输出本窗口的分段计时并开始新窗口
+        prof.report()
+        prof.reset()
+    elif cmd.startswith('cal'):
+        handle_calibration_command(cmd[3:].strip())
+    else:
+        print(f"Unknown command: {cmd}")
+
+def handle_calibration_command(arg):
+    # "cal <重量>" 记录一个点（可在秤盘不同位置多放几次），"cal fit" 拟合并保存，"cal clear" 清空
+    if arg == 'fit':
+        finish_calibration()
+    elif arg == 'clear':
+        calib_fit.clear()
+        print("Calibration points cleared")
+    else:
+        try:
+            target = float(arg)
+        except ValueError:
+            print("Usage: cal <weight> | cal fit | cal clear")
+            return
+        add_calibration_point(target)
 
-def get_calibrated_value(sum_total):
-    return (sum_total - offset) / scale
+def get_calibrated_value(c1, c2):
+    return calib.value(c1, c2) - drift_offset
 
 def update_blink(current_time):
     global last_blink, blink_state
@@ -172,53 +681,97 @@ def button_pressed():
     last_press = current_time
     return True
 
-if __name__=="__main__":
-    while True:
-        # 检查按键
-        if not button.value():  # 按键按下
-            if button_pressed():
-                state += 1
-                if state > STATE_CALIB_STEP_MINUS100:
+def step():
+    # 主循环的一次迭代
+    global state, text_seq, last_stats_ms
+    lap = prof.lap
+    poll_commands()
+    update_drift()
+    # 检查按键
+    if not button.value():  # 按键按下
+        if button_pressed():
+            state += 1
+            if state > STATE_CALIB_STEP_MINUS100:
+                state = STATE_DEFAULT
+            print(f"State changed to: {state}")
+
+            if state == STATE_DEFAULT:
+                gpio12.value(1)
+                gpio13.value(0)
+                print("Returned to default state")
+                calib_fit.clear()  # 清空未完成的标定点
+                weight_filter.reset()
+            elif state == STATE_CALIB_ENTER:
+                gpio12.value(0)
+                gpio13.value(1)
+                calib_fit.clear()
+                print("Entered calibration state")
+                show_display_text('CAL')
+            elif state in calib_steps:
+                handle_calibration_step(calib_steps[state])
+                print(f"Calibration Step {calib_steps[state]} completed")
+                if state == STATE_CALIB_STEP_MINUS100:
+                    print("Calibration complete. Returning to default state.")
                     state = STATE_DEFAULT
-                print(f"State changed to: {state}")
-
-                if state == STATE_DEFAULT:
                     gpio12.value(1)
                     gpio13.value(0)
-                    print("Returned to default state")
-                    calib_records = []  # 清空校准记录
-                elif state == STATE_CALIB_ENTER:
-                    gpio12.value(0)
-                    gpio13.value(1)
-                    print("Entered calibration state")
-                elif state in calib_steps:
-                    handle_calibration_step(calib_steps[state])
-                    print(f"Calibration Step {calib_steps[state]} completed")
-                    if state == STATE_CALIB_STEP_MINUS100:
-                        print("Calibration complete. Returning to default state.")
-                        state = STATE_DEFAULT
-                        gpio12.value(1)
-                        gpio13.value(0)
-                        calib_records = []  # 清空校准记录
-
-                # 等待按键释放
-                while not button.value():
-                    time.sleep_ms(10)
-
-        # 状态处理
-        if state == STATE_DEFAULT:
-            gpio12.value(1)
-            gpio13.value(0)
-            total_sum = read_total_sum()
-            calibrated_weight = get_calibrated_value(total_sum)
-            print(f"Weight: {calibrated_weight:.2f}")
-            time.sleep(0.2)
-        elif state in (STATE_CALIB_STEP_1000, STATE_CALIB_STEP_0):
-            gpio12.value(0)
-            current_time = time.ticks_ms()
-            update_blink(current_time)
-            time.sleep(0.1)
-        elif state == STATE_CALIB_STEP_MINUS100:
-            gpio12.value(0)
-            gpio13.value(0)
-            time.sleep(0.1)
+                    weight_filter.reset()
+
+            # 等待按键释放
+            while not button.value():
+                time.sleep_ms(10)
+
+    # 状态处理
+    if state == STATE_DEFAULT:
+        gpio12.value(1)
+        gpio13.value(0)
+        lap(OTHER)
+        if BINARY_OUTPUT:
+            emit_frames()
+        else:
+            ready = drain_samples()
+            lap(ACQUIRE)
+            if ready:
+                calibrated_weight = weight_filter.update(get_calibrated_value(avg[0], avg[1]))
+                lap(FILTER)
+                if temperature is None:
+                    line = f"Weight: {calibrated_weight:.2f} {text_seq} {time.ticks_us()} {AVERAGE_TIMES}"
+                else:
+                    line = f"Weight: {calibrated_weight:.2f} {text_seq} {time.ticks_us()} {AVERAGE_TIMES} {temperature:.1f}"
+                text_seq = (text_seq + 1) & 0xFFFF
+                update_display(calibrated_weight)
+                lap(FORMAT)
+                print(line)
+                lap(TRANSMIT)
+        if STATS_INTERVAL_MS and time.ticks_diff(time.ticks_ms(), last_stats_ms) >= STATS_INTERVAL_MS:
+            last_stats_ms = time.ticks_ms()
+            prof.report()
+            prof.reset()
+        time.sleep_ms(LOOP_IDLE_MS)
+        lap(IDLE)
+    elif state in (STATE_CALIB_STEP_1000, STATE_CALIB_STEP_0):
+        gpio12.value(0)
+        current_time = time.ticks_ms()
+        update_blink(current_time)
+        lap(OTHER)
+        time.sleep(0.1)
+        lap(IDLE)
+    elif state == STATE_CALIB_STEP_MINUS100:
+        gpio12.value(0)
+        gpio13.value(0)
+        lap(OTHER)
+        time.sleep(0.1)
+        lap(IDLE)
+    else:
+        lap(OTHER)
+
+if __name__=="__main__":
+    init_commands()
+    init_display()
+    for hx in sensors:
+        # 先连续读几次：测出实际速率，同时让增益设置生效（上电后第一次转换固定为A通道128）
+        hx.detect_rate()
+        print(f"HX711: {hx.rate} SPS, gain {hx.GAIN}")
+        hx.start()
+    while True:
+        step()
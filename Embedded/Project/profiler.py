@@ -0,0 +1,83 @@
+"""
+主循环分段计时（设备端）。
+
+每一段结束时调用一次 lap(phase)，把上一次 lap 到现在的 ticks_us 计入该段；
+计数器在构造时一次性分配（array），计时路径上不分配内存。
+中断处理函数用 add(phase, us) 单独累计，这部分时间同时也包含在被它打断的那一段里。
+窗口长度按 ticks_ms 计；任一段累计到 MAX_TOTAL_US（约 17 分钟）时自动开始新窗口，
+32 位计数器不会溢出，窗口也远短于 ticks_ms 的回绕周期。
+"""
+import time
+from array import array
+
+# 分段编号
+ACQUIRE = 0    # 从环形缓冲区取样本、主循环兜底读取
+FILTER = 1     # 标定换算 + 滤波
+FORMAT = 2     # 格式化文本行 / 编码帧
+TRANSMIT = 3   # print / 串口写出
+IDLE = 4       # 主循环休眠
+OTHER = 5      # 按键、指示灯、命令处理等
+IRQ = 6        # 数据就绪中断（移位读取），与上面各段重叠
+
+PHASE_NAMES = ('acquire', 'filter', 'format', 'transmit', 'idle', 'other', 'irq')
+
+# 单段累计上限：低于 array('i') 的范围，在 MicroPython 上也仍是小整数（不分配内存）
+MAX_TOTAL_US = (1 << 30) - 1
+
+
+class PhaseProfiler:
+    def __init__(self, names=PHASE_NAMES):
+        self.names = names
+        n = len(names)
+        self.total_us = array('i', [0] * n)
+        self.count = array('i', [0] * n)
+        self.max_us = array('i', [0] * n)
+        self.rollovers = 0  # 自动开始新窗口的次数
+        self.reset()
+
+    def reset(self):
+        """清零并开始新的统计窗口"""
+        for i in range(len(self.names)):
+            self.total_us[i] = 0
+            self.count[i] = 0
+            self.max_us[i] = 0
+        self.window_start = time.ticks_ms()
+        self._last = time.ticks_us()
+
+    def lap(self, phase):
+        now = time.ticks_us()
+        self._add(phase, time.ticks_diff(now, self._last))
+        self._last = now
+
+    def add(self, phase, us):
+        self._add(phase, us)
+
+    def _add(self, phase, us):
+        total = self.total_us[phase] + us
+        if total > MAX_TOTAL_US:
+            # 再累加就要溢出：丢弃本窗口，从这一段开始新窗口
+            self.rollovers += 1
+            self.reset()
+            us = min(us, MAX_TOTAL_US)
+            total = us
+        self.total_us[phase] = total
+        self.count[phase] += 1
+        if us > self.max_us[phase]:
+            self.max_us[phase] = us
+
+    def elapsed_ms(self):
+        return time.ticks_diff(time.ticks_ms(), self.window_start)
+
+    def report(self, out=print):
+        """逐行输出本窗口各段的 总耗时/占比/次数/平均/最大，每行以 "Stats:" 开头"""
+        window_ms = time.ticks_diff(time.ticks_ms(), self.window_start)
+        window_us = window_ms * 1000 or 1
+        if self.rollovers:
+            out("Stats: window %d ms (auto-restarted %d times)" % (window_ms, self.rollovers))
+        else:
+            out("Stats: window %d ms" % window_ms)
+        for i in range(len(self.names)):
+            n = self.count[i]
+            total = self.total_us[i]
+            out("Stats: %-8s %10d us %5.1f%% n=%d avg=%d max=%d" % (
+                self.names[i], total, total * 100 / window_us, n, total // n if n else 0, self.max_us[i]))
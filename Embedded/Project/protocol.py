@@ -0,0 +1,175 @@
+"""
+串口二进制帧协议，设备端编码、上位机解码共用。
+
+帧格式（小端，共 21 字节）::
+
+    偏移  类型  含义
+    0     u8    同步字节 0xA5
+    1     u16   序号（回绕）
+    3     u32   设备时间戳 time.ticks_us()
+    7     i32   通道1原始计数
+    11    i32   通道2原始计数
+    15    f32   滤波后的重量（g）
+    19    u16   校验：前 19 字节 CRC-32 的低 16 位
+
+二进制帧可以和 print 输出的文本行混在同一串口流里：文本都是 ASCII，
+不会出现同步字节。
+
+文本模式的重量行::
+
+    Weight: <重量> [<序号> <ticks_us> <平均样本数> [<温度>]]
+
+序号/ticks_us 与帧中的含义相同，旧固件只输出重量；温度（℃）只在设备能读到时输出，
+供上位机拟合漂移补偿（drift_fit.py）。
+ticks_us 按 MicroPython 的 ticks 周期（2**30）回绕，序号按 16 位回绕。
+
+CRC-32 在两端都由 binascii 的 C 实现计算，比逐字节查表的 CRC-8 快得多。
+"""
+import struct
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+SYNC = 0xA5
+FRAME_FORMAT = '<BHIiif'
+FRAME_SIZE = 21
+_BODY_SIZE = 19
+
+NAN = float('nan')
+
+# 文本行的最大长度，超过仍找不到换行就丢弃，防止缓冲区无限增长
+MAX_LINE = 256
+
+
+if crc32 is None:
+    # 固件未编译 binascii.crc32 时的查表实现（多项式 0xEDB88320）
+    def _make_crc_table():
+        table = []
+        for i in range(256):
+            crc = i
+            for _ in range(8):
+                crc = (crc >> 1) ^ 0xEDB88320 if crc & 1 else crc >> 1
+            table.append(crc)
+        return table
+
+    _CRC_TABLE = _make_crc_table()
+
+    def crc32(data, crc=0):
+        crc ^= 0xFFFFFFFF
+        table = _CRC_TABLE
+        for b in data:
+            crc = table[(crc ^ b) & 0xFF] ^ (crc >> 8)
+        return crc ^ 0xFFFFFFFF
+
+
+def checksum(body):
+    """帧校验值：CRC-32 的低 16 位"""
+    return crc32(body) & 0xFFFF
+
+
+class FrameEncoder:
+    def __init__(self):
+        # 每帧复用同一个缓冲区
+        self.buf = bytearray(FRAME_SIZE)
+        self.body = memoryview(self.buf)[:_BODY_SIZE]
+        self.seq = 0
+
+    def encode(self, timestamp_us, raw1, raw2, weight):
+        buf = self.buf
+        struct.pack_into(FRAME_FORMAT, buf, 0, SYNC, self.seq,
+                         timestamp_us & 0xFFFFFFFF, raw1, raw2, weight)
+        struct.pack_into('<H', buf, _BODY_SIZE, checksum(self.body))
+        self.seq = (self.seq + 1) & 0xFFFF
+        return buf
+
+
+def parse_weight_line(line):
+    """解析 b"Weight: 123.45"（可带序号等字段），不是重量行时返回 None"""
+    fields = parse_weight_fields(line)
+    return None if fields is None else fields[0]
+
+
+def parse_weight_fields(line):
+    """
+    解析重量行，返回 (重量, 序号, ticks_us, 平均样本数, 温度)；
+    旧格式只有重量，其余为 (-1, 0, 0, nan)，没有温度字段时温度为 nan。不是重量行时返回 None
+    """
+    if not line.startswith(b'Weight:'):
+        return None
+    parts = line[7:].split()
+    try:
+        if len(parts) == 5:
+            return float(parts[0]), int(parts[1]), int(parts[2]), int(parts[3]), float(parts[4])
+        if len(parts) == 4:
+            return float(parts[0]), int(parts[1]), int(parts[2]), int(parts[3]), NAN
+        if len(parts) == 1:
+            return float(parts[0]), -1, 0, 0, NAN
+    except ValueError:
+        pass
+    return None
+
+
+class StreamParser:
+    def __init__(self, on_frame, on_line=None):
+        """
+        从串口字节流中拆出二进制帧和文本行。
+
+        :param on_frame: 收到有效帧时调用 on_frame(seq, timestamp_us, raw1, raw2, weight)
+        :param on_line: 收到文本行时调用 on_line(bytes)，不含行尾
+        """
+        self.on_frame = on_frame
+        self.on_line = on_line
+        self.buf = bytearray()
+        self.frames = 0
+        self.lines = 0
+        self.checksum_errors = 0
+        self.dropped_bytes = 0
+
+    def feed(self, data):
+        buf = self.buf
+        buf.extend(data)
+        pos = 0
+        end = len(buf)
+        view = memoryview(buf)
+        unpack_from = struct.unpack_from
+        try:
+            while pos < end:
+                if buf[pos] == SYNC:
+                    if end - pos < FRAME_SIZE:
+                        break
+                    body_end = pos + _BODY_SIZE
+                    if checksum(view[pos:body_end]) == buf[body_end] | (buf[body_end + 1] << 8):
+                        _, seq, ts, raw1, raw2, weight = unpack_from(FRAME_FORMAT, buf, pos)
+                        self.frames += 1
+                        self.on_frame(seq, ts, raw1, raw2, weight)
+                        pos += FRAME_SIZE
+                    else:
+                        # 不是帧头，跳过一个字节重新同步
+                        self.checksum_errors += 1
+                        self.dropped_bytes += 1
+                        pos += 1
+                    continue
+                nl = buf.find(b'\n', pos)
+                sync = buf.find(b'\xa5', pos, nl if nl >= 0 else end)
+                if sync >= 0:
+                    # 行中间出现帧头，前面是不完整的行
+                    self.dropped_bytes += sync - pos
+                    pos = sync
+                    continue
+                if nl < 0:
+                    if end - pos > MAX_LINE:
+                        self.dropped_bytes += end - pos
+                        pos = end
+                    break
+                line = bytes(buf[pos:nl]).strip()
+                pos = nl + 1
+                if line:
+                    self.lines += 1
+                    if self.on_line is not None:
+                        self.on_line(line)
+        finally:
+            view.release()
+        if pos:
+            del buf[:pos]
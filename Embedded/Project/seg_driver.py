@@ -0,0 +1,204 @@
+from machine import Pin, Timer
+import time
+
+# 段引脚，按 A-G、DP 的顺序；第 k 个引脚对应段码的第 k 位
+SEGMENT_PINS = (13, 2, 6, 8, 5, 3, 10, 7)
+# 位选引脚，从左到右
+DIGIT_PINS = (0, 1, 12, 9)
+
+# 段引脚低电平点亮，位选引脚高电平点亮
+SEGMENT_ACTIVE = 0
+DIGIT_ACTIVE = 1
+
+SEG_A = 0x01
+SEG_B = 0x02
+SEG_C = 0x04
+SEG_D = 0x08
+SEG_E = 0x10
+SEG_F = 0x20
+SEG_G = 0x40
+SEG_DP = 0x80
+
+# 字符到段码的映射，预先算好，刷新时直接查表
+CHAR_SEGMENTS = {
+    '0': SEG_A | SEG_B | SEG_C | SEG_D | SEG_E | SEG_F,
+    '1': SEG_B | SEG_C,
+    '2': SEG_A | SEG_B | SEG_G | SEG_E | SEG_D,
+    '3': SEG_A | SEG_B | SEG_G | SEG_C | SEG_D,
+    '4': SEG_F | SEG_G | SEG_B | SEG_C,
+    '5': SEG_A | SEG_F | SEG_G | SEG_C | SEG_D,
+    '6': SEG_A | SEG_F | SEG_G | SEG_C | SEG_D | SEG_E,
+    '7': SEG_A | SEG_B | SEG_C,
+    '8': SEG_A | SEG_B | SEG_C | SEG_D | SEG_E | SEG_F | SEG_G,
+    '9': SEG_A | SEG_B | SEG_C | SEG_D | SEG_F | SEG_G,
+    ' ': 0,  # 空格表示不显示任何段
+    '-': SEG_G,
+    '_': SEG_D,
+    'A': SEG_A | SEG_B | SEG_C | SEG_E | SEG_F | SEG_G,
+    'b': SEG_C | SEG_D | SEG_E | SEG_F | SEG_G,
+    'C': SEG_A | SEG_D | SEG_E | SEG_F,
+    'd': SEG_B | SEG_C | SEG_D | SEG_E | SEG_G,
+    'E': SEG_A | SEG_D | SEG_E | SEG_F | SEG_G,
+    'F': SEG_A | SEG_E | SEG_F | SEG_G,
+    'H': SEG_B | SEG_C | SEG_E | SEG_F | SEG_G,
+    'L': SEG_D | SEG_E | SEG_F,
+    'n': SEG_C | SEG_E | SEG_G,
+    'O': SEG_A | SEG_B | SEG_C | SEG_D | SEG_E | SEG_F,
+    'o': SEG_C | SEG_D | SEG_E | SEG_G,
+    'P': SEG_A | SEG_B | SEG_E | SEG_F | SEG_G,
+    'r': SEG_E | SEG_G,
+    't': SEG_D | SEG_E | SEG_F | SEG_G,
+    'U': SEG_B | SEG_C | SEG_D | SEG_E | SEG_F,
+}
+
+# 每位点亮的时间：整屏刷新率 × 位数 = 定时器频率
+DEFAULT_REFRESH_HZ = 125
+
+
+def format_fixed(value, decimals, digits=4):
+    """
+    把定点数格式化成最多 digits 位的字符串（小数点不占位），放不下时逐位减少小数位。
+    :param value: 按 10**decimals 放大后的整数，如 decimals=1 时 12.3 为 123
+    :param decimals: 小数位数
+    :param digits: 数码管位数
+    :return: 如 "12.3"；去掉全部小数仍放不下时返回 "OL"
+    """
+    negative = value < 0
+    value = -value if negative else value
+    while True:
+        text = str(value)
+        if decimals:
+            while len(text) <= decimals:
+                text = '0' + text
+            text = text[:-decimals] + '.' + text[-decimals:]
+        if negative and value:
+            text = '-' + text
+        if len(text) - (1 if decimals else 0) <= digits:
+            return text
+        if not decimals:
+            return 'OL'
+        # 四舍五入掉一位小数
+        value = (value + 5) // 10
+        decimals -= 1
+
+
+class SegDisplay:
+    """
+    定时器驱动的多位数码管动态扫描。
+
+    每次定时器中断只切换一位：熄灭当前位，改写与上一位不同的段引脚，点亮下一位。
+    显示内容在 show() 里一次性换算成各位的引脚电平存进 bytearray，中断里只查表、
+    调用预先绑定的 Pin.value，不分配内存，也不格式化字符串，主循环照常采集。
+    """
+
+    def __init__(self, segment_pins=SEGMENT_PINS, digit_pins=DIGIT_PINS, refresh_hz=DEFAULT_REFRESH_HZ,
+                 timer_id=0, segment_active=SEGMENT_ACTIVE, digit_active=DIGIT_ACTIVE):
+        """
+        :param segment_pins: A-G、DP 的 8 个引脚号
+        :param digit_pins: 位选引脚号，从左到右
+        :param refresh_hz: 整屏刷新率，定时器频率为它乘以位数
+        :param timer_id: 使用的硬件定时器
+        :param segment_active: 段点亮时的电平
+        :param digit_active: 位选点亮时的电平
+        """
+        self.digits = len(digit_pins)
+        self.refresh_hz = refresh_hz
+        self.timer_id = timer_id
+        # 段码取反的掩码：异或后直接得到各段引脚的电平
+        self._segment_invert = 0 if segment_active else 0xFF
+        self._digit_on = 1 if digit_active else 0
+        self._digit_off = 0 if digit_active else 1
+        # 缓存引脚的 value 方法，中断里免去属性查找
+        self._segment_writers = [Pin(p, Pin.OUT, value=self._segment_invert & 1).value for p in segment_pins]
+        self._digit_writers = [Pin(p, Pin.OUT, value=self._digit_off).value for p in digit_pins]
+        # 每位的段引脚电平（bit k 对应 segment_pins[k]），中断里只读不写
+        self._levels = bytearray([self._segment_invert] * self.digits)
+        self._current = self._segment_invert  # 段引脚当前的电平
+        self._index = 0  # 当前点亮的位
+        self._text = None
+        self._dots = None
+        self._timer = None
+        self._irq_handler = self._refresh  # 预先绑定，避免每次注册时分配
+
+    def show(self, text, decimal_points=None):
+        """
+        设置要显示的内容，右对齐，超出位数时保留末尾几位。
+        :param text: 字符串或数字；'.' 点亮前一位的小数点，如 "12.34"
+        :param decimal_points: 一个列表，指示每一位是否额外点亮小数点（可选）
+        """
+        text = str(text)
+        if text == self._text and decimal_points == self._dots:
+            return  # 内容没变，不重新查表
+        self._text = text
+        self._dots = decimal_points
+        masks = []
+        for ch in text:
+            if ch == '.' and masks and not masks[-1] & SEG_DP:
+                masks[-1] |= SEG_DP
+            else:
+                masks.append(CHAR_SEGMENTS.get(ch, 0) | (SEG_DP if ch == '.' else 0))
+        n = self.digits
+        masks = [0] * (n - len(masks)) + masks[-n:]
+        if decimal_points:
+            for i in range(min(n, len(decimal_points))):
+                if decimal_points[i]:
+                    masks[i] |= SEG_DP
+        levels = self._levels
+        invert = self._segment_invert
+        for i in range(n):
+            levels[i] = masks[i] ^ invert
+
+    def display_number(self, number, decimal_points=None):
+        """兼容旧接口：同 show()"""
+        self.show(number, decimal_points)
+
+    def clear(self):
+        self.show('')
+
+    def start(self):
+        """启动定时器扫描"""
+        if self._timer is None:
+            self._timer = Timer(self.timer_id)
+        self._timer.init(mode=Timer.PERIODIC, freq=self.refresh_hz * self.digits, callback=self._irq_handler)
+
+    def stop(self):
+        """停止扫描并熄灭全部位"""
+        if self._timer is not None:
+            self._timer.deinit()
+        off = self._digit_off
+        for write in self._digit_writers:
+            write(off)
+
+    def _refresh(self, _timer):
+        # 先熄灭当前位，换段时才不会在这一位上留下残影
+        index = self._index
+        self._digit_writers[index](self._digit_off)
+        index += 1
+        if index == self.digits:
+            index = 0
+        levels = self._levels[index]
+        changed = levels ^ self._current
+        if changed:
+            self._current = levels
+            writers = self._segment_writers
+            k = 0
+            while changed:
+                if changed & 1:
+                    writers[k]((levels >> k) & 1)
+                changed >>= 1
+                k += 1
+        self._digit_writers[index](self._digit_on)
+        self._index = index
+
+
+if __name__ == '__main__':
+    # 示例：显示 "12.34"，扫描由定时器完成，主循环可以做别的事
+    display = SegDisplay()
+    display.show("12.34")
+    display.start()
+    print("Displaying 12.34, counting in 2 s")
+    time.sleep_ms(2000)
+    for count in range(10000):
+        display.show(count)
+        time.sleep_ms(100)
+    display.stop()
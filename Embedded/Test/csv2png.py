@@ -1,51 +1,153 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+"""
+把记录文件（CSV / .wlog）批量绘制成 PNG。
+
+只重新绘制有变化的文件：PNG 比源文件新，或源文件内容哈希与上次绘制时相同，
+都会跳过；其余文件在进程池中并行绘制（Agg 后端，无界面）。
+内容哈希存在输出目录的 .csv2png_cache.json 里（已在 .gitignore 中），--no-cache 不读写该文件。
+
+    python csv2png.py                         # 处理脚本所在目录
+    python csv2png.py logs/ -o pngs/ -p "动态测试_*.csv" -j 8
+    python csv2png.py --force                 # 全部重新绘制
+    python csv2png.py --no-cache              # 只按修改时间判断，不写缓存文件
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
 # 获取当前脚本所在目录
 current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+# 记录各源文件上次绘制时的内容哈希
+CACHE_FILE = '.csv2png_cache.json'
+
+
+def source_files(path):
+    """源文件本身；.wlog 目录则是其中的所有文件"""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, f) for f in os.listdir(path))
+    return [path]
+
+
+def source_mtime(path):
+    return max(os.path.getmtime(f) for f in source_files(path))
+
+
+def source_hash(path):
+    h = hashlib.sha1()
+    for file_path in source_files(path):
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+def render(csv_path, output_image):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    if csv_path.endswith('.wlog'):
+        import binlog
+        # 二进制日志直接得到 epoch 秒和重量数组，无需解析
+        log = binlog.load(csv_path)
+        data = pd.DataFrame({'Weight(g)': log['weight']})
+        data['Time (minutes)'] = (log['time'] - log['time'][0]) / 60.0
+    else:
+        # 读取CSV数据
+        data = pd.read_csv(csv_path)
+
+        # 确保数据列名没有多余的空格
+        data.columns = data.columns.str.strip()
+
+        # 将Timestamp列转换为datetime格式
+        data['Timestamp'] = pd.to_datetime(data['Timestamp'])
+
+        # 计算相对时间（以分钟为单位）
+        start_time = data['Timestamp'].iloc[0]
+        data['Time (minutes)'] = (data['Timestamp'] - start_time).dt.total_seconds() / 60.0
 
-# 获取当前目录下所有CSV文件
-csv_files = [f for f in os.listdir(current_dir) if f.endswith('.csv')]
-
-# 遍历每个CSV文件，进行数据处理并生成图片
-for csv_file in csv_files:
-    # 构建完整的CSV文件路径
-    csv_path = os.path.join(current_dir, csv_file)
-    print(f"正在处理文件: {csv_path}")
-    
-    # 读取CSV数据
-    data = pd.read_csv(csv_path)
-    
-    # 确保数据列名没有多余的空格
-    data.columns = data.columns.str.strip()
-    
-    # 将Timestamp列转换为datetime格式
-    data['Timestamp'] = pd.to_datetime(data['Timestamp'])
-    
-    # 计算相对时间（以分钟为单位）
-    start_time = data['Timestamp'].iloc[0]
-    data['Time (minutes)'] = (data['Timestamp'] - start_time).dt.total_seconds() / 60.0
-    
     # 绘制质量随时间变化的曲线
     plt.figure(figsize=(10, 6))
     plt.plot(data['Time (minutes)'], data['Weight(g)'], marker='o', color='b', label='Weight (g)')
-    
+
     # 设置标题和标签
     plt.title('Weight vs Time')
     plt.xlabel('Time (minutes)')
     plt.ylabel('Weight (g)')
     plt.grid(True)
     plt.legend()
-    
-    # 获取CSV文件的名称（去掉扩展名）作为图片文件名
-    image_filename = os.path.splitext(csv_file)[0] + '.png'
-    output_image = os.path.join(current_dir, image_filename)
-    
+
     # 保存图像为PNG文件
     plt.savefig(output_image)
-    
-    # 显示图像
-    # plt.show()
-    
-    print(f"图像已保存为 {output_image}")
+    plt.close()
+    return output_image
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把记录文件批量绘制成 PNG")
+    parser.add_argument('input', nargs='?', default=current_dir, help='输入目录（默认脚本所在目录）')
+    parser.add_argument('-o', '--output', help='输出目录（默认与输入相同）')
+    parser.add_argument('-p', '--pattern', action='append',
+                        help='文件名模式，可多次指定（默认 *.csv 和 *.wlog）')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='并行进程数')
+    parser.add_argument('--force', action='store_true', help='忽略缓存，全部重新绘制')
+    parser.add_argument('--no-cache', action='store_true', help=f'不读写 {CACHE_FILE}，只按修改时间判断')
+    args = parser.parse_args()
+
+    input_dir = args.input
+    output_dir = args.output or input_dir
+    patterns = args.pattern or ['*.csv', '*.wlog']
+    os.makedirs(output_dir, exist_ok=True)
+
+    cache_path = None if args.no_cache else os.path.join(output_dir, CACHE_FILE)
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    # 找出需要重新绘制的文件
+    jobs = {}
+    skipped = 0
+    for name in sorted(os.listdir(input_dir)):
+        if not name.endswith(('.csv', '.wlog')) or not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        csv_path = os.path.join(input_dir, name)
+        output_image = os.path.join(output_dir, os.path.splitext(name)[0] + '.png')
+        if not args.force and os.path.exists(output_image):
+            if os.path.getmtime(output_image) >= source_mtime(csv_path):
+                skipped += 1
+                continue
+            if cache_path and cache.get(name) == source_hash(csv_path):
+                # 内容没变（例如只是被复制或 touch 过），更新PNG时间避免下次再算哈希
+                os.utime(output_image)
+                skipped += 1
+                continue
+        jobs[name] = (csv_path, output_image)
+
+    print(f"需要绘制 {len(jobs)} 个文件，跳过 {skipped} 个未变化的文件")
+    if jobs:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {name: pool.submit(render, *paths) for name, paths in jobs.items()}
+            for name, future in futures.items():
+                try:
+                    print(f"图像已保存为 {future.result()}")
+                    if cache_path:
+                        cache[name] = source_hash(jobs[name][0])
+                except Exception as e:
+                    print(f"处理 {name} 失败: {e}")
+        if cache_path:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
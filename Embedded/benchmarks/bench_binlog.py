@@ -0,0 +1,117 @@
+"""
+CSV 与 .wlog 的文件大小和加载时间对比。
+
+Test 目录下的记录只有 1 Hz 左右，另外合成一段 80 SPS、3 小时的全字段记录，
+代表长时间原始数据采集的情况。另外模拟写到一半退出（部分列多写了几行、最后一行只写了几个字节），
+核对重新打开追加后各列仍按行对齐。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import common
+import binlog
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def load_csv_pandas(path):
+    data = pd.read_csv(path)
+    data.columns = data.columns.str.strip()
+    data['Timestamp'] = pd.to_datetime(data['Timestamp'])
+    return data
+
+
+def timed(func, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat
+
+
+def synthetic(rows):
+    batch = binlog.new_batch(rows)
+    t = np.arange(rows) / 80.0
+    batch['time'] = time.time() + t
+    batch['seq'] = np.arange(rows) & 0xFFFF
+    batch['device_us'] = (t * 1e6).astype(np.uint64) & 0xFFFFFFFF
+    batch['raw1'] = 8388608 + 100000 - t.astype(int)
+    batch['raw2'] = 8388608 + 90000 - t.astype(int)
+    batch['weight'] = 900 - t / 60 + np.random.default_rng(0).normal(0, 5, rows)
+    batch['filtered'] = 900 - t / 60
+    return batch
+
+
+def write_csv(path, batch):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Timestamp,Weight(g)\r\n')
+        f.writelines('%s,%.2f\r\n' % (time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t)), w)
+                     for t, w in zip(batch['time'].tolist(), batch['weight'].tolist()))
+
+
+def check_reopen(tmp):
+    """写一块后模拟中断的块，再重新打开追加，返回读回的数据是否与两次完整写入的一致"""
+    path = os.path.join(tmp, 'reopen.wlog')
+    first = synthetic(1000)
+    second = synthetic(500)
+    writer = binlog.BinLogWriter(path)
+    writer.append(first)
+    writer.close()
+    # 中断的块：前几列写完了 100 行，下一列只写了半行
+    partial = synthetic(100)
+    for k, name in enumerate(binlog.SAMPLE_DTYPE.names[:3]):
+        with open(os.path.join(path, name + '.bin'), 'ab') as f:
+            data = np.ascontiguousarray(partial[name]).tobytes()
+            f.write(data if k < 2 else data[:3])
+    writer = binlog.BinLogWriter(path)
+    writer.append(second)
+    writer.close()
+    data = binlog.load(path)
+    want = np.concatenate((first, second))
+    sizes = {os.path.getsize(os.path.join(path, name + '.bin')) // binlog.SAMPLE_DTYPE[name].itemsize
+             for name in binlog.SAMPLE_DTYPE.names}
+    return sizes == {len(want)} and all(np.array_equal(data[name], want[name], equal_nan=True)
+                                        for name in binlog.SAMPLE_DTYPE.names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5, help='加载重复次数')
+    parser.add_argument('--hours', type=float, default=3.0, help='合成记录时长（80 SPS）')
+    args = common.parse_args(parser)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for csv_path in common.traces():
+            wlog = os.path.join(tmp, os.path.basename(csv_path)[:-4] + '.wlog')
+            n = binlog.convert_csv(csv_path, wlog)
+            rows.append((os.path.basename(csv_path), n, os.path.getsize(csv_path), dir_size(wlog),
+                         '%.2f' % (timed(lambda: load_csv_pandas(csv_path), args.repeat) * 1e3),
+                         '%.3f' % (timed(lambda: binlog.load(wlog), args.repeat) * 1e3)))
+
+        n = int(args.hours * 3600 * 80)
+        batch = synthetic(n)
+        csv_path = os.path.join(tmp, 'synthetic.csv')
+        wlog = os.path.join(tmp, 'synthetic.wlog')
+        write_csv(csv_path, batch)
+        writer = binlog.BinLogWriter(wlog)
+        writer.append(batch)
+        writer.close()
+        rows.append(('synthetic %.1fh (all cols)' % args.hours, n, os.path.getsize(csv_path), dir_size(wlog),
+                     '%.2f' % (timed(lambda: load_csv_pandas(csv_path), 1) * 1e3),
+                     '%.3f' % (timed(lambda: binlog.load(wlog), args.repeat) * 1e3)))
+        reopen_ok = check_reopen(tmp)
+    common.print_table('文件大小与加载时间',
+                       ('file', 'rows', 'csv bytes', 'wlog bytes', 'csv load ms', 'wlog load ms'), rows)
+    print(f"中断后重新打开追加，各列按行对齐: {common.verdict(reopen_ok, 'reopen after partial chunk')}")
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
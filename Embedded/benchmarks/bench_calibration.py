@@ -0,0 +1,148 @@
+"""
+多点标定（Project/calibration.py 设备端、calib_fit.py 上位机）的验证与对比。
+
+合成两片增益略有差异、带轻微非线性的传感器，重量按比例 p 分到两片上（p 随摆放位置变化）：
+- 旧方法：3 点（923/0/-173 g，放在中间）对总读数做一元线性回归；
+- N 点：3 个重量 × 3 个位置，分别拟合共用增益 / 分片增益 / 分片增益 + 二次项；
+在随机重量、随机位置的测试集上比较误差，以及 1000 g 放在不同位置时读数的极差（摆放敏感性）。
+另核对设备端增量法方程与 numpy 最小二乘的一致性、旧 calib.json 的兼容性，以及两种实现的耗时。
+"""
+import argparse
+import random
+
+import numpy as np
+
+import common
+import calib_fit
+import calibration
+
+GAIN1 = 400.0     # 计数/克
+GAIN2 = 397.0
+OFFSET1 = 152000
+OFFSET2 = -48000
+NONLINEAR = 1e-6  # 相对二次项：1000 g 时约 1 g
+NOISE = 20        # 平均后读数的噪声（计数）
+
+
+def cells(weight, p, rng):
+    """重量 weight 中比例 p 落在第一片上时两片的平均读数"""
+    w1 = weight * p
+    w2 = weight * (1 - p)
+    c1 = OFFSET1 + GAIN1 * w1 * (1 + NONLINEAR * w1) + rng.gauss(0, NOISE)
+    c2 = OFFSET2 + GAIN2 * w2 * (1 + NONLINEAR * w2) + rng.gauss(0, NOISE)
+    return int(c1), int(c2)
+
+
+def legacy_fit(points):
+    # 改造前固件的做法：总读数 = offset + scale * 重量
+    x = [w for _, _, w in points]
+    y = [c1 + c2 for c1, c2, _ in points]
+    n = len(points)
+    sum_x, sum_y = sum(x), sum(y)
+    sum_xy = sum(a * b for a, b in zip(x, y))
+    sum_x2 = sum(a * a for a in x)
+    scale = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
+    offset = (sum_y - scale * sum_x) / n
+    return offset, scale
+
+
+def device_fit(points, degree, per_cell):
+    fit = calibration.CalibrationFit(degree, per_cell)
+    for c1, c2, w in points:
+        fit.add_point(c1, c2, w)
+    return fit.fit()
+
+
+def errors(calib, test):
+    c1, c2, w, _ = test
+    err = calib_fit.evaluate(calib, c1, c2) - w
+    return np.sqrt(np.mean(err ** 2)), np.abs(err).max()
+
+
+def placement_spread(calib):
+    values = []
+    for p in np.linspace(0.1, 0.9, 9):
+        c1, c2 = cells(1000, p, random.Random(0))  # 同一噪声，只看位置的影响
+        values.append(calib.value(c1, c2))
+    return max(values) - min(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--test-points', type=int, default=20000)
+    parser.add_argument('--timing-points', type=int, default=100000)
+    args = common.parse_args(parser)
+
+    rng = random.Random(1)
+    legacy_points = [cells(w, 0.5, rng) + (w,) for w in (923, 0, -173)]
+    n_points = [cells(w, p, rng) + (w,) for w in (0, 500, 1000) for p in (0.2, 0.5, 0.8)]
+    # 按键流程的 3 个点，每次放在不同位置：恰好定解，应退回共用增益并留下残差
+    spread_points = [cells(w, p, rng) + (w,) for w, p in ((923, 0.2), (0, 0.5), (-173, 0.8))]
+    test = [[], [], [], []]
+    for _ in range(args.test_points):
+        w = rng.uniform(0, 1100)
+        p = rng.uniform(0.1, 0.9)
+        c1, c2 = cells(w, p, rng)
+        for col, v in zip(test, (c1, c2, w, p)):
+            col.append(v)
+    test = [np.array(col) for col in test]
+
+    offset, scale = legacy_fit(legacy_points)
+    models = [
+        ('legacy 3 点', calibration.Calibration.from_dict({'offset': offset, 'scale': scale})),
+        ('9 点 共用增益', device_fit(n_points, 1, False)),
+        ('9 点 分片增益', device_fit(n_points, 1, True)),
+        ('9 点 分片 + 二次', device_fit(n_points, 2, True)),
+        ('3 点 分片（同一位置）', device_fit(legacy_points, 1, True)),
+        ('3 点 分片（不同位置）', device_fit(spread_points, 1, True)),
+    ]
+    rows = []
+    for name, calib in models:
+        rms, worst = errors(calib, test)
+        res = '%.3f' % np.abs(calib.residuals).max() if calib.residuals else '-'
+        shared = calib.coeffs[1] == calib.coeffs[2]
+        rows.append((name, 'shared' if shared else 'per-cell', res, '%.3f' % rms, '%.3f' % worst,
+                     '%.3f' % placement_spread(calib)))
+    common.print_table(f'测试集 {args.test_points} 个随机重量/位置（克）',
+                       ('model', 'gains', 'max residual', 'rms err', 'max err', '1000 g spread'), rows)
+
+    # 设备端增量法方程 vs numpy lstsq
+    c1, c2, w = (np.array(col) for col in zip(*n_points))
+    rows = []
+    for degree in (1, 2, 3):
+        dev = device_fit(n_points, degree, True)
+        host = calib_fit.fit(c1, c2, w, degree, True)
+        if dev is None or host is None:
+            # 只有 3 个不同重量时三次项无法确定，两边都应拒绝
+            rows.append((degree, '-', 'both rejected' if dev is host else 'MISMATCH'))
+            continue
+        diff = np.abs(calib_fit.evaluate(dev, test[0], test[1]) - calib_fit.evaluate(host, test[0], test[1])).max()
+        rows.append((degree, len(dev.coeffs), '%.2e' % diff))
+    common.print_table('设备端法方程 vs numpy lstsq（测试集上预测值之差，克）', ('degree', 'coeffs', 'max diff'), rows)
+
+    # 旧 calib.json 兼容：与改造前的 (总读数 - offset) / scale 比较
+    old = calibration.Calibration.from_dict({'offset': offset, 'scale': scale})
+    legacy_values = (test[0] + test[1] - offset) / scale
+    print(f"旧格式 calib.json 载入后与原公式最大差 {np.abs(calib_fit.evaluate(old, test[0], test[1]) - legacy_values).max():.2e} g")
+    back = calibration.Calibration.from_dict({k: v for k, v in old.to_dict().items() if k in ('offset', 'scale')})
+    print(f"新文件中的 offset/scale 往返误差 {np.abs(np.array(back.coeffs) - old.coeffs).max():.2e}")
+    print()
+
+    # 耗时
+    n = args.timing_points
+    bw = [rng.uniform(0, 1100) for _ in range(n)]
+    points = [cells(w, rng.uniform(0.1, 0.9), rng) + (w,) for w in bw]
+    bc1, bc2, bw = (np.array(col) for col in zip(*points))
+    t_host = common.measure(lambda: calib_fit.fit(bc1, bc2, bw, 2, True), 3)
+    t_dev = common.measure(lambda: device_fit(points, 2, True), 1)
+    calib = models[2][1]
+    t_value = common.measure(lambda: [calib.value(a, b) for a, b, _ in points[:10000]], 3) / 10000
+    common.print_table(f'耗时（{n} 个观测，二次分片模型）',
+                       ('impl', 'total ms', 'us/point'),
+                       [('numpy lstsq', '%.1f' % (t_host * 1e3), '%.3f' % (t_host / n * 1e6)),
+                        ('incremental', '%.1f' % (t_dev * 1e3), '%.3f' % (t_dev / n * 1e6)),
+                        ('value() 求值', '', '%.3f' % (t_value * 1e6))])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+CSV 记录占用 GUI 线程的时间（每样本）。
+
+- per-row: 改造前的写法，每行 strftime + writerow + flush；
+- per-batch: 每批 writerows 后 flush 一次；
+- background: CsvLogger，GUI 线程只入队。
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import common
+import binlog
+from csv_logger import CsvLogger
+
+
+def per_row(path, batches):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Weight(g)'])
+        t0 = time.perf_counter()
+        for batch in batches:
+            for t, w in zip(batch['time'], batch['weight']):
+                writer.writerow([time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t)), f"{w:.2f}"])
+                f.flush()
+        return time.perf_counter() - t0
+
+
+def per_batch(path, batches):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Weight(g)'])
+        t0 = time.perf_counter()
+        for batch in batches:
+            writer.writerows([time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t)), f"{w:.2f}"]
+                             for t, w in zip(batch['time'], batch['weight']))
+            f.flush()
+        return time.perf_counter() - t0
+
+
+def background(path, batches):
+    logger = CsvLogger(path)
+    t0 = time.perf_counter()
+    for batch in batches:
+        logger.write(batch)
+    gui = time.perf_counter() - t0
+    logger.close()
+    return gui
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=100000, help='样本数')
+    parser.add_argument('--batch', type=int, default=4, help='每批样本数（80 SPS、50 ms 一批约为 4）')
+    args = common.parse_args(parser)
+
+    samples = binlog.new_batch(args.n)
+    samples['time'] = time.time() + np.arange(args.n) / 80.0
+    samples['weight'] = 900 - np.arange(args.n) * 0.001
+    batches = [samples[i:i + args.batch] for i in range(0, args.n, args.batch)]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func in (('per-row', per_row), ('per-batch', per_batch), ('background', background)):
+            path = os.path.join(tmp, name + '.csv')
+            elapsed = func(path, batches)
+            rows.append((name, '%.2f' % (elapsed / args.n * 1e6), os.path.getsize(path)))
+    common.print_table('GUI 线程耗时（%d 样本，每批 %d）' % (args.n, args.batch),
+                       ('writer', 'us/sample', 'file bytes'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+漂移补偿（Project/drift.py 设备端、drift_fit.py 上位机）的回放验证。
+
+- 静态记录回放：Test/静态测试5分钟结果.csv 重量不变，拟合时间项后比较首尾漂移与峰峰值；
+  除了样本内拟合，另用前 60% 拟合、后 40% 检验，看模型能否外推；
+- 合成会话：现有 CSV 没有温度列，温度项用合成的升温/降温静态会话检验——
+  几次会话拟合，另一次会话检验，并核对拟合出的温度系数、幅度、时间常数；
+- 设备端 DriftModel.offset 单次求值耗时（主循环每 DRIFT_INTERVAL_MS 调用一次）。
+"""
+import argparse
+import os
+
+import numpy as np
+
+import common
+import drift_fit
+from drift import DriftModel
+
+STATIC_TRACE = '静态测试5分钟结果.csv'
+
+# 合成会话的真实参数
+TRUE_MODEL = DriftModel(temp_coeff=0.35, temp_ref=25.0, amplitudes=[1.8], taus=[240.0])
+NOISE = 0.1  # 克
+
+
+def synthetic_session(rng, duration, temp_start, temp_end, weight):
+    t = np.arange(0, duration, 1.0)
+    # 温度按指数趋近终值（机箱升温/环境变化），加 0.1 ℃ 量化
+    temp = temp_end + (temp_start - temp_end) * np.exp(-t / 600)
+    temp = np.round(temp, 1)
+    d = TRUE_MODEL.temp_coeff * (temp - TRUE_MODEL.temp_ref)
+    for a, tau in zip(TRUE_MODEL.amplitudes, TRUE_MODEL.taus):
+        d += a * (1 - np.exp(-t / tau))
+    return t, weight + d + rng.normal(0, NOISE, len(t)), temp
+
+
+def metrics_row(name, model, t, w, temp):
+    before = drift_fit.drift_metrics(t, w)
+    after = drift_fit.drift_metrics(t, drift_fit.compensate(model, t, w, temp))
+    return (name, '%+.2f' % before[0], '%+.2f' % after[0], '%.2f' % before[1], '%.2f' % after[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--split', type=float, default=0.6, help='外推检验时用于拟合的比例')
+    parser.add_argument('--sessions', type=int, default=4, help='合成会话数（最后一个用于检验）')
+    parser.add_argument('--duration', type=float, default=1800, help='合成会话时长（秒）')
+    parser.add_argument('--repeat', type=int, default=100000)
+    args = common.parse_args(parser)
+
+    header = ('case', 'drift before', 'drift after', 'p-p before', 'p-p after')
+
+    # 静态记录回放
+    path = os.path.join(common.TEST_DIR, STATIC_TRACE)
+    t, w, temp = drift_fit.load_session(path)
+    model, rms = drift_fit.fit([(t, w, temp)])
+    cut = int(len(t) * args.split)
+    head_model, _ = drift_fit.fit([(t[:cut], w[:cut], None)])
+    rows = [metrics_row('样本内拟合', model, t, w, temp),
+            metrics_row(f'前 {args.split:.0%} 拟合，全程', head_model, t, w, temp),
+            metrics_row(f'前 {args.split:.0%} 拟合，后段', head_model, t[cut:], w[cut:], None)]
+    common.print_table(f'{STATIC_TRACE}：{len(t)} 个样本，{t[-1]:.0f} s，残差 RMS {rms:.3f} g（克）',
+                       header, rows)
+    print(f"样本内模型 {model.to_dict()}")
+    print()
+
+    # 合成温度会话
+    rng = np.random.default_rng(1)
+    sessions = []
+    for k in range(args.sessions):
+        temp_start = rng.uniform(18, 24)
+        temp_end = temp_start + rng.uniform(-4, 10)
+        sessions.append(synthetic_session(rng, args.duration, temp_start, temp_end, rng.uniform(0, 1000)))
+    train, check = sessions[:-1], sessions[-1]
+    fitted, rms = drift_fit.fit(train, terms=1, max_tau=args.duration)
+    time_only, _ = drift_fit.fit([(t, w, None) for t, w, _ in train], terms=1, max_tau=args.duration)
+    rows = [metrics_row('温度 + 时间项', fitted, *check),
+            metrics_row('只有时间项', time_only, check[0], check[1], None)]
+    common.print_table(f'合成会话：{len(train)} 个拟合、1 个检验，噪声 {NOISE} g（克）', header, rows)
+    rows = [('temp_coeff g/℃', TRUE_MODEL.temp_coeff, '%.3f' % fitted.temp_coeff),
+            ('amplitude g', TRUE_MODEL.amplitudes[0], '%.3f' % fitted.amplitudes[0]),
+            ('tau s', TRUE_MODEL.taus[0], '%.0f' % fitted.taus[0]),
+            ('residual rms g', NOISE, '%.3f' % rms)]
+    common.print_table('拟合参数（时间常数在对数网格上搜索）', ('param', 'true', 'fitted'), rows)
+
+    # 设备端求值耗时
+    rows = []
+    for name, m in (('时间项 ×1', DriftModel(amplitudes=[1.8], taus=[240.0])),
+                    ('温度 + 时间项 ×1', TRUE_MODEL),
+                    ('温度 + 时间项 ×2', DriftModel(0.35, 25.0, [1.8, 0.5], [240.0, 1500.0])),
+                    ('未启用', DriftModel())):
+        per_call = common.measure(lambda: m.offset(26.5, 1234.5), args.repeat)
+        rows.append((name, '%.3f' % (per_call * 1e6)))
+    common.print_table('DriftModel.offset 耗时（CPython）', ('model', 'us/call'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+串行读取两片HX711 与 共用时钟线同步读取 的对比。
+
+在仿真引脚上运行固件里的 HX711/DualHX711 类：
+- 吞吐：芯片设为读完立即就绪，测纯读取开销（成对读数/秒）；
+- 时间对齐：芯片按 80 SPS 转换，统计两路锁存时刻之差。
+"""
+import argparse
+
+import common
+import sim
+
+
+def load(rate):
+    board = sim.install()
+    fw = sim.load_firmware('main')
+    # 使用固件默认引脚以外的编号，避免与 main.py 模块级实例冲突
+    sim.HX711Chip(board, dout=20, sck=21, source=lambda t: 120000, rate=rate)
+    sim.HX711Chip(board, dout=22, sck=23, source=lambda t: 80000, rate=rate)
+    serial_a = fw.HX711(data_pin=20, clock_pin=21)
+    serial_b = fw.HX711(data_pin=22, clock_pin=23)
+    return board, fw, serial_a, serial_b
+
+
+def load_dual(rate):
+    board = sim.install()
+    fw = sim.load_firmware('main')
+    sim.HX711Chip(board, dout=20, sck=21, source=lambda t: 120000, rate=rate)
+    sim.HX711Chip(board, dout=22, sck=21, source=lambda t: 80000, rate=rate)
+    dual = fw.DualHX711(data_pin=20, data_pin2=22, clock_pin=21)
+    return board, fw, dual
+
+
+def bench_throughput(repeat):
+    board, fw, a, b = load(rate=None)
+
+    def serial_read():
+        a.read_count()
+        b.read_count()
+
+    t_serial = common.measure(serial_read, repeat)
+    writes_serial = sum(line.writes for line in board.lines.values())
+
+    board, fw, dual = load_dual(rate=None)
+    t_dual = common.measure(dual.read_pair, repeat)
+    writes_dual = sum(line.writes for line in board.lines.values())
+    return [
+        ('serial', '%.1f' % (t_serial * 1e6), '%.0f' % (1 / t_serial), writes_serial // repeat),
+        ('lockstep', '%.1f' % (t_dual * 1e6), '%.0f' % (1 / t_dual), writes_dual // repeat),
+    ]
+
+
+def bench_skew(samples):
+    board, fw, a, b = load(rate=80)
+    chip_a, chip_b = board.chips
+    skew_serial = 0
+    for _ in range(samples):
+        a.read_count()
+        b.read_count()
+        skew_serial += abs(chip_b.last_read_us - chip_a.last_read_us)
+
+    board, fw, dual = load_dual(rate=80)
+    chip_a, chip_b = board.chips
+    skew_dual = 0
+    for _ in range(samples):
+        dual.read_pair()
+        skew_dual += abs(chip_b.last_read_us - chip_a.last_read_us)
+    return [
+        ('serial', '%.0f' % (skew_serial / samples)),
+        ('lockstep', '%.0f' % (skew_dual / samples)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=2000, help='吞吐测试的读取次数')
+    parser.add_argument('--samples', type=int, default=200, help='对齐测试的样本数（80 SPS）')
+    args = common.parse_args(parser)
+
+    common.print_table('读取吞吐（仿真引脚，芯片立即就绪）',
+                       ('path', 'us/pair', 'pairs/s', 'line writes/pair'),
+                       bench_throughput(args.repeat))
+    common.print_table('两路锁存时刻差（80 SPS，虚拟时钟）',
+                       ('path', 'mean skew us'),
+                       bench_skew(args.samples))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+用动态测试记录验证消耗速率估计。
+
+对每段记录：先经过与上位机相同的中值+卡尔曼滤波，再流式送入
+ConsumptionEstimator，与离线 Theil–Sen 斜率（所有点对斜率的中位数）对比。
+参考斜率只取估计器当前覆盖的区间（最后一次重启之后、且在窗口内的点），
+这样两者看到的是同一段数据；同一段上的最小二乘斜率也列出来，作为直线模型是否成立的参照。
+流式估计应落在 Theil–Sen 斜率的 ±95% 置信区间内，EXCLUDED 中的记录除外（原因见该表）。
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import common
+import filters
+from estimator import ConsumptionEstimator
+
+
+# 不参与判断的记录：估计窗口内的重量不是直线变化，参考斜率本身就不确定
+EXCLUDED = {
+    '动态测试_pcb盒子.csv': '最后 10 分钟重量先降后升（约 1000 → 810 → 925 g），不是匀速消耗；'
+                         '同一段上 Theil–Sen（-6.3 g/min）与最小二乘（-2.8 g/min）斜率之差已超过置信区间',
+}
+
+
+def theil_sen(t, y):
+    i, j = np.triu_indices(len(t), k=1)
+    dt = t[j] - t[i]
+    mask = dt > 0
+    return np.median((y[j] - y[i])[mask] / dt[mask])
+
+
+def run(path, window):
+    times, weights = common.read_trace(path)
+    chain = filters.FilterChain(filters.MovingMedian(5), filters.Kalman(0.01, 4.0))
+    filtered = [chain.update(w) for w in weights]
+    est = ConsumptionEstimator(window=window, interval=1.0)
+    restarts = 0
+    start = times[0]
+    cost = 0.0
+    for t, w in zip(times, filtered):
+        t0 = time.perf_counter()
+        est.update(t, w)
+        cost += time.perf_counter() - t0
+        if est.restarts != restarts:
+            restarts = est.restarts
+            start = t
+    cost /= len(times)
+
+    t = np.array(times)
+    y = np.array(filtered)
+    span = (t >= max(start, t[-1] - window * est.interval))
+    reference = -theil_sen(t[span], y[span]) * 60
+    ols = -np.polyfit(t[span], y[span], 1)[0] * 60
+    name = os.path.basename(path)
+    result = est.estimate()
+    if result is None:
+        rate = ci = None
+        within = False
+    else:
+        rate, ci = result[:2]
+        within = abs(rate - reference) <= ci
+    if name in EXCLUDED:
+        within = ('yes' if within else 'no') + ' (excluded)'
+    else:
+        stream = '--' if rate is None else '%.2f' % rate
+        within = common.verdict(within, f'{name}: stream {stream} vs theil-sen {reference:.2f} g/min')
+    return (name, len(times), est.restarts, '%.2f' % reference, '%.2f' % ols,
+            '--' if rate is None else '%.2f' % rate, '--' if ci is None else '%.2f' % ci,
+            within, '%.1f' % (cost * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pattern', default='动态测试_*.csv', help='Test 目录下的文件名模式')
+    parser.add_argument('--window', type=int, default=600, help='回归窗口（桶数，1 秒一桶）')
+    args = common.parse_args(parser)
+
+    rows = [run(path, args.window) for path in common.traces(args.pattern)]
+    common.print_table('消耗速率 g/min（正数为减少）',
+                       ('trace', 'points', 'restarts', 'theil-sen', 'ols', 'stream', '±95%', 'within', 'us/sample'),
+                       rows)
+    for name, reason in EXCLUDED.items():
+        print(f"不参与判断 {name}: {reason}")
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+用 Embedded/Test 下的动态测试记录回放各滤波器，报告每样本耗时和残余噪声。
+"""
+import argparse
+import os
+import time
+
+import common
+import filters
+
+# 记录文件约 1 秒一个点
+SAMPLE_RATE = 1.0
+
+CONFIGS = [
+    ('raw', lambda: filters.FilterChain()),
+    ('median5', lambda: filters.FilterChain(filters.MovingMedian(5))),
+    ('median9', lambda: filters.FilterChain(filters.MovingMedian(9))),
+    ('lowpass0.1', lambda: filters.FilterChain(filters.LowPass(0.1, SAMPLE_RATE))),
+    ('kalman', lambda: filters.FilterChain(filters.Kalman(0.01, 4.0))),
+    ('median5+kalman', lambda: filters.FilterChain(filters.MovingMedian(5), filters.Kalman(0.01, 4.0))),
+]
+
+
+def run(path, repeat):
+    _, weights = common.read_trace(path)
+    rows = []
+    for name, make in CONFIGS:
+        chain = make()
+        out = [chain.update(w) for w in weights]
+        update = chain.update
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for w in weights:
+                update(w)
+        cost = (time.perf_counter() - t0) / (repeat * len(weights))
+        rows.append((name, '%.0f' % (cost * 1e9), '%.3f' % common.noise_std(out)))
+    return len(weights), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pattern', default='动态测试_*.csv', help='Test 目录下的文件名模式')
+    parser.add_argument('--repeat', type=int, default=20, help='计时重复次数')
+    args = common.parse_args(parser)
+
+    for path in common.traces(args.pattern):
+        n, rows = run(path, args.repeat)
+        common.print_table('%s（%d 点）' % (os.path.basename(path), n),
+                           ('filter', 'ns/sample', 'noise std g'), rows)
+
+
+if __name__ == '__main__':
+    main()
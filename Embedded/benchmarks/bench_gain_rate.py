@@ -0,0 +1,114 @@
+"""
+HX711 增益/通道选择与 10/80 SPS 速率的仿真验证。
+
+- 增益：每种读取路径 × 每种增益，核对芯片模型收到的脉冲数（25/26/27）、选中的增益，
+  以及第二次起的读数（上电后第一次转换固定为 A128）；另给出每次转换的宿主耗时；
+- 速率：RATE 引脚由固件驱动（rate_pin）或硬件接死两种接法，分别用 measure_rate/detect_rate
+  测出速率，并以中断方式采集若干虚拟秒，统计实际样本率。
+"""
+import argparse
+
+import common
+import sim
+
+MODES = ('basic', 'cached', 'viper')
+GAINS = (128, 32, 64)
+SOURCE_A = 400000
+SOURCE_B = -12345
+# 数据手册：每次读取的总脉冲数决定下一次转换的通道与增益（与固件的表独立核对）
+EXPECTED_PULSES = {128: 25, 32: 26, 64: 27}
+
+
+def expected(value):
+    return (value & 0xFFFFFF) ^ 0x800000
+
+
+def expected_for_gain(gain):
+    if gain == 32:
+        return expected(SOURCE_B)
+    return expected(SOURCE_A >> 1 if gain == 64 else SOURCE_A)
+
+
+def check_gain(mode, gain, dual, repeat):
+    board = sim.install()
+    fw = sim.load_firmware('main')
+    chips = [sim.HX711Chip(board, dout=20, sck=21, source=lambda t: SOURCE_A,
+                           source_b=lambda t: SOURCE_B, rate=None)]
+    if dual:
+        chips.append(sim.HX711Chip(board, dout=22, sck=21, source=lambda t: SOURCE_A,
+                                   source_b=lambda t: SOURCE_B, rate=None))
+        hx = fw.DualHX711(data_pin=20, data_pin2=22, clock_pin=21, gain=gain, read_mode=mode)
+        read = lambda: tuple(hx.read_pair())
+        want = (expected_for_gain(gain),) * 2
+        first = (expected(SOURCE_A),) * 2
+    else:
+        hx = fw.HX711(data_pin=20, clock_pin=21, gain=gain, read_mode=mode)
+        read = hx.read_count
+        want = expected_for_gain(gain)
+        first = expected(SOURCE_A)
+    values = []
+    t = common.measure(lambda: values.append(read()), repeat)
+    pulses_ok = all(c.last_pulses == EXPECTED_PULSES[gain] and c.gain == gain for c in chips)
+    values_ok = values[0] == first and all(v == want for v in values[1:])
+    return chips[0].last_pulses, pulses_ok, values_ok, t
+
+
+def check_rate(rate, driven, seconds):
+    board = sim.install()
+    fw = sim.load_firmware('main')
+    if driven:
+        chip = sim.HX711Chip(board, dout=20, sck=21, source=lambda t: SOURCE_A, rate_pin=24)
+        hx = fw.HX711(data_pin=20, clock_pin=21, rate_pin=24, rate=rate)
+    else:
+        chip = sim.HX711Chip(board, dout=20, sck=21, source=lambda t: SOURCE_A, rate=rate)
+        hx = fw.HX711(data_pin=20, clock_pin=21)
+    measured = hx.measure_rate()
+    detected = hx.detect_rate()
+    # 中断采集：主循环只休眠、取样本
+    hx.start()
+    time = sim.time
+    samples = 0
+    t0 = board.clock.now_us()
+    end = t0 + int(seconds * 1e6)
+    while board.clock.now_us() < end:
+        time.sleep_ms(5)
+        while hx.ring.available():
+            hx.ring.get()
+            samples += 1
+    hx.stop()
+    irq_rate = samples * 1e6 / (board.clock.now_us() - t0)
+    return chip.current_rate(), measured, detected, irq_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=500, help='增益测试每种组合的读取次数')
+    parser.add_argument('--seconds', type=float, default=5, help='速率测试的中断采集时长（虚拟秒）')
+    args = common.parse_args(parser)
+
+    rows = []
+    for dual in (False, True):
+        for mode in MODES:
+            for gain in GAINS:
+                pulses, pulses_ok, values_ok, t = check_gain(mode, gain, dual, args.repeat)
+                case = f"{'dual' if dual else 'single'} {mode} gain {gain}"
+                rows.append(('dual' if dual else 'single', mode, gain, pulses,
+                             common.verdict(pulses_ok, f'{case}: pulses {pulses}'),
+                             common.verdict(values_ok, f'{case}: values'), '%.1f' % (t * 1e6)))
+    common.print_table('增益/通道选择（仿真芯片，读完立即就绪）',
+                       ('sensor', 'mode', 'gain', 'pulses', 'pulses ok', 'values ok', 'us/read'), rows)
+
+    rows = []
+    for driven in (True, False):
+        for rate in (10, 80):
+            chip_rate, measured, detected, irq_rate = check_rate(rate, driven, args.seconds)
+            rows.append(('rate_pin' if driven else 'hard-wired', rate, chip_rate, '%.2f' % measured,
+                         detected, common.verdict(detected == rate, f'rate {rate}: detected {detected}'),
+                         '%.2f' % irq_rate))
+    common.print_table(f'RATE 引脚（中断采集 {args.seconds:g} 虚拟秒）',
+                       ('wiring', 'want', 'chip sps', 'measured', 'detected', 'match', 'irq samples/s'), rows)
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
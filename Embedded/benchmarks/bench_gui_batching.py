@@ -0,0 +1,104 @@
+"""
+SerialReader 批量信号的无界面（offscreen）基准。
+
+合成读线程按给定速率产生样本，分别以逐样本发信号（batch_interval=0）
+和批量发信号送到 WeightMonitor，逐级提高速率，找出 GUI 线程
+在生产结束后能迅速清空积压（事件队列不堆积）的最大速率。
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import time
+
+import common
+from PyQt5.QtWidgets import QApplication
+
+import weight_monitor
+
+
+class HeadlessMonitor(weight_monitor.WeightMonitor):
+    def init_csv(self):
+        # 基准中不弹文件对话框，也不写文件
+        pass
+
+    def handle_batch(self, batch):
+        super().handle_batch(batch)
+        self.processed += len(batch)
+
+
+class SyntheticReader(weight_monitor.SerialReader):
+    def __init__(self, rate, duration, batch_interval):
+        super().__init__(port=None, batch_interval=batch_interval)
+        self.rate = rate
+        self.duration = duration
+        self.produced = 0
+
+    def run(self):
+        t0 = time.perf_counter()
+        while True:
+            elapsed = time.perf_counter() - t0
+            if elapsed >= self.duration:
+                break
+            # 按经过的时间补齐应产生的样本
+            due = int(elapsed * self.rate)
+            collector = self.collector
+            while self.produced < due:
+                collector.add_sample(800.0 + (self.produced % 100) * 0.01)
+                self.produced += 1
+                if time.time() - collector._last_emit >= collector.batch_interval:
+                    collector.flush()
+            time.sleep(0.0005)
+        self.collector.flush()
+
+
+def run_case(app, rate, duration, batch_interval, drain_timeout):
+    monitor = HeadlessMonitor()
+    monitor.processed = 0
+    reader = SyntheticReader(rate, duration, batch_interval)
+    reader.batch_received.connect(monitor.handle_batch)
+    reader.start()
+    while reader.isRunning():
+        app.processEvents()
+    backlog = reader.produced - monitor.processed
+    t0 = time.perf_counter()
+    while monitor.processed < reader.produced and time.perf_counter() - t0 < drain_timeout:
+        app.processEvents()
+    drain = time.perf_counter() - t0
+    monitor.close()
+    monitor.deleteLater()
+    app.processEvents()
+    return reader.produced, backlog, drain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=2.0, help='每档速率持续时间（秒）')
+    parser.add_argument('--max-rate', type=int, default=200000, help='最高测试速率（样本/秒）')
+    parser.add_argument('--batch-interval', type=float, default=0.05, help='批量模式的发送间隔（秒）')
+    args = common.parse_args(parser)
+
+    app = QApplication.instance() or QApplication([])
+    # 积压清空时间不超过生产时长的 10% 视为跟得上
+    limit = args.duration * 0.1
+    summary = []
+    for mode, interval in (('per-sample', 0.0), ('batched', args.batch_interval)):
+        rows = []
+        sustained = 0
+        rate = 100
+        while rate <= args.max_rate:
+            produced, backlog, drain = run_case(app, rate, args.duration, interval, args.duration * 5)
+            ok = drain <= limit
+            rows.append((rate, produced, backlog, '%.3f' % drain, 'yes' if ok else 'no'))
+            if not ok:
+                break
+            sustained = rate
+            rate *= 2
+        common.print_table(mode, ('rate/s', 'produced', 'backlog', 'drain s', 'sustained'), rows)
+        summary.append((mode, sustained))
+    common.print_table('最大持续速率', ('mode', 'samples/s'), summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+设备端序号/时间戳统计（link_stats.LinkStats）的仿真验证。
+
+在仿真板上运行固件（文本行与二进制帧两种输出），HX711 模型按给定 SPS 转换；
+把固件输出按每 k 条删掉一条来模拟丢帧，再交给上位机的 SampleCollector + LinkStats，
+核对算出的 ADC 采样率、输出频率与丢帧数，并给出 LinkStats 每样本的开销。
+另外构造设备重启（序号与 ticks_us 从头开始）的序列，按每批 1 个与 16 个样本送入，
+核对重启前序号在上半圈时也不计成丢帧。
+"""
+import argparse
+import contextlib
+import io
+import random
+
+import numpy as np
+
+import common
+import sim
+import binlog
+import protocol
+from link_stats import LinkStats
+from sample_source import SampleCollector
+
+
+def run_firmware(sps, binary, seconds):
+    board = sim.install()
+    rng = random.Random(1)
+    sim.HX711Chip(board, dout=1, sck=2, source=lambda t: 120000 + rng.randint(-50, 50), rate=sps)
+    sim.HX711Chip(board, dout=8, sck=9, source=lambda t: 80000 + rng.randint(-50, 50), rate=sps)
+    fw = sim.load_firmware('main')
+    fw.BINARY_OUTPUT = binary
+    out = io.BytesIO()
+    fw.serial_out = out
+    text = io.StringIO()
+    for hx in fw.sensors:
+        hx.start()
+    end = board.clock.now_us() + int(seconds * 1e6)
+    with contextlib.redirect_stdout(text):
+        while board.clock.now_us() < end:
+            fw.step()
+    if binary:
+        data = out.getvalue()
+        return [data[i:i + protocol.FRAME_SIZE] for i in range(0, len(data), protocol.FRAME_SIZE)]
+    return [line.encode() + b'\n' for line in text.getvalue().splitlines()]
+
+
+def check(records, drop_every):
+    # 末尾丢的帧后面没有序号可比，无法发现，所以最后一条总是保留
+    last = len(records) - 1
+    kept = [r for i, r in enumerate(records) if not drop_every or i == last or i % drop_every != drop_every - 1]
+    stats = LinkStats()
+    collector = SampleCollector(stats.update)
+    collector.feed(b''.join(kept))
+    collector.flush()
+    frame_rate, adc_rate, device_jitter, _, dropped = stats.report()
+    return len(records), len(records) - len(kept), dropped, frame_rate, adc_rate, device_jitter
+
+
+def session(seq0, us0, n, interval_us):
+    data = binlog.new_batch(n)
+    data['seq'] = [(seq0 + i) & 0xFFFF for i in range(n)]
+    data['device_us'] = [(us0 + i * interval_us) % (1 << 30) for i in range(n)]
+    data['samples'] = 10
+    return data
+
+
+def check_restart(seq_before, batch, interval_us=1000000):
+    # 运行 901 秒后重启：重启前最后 100 条，重启后从序号 0、ticks_us 1 ms 开始 50 条
+    data = np.concatenate((session(seq_before, 801000000, 100, interval_us), session(0, 1000, 50, interval_us)))
+    stats = LinkStats()
+    for i in range(0, len(data), batch):
+        stats.update(data[i:i + batch])
+    frame_rate, _, _, _, dropped = stats.report()
+    return dropped, stats.restarts, frame_rate
+
+
+def bench_update(n=100000, batch=64):
+    data = binlog.new_batch(n)
+    data['seq'] = [i & 0xFFFF for i in range(n)]
+    data['device_us'] = [(i * 12500) % (1 << 30) for i in range(n)]
+    data['samples'] = 1
+    batches = [data[i:i + batch] for i in range(0, n, batch)]
+    stats = LinkStats()
+
+    def run():
+        for b in batches:
+            stats.update(b)
+        stats.report()
+
+    return common.measure(run, 3) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=30, help='仿真时长（虚拟秒）')
+    parser.add_argument('--drop-every', type=int, default=7, help='每多少条删掉一条，0 为不删')
+    args = common.parse_args(parser)
+
+    rows = []
+    for binary in (False, True):
+        for sps in (10, 80):
+            records = run_firmware(sps, binary, args.seconds)
+            for drop_every in (0, args.drop_every):
+                total, removed, dropped, frame_rate, adc_rate, jitter = check(records, drop_every)
+                rows.append(('binary' if binary else 'text', sps, total, removed, dropped,
+                             common.verdict(removed == dropped, f'{sps} sps binary={binary}: removed {removed}, '
+                                                                f'dropped {dropped}'),
+                             '%.2f' % frame_rate, '%.2f' % adc_rate, '%.3f' % jitter))
+    common.print_table(f'仿真固件 {args.seconds:g} 虚拟秒',
+                       ('output', 'chip sps', 'records', 'removed', 'dropped', 'match',
+                        'out Hz', 'adc Hz', 'jitter ms'), rows)
+
+    rows = []
+    for batch in (1, 16):
+        for seq_before in (100, 30000, 40000, 65500):
+            dropped, restarts, frame_rate = check_restart(seq_before, batch)
+            rows.append((batch, seq_before, dropped, restarts, '%.2f' % frame_rate,
+                         common.verdict(dropped == 0 and restarts == 1 and abs(frame_rate - 1) < 0.01,
+                                        f'restart from seq {seq_before}, batch {batch}: dropped {dropped}, '
+                                        f'restarts {restarts}')))
+    common.print_table('设备重启（1 Hz 输出，重启前运行 901 秒）',
+                       ('batch', 'seq before', 'dropped', 'restarts', 'out Hz', 'match'), rows)
+    print(f"LinkStats.update: {bench_update() * 1e6:.2f} us/样本（64 样本一批）")
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
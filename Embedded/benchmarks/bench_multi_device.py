@@ -0,0 +1,190 @@
+"""
+多秤监视的扩展性基准（offscreen，pty 对模拟秤）。
+
+N 台模拟秤各自按给定速率输出 "Weight:" 行，行内数值是发送时刻（秒，对 100 取模），
+GUI 线程处理该批时用当前时刻减去它得到端到端延迟（写入 pty -> 解析 -> 跨线程信号 -> 处理）。
+对比两种读取方式：
+  loop     multi_monitor.MultiWeightMonitor，所有串口在 GUI 线程的事件循环中读取
+  threads  每台秤一个 weight_monitor.SerialReader（QThread）
+模拟秤在独立进程中写 pty；CPU 为被测进程的 CPU 时间占墙钟时间的比例。
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import contextlib
+import io
+import subprocess
+import sys
+import time
+import tty
+
+import numpy as np
+
+import common
+from PyQt5.QtWidgets import QApplication
+
+import multi_monitor
+import weight_monitor
+
+
+def feed(masters, rate, duration):
+    """模拟秤进程：一个循环按时间补齐每个 pty 应写出的行，返回每台的行数"""
+    t0 = time.perf_counter()
+    sent = 0
+    while True:
+        elapsed = time.perf_counter() - t0
+        if elapsed >= duration:
+            return sent
+        due = int(elapsed * rate)
+        if due > sent:
+            line = b'Weight: %.5f\r\n' % (time.time() % 100) * (due - sent)
+            for master in masters:
+                os.write(master, line)
+            sent = due
+        time.sleep(0.002)
+
+
+class Latency:
+    def __init__(self):
+        self.values = []
+        self.samples = 0
+
+    def __call__(self, *args):
+        batch = args[-1]
+        now = time.time() % 100
+        lat = now - batch['weight'].astype(float)
+        lat[lat < 0] += 100
+        self.values.append(lat)
+        self.samples += len(batch)
+
+
+class ThreadedMonitor:
+    """对照组：每台秤一个 SerialReader 线程，面板与多秤监视相同"""
+
+    def __init__(self, devices):
+        self.panels = {name: multi_monitor.ScalePanel(name) for name, _ in devices}
+        self.readers = []
+        for name, port in devices:
+            reader = weight_monitor.SerialReader(port)
+            reader.batch_received.connect(self.panels[name].handle_batch)
+            self.readers.append(reader)
+
+    def connect(self, slot):
+        for reader in self.readers:
+            reader.batch_received.connect(slot)
+
+    def start(self):
+        for reader in self.readers:
+            reader.start()
+
+    def refresh_plots(self):
+        for panel in self.panels.values():
+            panel.refresh()
+
+    def stop(self):
+        for reader in self.readers:
+            reader.stop()
+
+
+class LoopMonitor:
+    def __init__(self, devices):
+        self.monitor = multi_monitor.MultiWeightMonitor(devices)
+        self.monitor.plot_timer.stop()  # 与对照组一样由基准按固定帧率刷新
+
+    @property
+    def panels(self):
+        return self.monitor.panels
+
+    def connect(self, slot):
+        handle = self.monitor.handle_batch
+
+        def handle_and_measure(name, batch):
+            handle(name, batch)
+            slot(batch)
+
+        for session in self.monitor.sessions:
+            session.batch_callback = handle_and_measure
+
+    def start(self):
+        pass  # 构造时已打开串口
+
+    def refresh_plots(self):
+        self.monitor.refresh_plots()
+
+    def stop(self):
+        self.monitor.close()
+
+
+def run_case(app, mode, devices, rate, duration, fps=10):
+    ptys = []
+    for _ in range(devices):
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        ptys.append((master, slave))
+    specs = [(f"scale{i}", os.ttyname(slave)) for i, (_, slave) in enumerate(ptys)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = (LoopMonitor if mode == 'loop' else ThreadedMonitor)(specs)
+        latency = Latency()
+        monitor.connect(latency)
+        monitor.start()
+        # 预热：串口打开、首次布局与绘图、绘图缓冲的首次缺页都在这里完成，不计入测量
+        for panel in monitor.panels.values():
+            panel.plot_data.data.fill(0.0)
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < 0.5:
+            app.processEvents()
+            monitor.refresh_plots()
+            time.sleep(0.01)
+
+        # 模拟秤放在独立进程，避免与被测进程争 GIL
+        masters = [master for master, _ in ptys]
+        feeder = subprocess.Popen([sys.executable, __file__, '--feed', str(rate), str(duration),
+                                   *map(str, masters)], pass_fds=masters, stdout=subprocess.PIPE, text=True)
+        c0 = time.process_time()
+        t0 = time.perf_counter()
+        next_frame = t0
+        sent = None
+        while sent is None or (latency.samples < sent and time.perf_counter() - t0 < duration + 5):
+            app.processEvents()
+            if time.perf_counter() >= next_frame:
+                monitor.refresh_plots()
+                next_frame += 1 / fps
+            if sent is None and feeder.poll() is not None:
+                sent = int(feeder.stdout.read()) * devices
+            time.sleep(0.001)
+        wall = time.perf_counter() - t0
+        cpu = time.process_time() - c0
+        monitor.stop()
+        app.processEvents()
+    for master, slave in ptys:
+        os.close(master)
+        os.close(slave)
+    lat = np.concatenate(latency.values) * 1000 if latency.values else np.zeros(1)
+    return sent, latency.samples, cpu / wall, np.median(lat), np.percentile(lat, 99)
+
+
+def main():
+    if sys.argv[1:2] == ['--feed']:
+        rate, duration, *masters = sys.argv[2:]
+        print(feed([int(fd) for fd in masters], float(rate), float(duration)))
+        return
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--rate', type=float, default=80, help='每台秤每秒行数')
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = common.parse_args(parser)
+
+    app = QApplication.instance() or QApplication([])
+    rows = []
+    for devices in args.devices:
+        for mode in ('loop', 'threads'):
+            sent, got, cpu, p50, p99 = run_case(app, mode, devices, args.rate, args.duration)
+            rows.append((devices, mode, sent, got, '%.1f%%' % (cpu * 100), '%.1f' % p50, '%.1f' % p99))
+    common.print_table(f'多秤监视，每台 {args.rate:g} 行/秒',
+                       ('devices', 'mode', 'sent', 'handled', 'cpu', 'p50 ms', 'p99 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+采集到落盘全链路的分段基准（offscreen），逐级提高输入速率。
+
+模拟秤由 replay.Replayer 按设备时间往 pty 写文本行（或二进制帧），上位机一侧用真实的
+SerialReader / WeightMonitor / CsvLogger。每一段都可以单独运行（--stage，可重复）：
+
+  parse  SampleCollector 解析串口字节的耗时（每样本 us，及该速率下占一个核的比例）
+  hop    SerialReader 发出批信号 -> WeightMonitor.handle_batch 开始执行的跨线程延迟，及 handle_batch 每批耗时
+  plot   绘图刷新一帧的耗时（历史长度 = 速率 × --history 秒），占 PLOT_FPS 帧间隔的比例
+  csv    CsvLogger：GUI 线程入队耗时，后台线程的写盘吞吐，及该速率占吞吐的比例
+  e2e    设备时间戳 -> 行被刷新到磁盘的延迟（含 CsvLogger 的刷新策略），收发条数与丢帧
+
+    python benchmarks/bench_pipeline.py --stage e2e --rates 80 1280 --json e2e.json
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import contextlib
+import io
+import tempfile
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import common
+import binlog
+import replay
+from csv_logger import CsvLogger
+from sample_source import SampleCollector
+
+from PyQt5.QtWidgets import QApplication
+
+import weight_monitor
+
+STAGES = ('parse', 'hop', 'plot', 'csv', 'e2e')
+
+
+def device_data(rate, seconds):
+    """模拟秤的输出：rate 样本/秒，缓慢下降的重量加小幅波动"""
+    n = max(int(rate * seconds), 2)
+    data = binlog.new_batch(n)
+    t = np.arange(n) / rate
+    data['time'] = t
+    data['weight'] = 900.0 - 0.01 * t + 0.3 * np.sin(2 * np.pi * 0.7 * t)
+    data['samples'] = 1
+    return data
+
+
+def percentiles(values):
+    if not len(values):
+        return '--', '--', '--'
+    v = np.asarray(values) * 1e3
+    return '%.2f' % np.percentile(v, 50), '%.2f' % np.percentile(v, 99), '%.2f' % v.max()
+
+
+class StampedReader(weight_monitor.SerialReader):
+    """记录每次发出批信号的时刻"""
+
+    def __init__(self, port):
+        super().__init__(port)
+        self.emitted = deque()
+        emit = self.collector.on_batch
+
+        def on_batch(batch):
+            self.emitted.append(time.perf_counter())
+            emit(batch)
+
+        self.collector.on_batch = on_batch
+
+
+class TimedCsvLogger(CsvLogger):
+    """记录每行被刷新到磁盘的时刻，换算成相对设备时间戳的延迟"""
+
+    def __init__(self, path, replayer):
+        self.replayer = replayer
+        self.latencies = []
+        self._pending = []
+        super().__init__(path)
+
+    def _write_batch(self, batch):
+        super()._write_batch(batch)
+        self._pending.extend(batch['device_us'].tolist())
+
+    def _stamp(self):
+        now = time.perf_counter()
+        started = self.replayer.started
+        self.latencies.extend(now - (started + us / 1e6) for us in self._pending)
+        self._pending = []
+
+    def _flush(self):
+        super()._flush()
+        self._stamp()
+
+    def _close(self):
+        super()._close()
+        self._stamp()
+
+
+class HeadlessMonitor(weight_monitor.WeightMonitor):
+    def init_csv(self):
+        # 不弹文件对话框；e2e 段直接给 self.logger 赋值
+        pass
+
+    def start(self, reader):
+        self.reader = reader
+        self.processed = 0
+        self.hops = []
+        self.handle_time = 0.0
+        reader.batch_received.connect(self.handle_batch)
+
+    def handle_batch(self, batch):
+        t0 = time.perf_counter()
+        self.hops.append(t0 - self.reader.emitted.popleft())
+        super().handle_batch(batch)
+        self.handle_time += time.perf_counter() - t0
+        self.processed += len(batch)
+
+
+def run_live(app, rate, seconds, fmt, csv_path=None):
+    """模拟秤 -> pty -> SerialReader -> WeightMonitor（-> TimedCsvLogger），返回 (monitor, replayer, logger)"""
+    data = device_data(rate, seconds)
+    write, port, _ = replay.open_pty()
+    replayer = replay.Replayer(data, fmt, speed=1.0)
+    monitor = HeadlessMonitor()
+    reader = StampedReader(port)
+    monitor.start(reader)
+    logger = None
+    if csv_path:
+        logger = monitor.logger = TimedCsvLogger(csv_path, replayer)
+    reader.start()
+    time.sleep(0.05)  # 等读线程打开串口
+    writer = threading.Thread(target=replayer.run, args=(write,))
+    writer.start()
+    deadline = time.perf_counter() + seconds * 3 + 2
+    while (writer.is_alive() or monitor.processed < len(data)) and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.0005)
+    writer.join()
+    reader.stop()
+    app.processEvents()
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor.close_csv()  # 会打印“记录文件已关闭”
+    monitor.close()
+    monitor.deleteLater()
+    app.processEvents()
+    return monitor, replayer, logger
+
+
+def stage_parse(app, rates, args):
+    rows = []
+    for rate in rates:
+        data = device_data(rate, args.seconds)
+        # 读线程每次 read 拿到的是约 5 ms 内到达的字节
+        per_read = max(int(rate * 0.005), 1)
+        for fmt in ('text', 'frames'):
+            records = replay.encode(data, fmt)
+            chunks = [b''.join(records[i:i + per_read]) for i in range(0, len(records), per_read)]
+            collector = SampleCollector(lambda batch: None, batch_interval=0.05)
+
+            def run():
+                for chunk in chunks:
+                    collector.feed(chunk)
+                collector.flush()
+
+            cost = common.measure(run, 3) / len(records)
+            rows.append((rate, fmt, len(records), '%.2f' % (cost * 1e6), '%.2f' % (cost * rate * 100)))
+    common.print_table('parse：SampleCollector.feed', ('rate/s', 'format', 'samples', 'us/sample', 'cpu %'), rows)
+
+
+def stage_hop(app, rates, args):
+    rows = []
+    for rate in rates:
+        monitor, replayer, _ = run_live(app, rate, args.seconds, args.format)
+        hop = percentiles(monitor.hops)
+        batches = len(monitor.hops)
+        per_batch = monitor.handle_time / batches * 1e6 if batches else 0
+        rows.append((rate, f'{monitor.processed}/{replayer.records}', batches) + hop + ('%.1f' % per_batch,))
+    common.print_table(f'hop：批信号 -> handle_batch（{args.format}，毫秒）',
+                       ('rate/s', 'received', 'batches', 'p50', 'p99', 'max', 'handle us/batch'), rows)
+
+
+def stage_plot(app, rates, args):
+    rows = []
+    budget = 1.0 / weight_monitor.WeightMonitor.PLOT_FPS
+    for rate in rates:
+        monitor = HeadlessMonitor()
+        monitor.resize(800, 600)
+        monitor.show()
+        n = min(int(rate * args.history), monitor.HISTORY_POINTS)
+        t = np.arange(n) / rate / 60.0
+        monitor.plot_data.extend(t, 900.0 - 0.6 * t + 0.3 * np.sin(t * 26))
+        app.processEvents()
+
+        def frame():
+            monitor.update_plot()
+            monitor.plot_widget.grab()
+
+        cost = common.measure(frame, 10)
+        rows.append((rate, n, '%.2f' % (cost * 1e3), '%.1f' % (cost / budget * 100)))
+        monitor.close()
+        monitor.deleteLater()
+        app.processEvents()
+    common.print_table(f'plot：每帧耗时（历史 {args.history:g} 秒，{weight_monitor.WeightMonitor.PLOT_FPS} FPS 预算）',
+                       ('rate/s', 'points', 'ms/frame', 'budget %'), rows)
+
+
+def stage_csv(app, rates, args):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rate in rates:
+            data = device_data(rate, args.seconds)
+            data['time'] += time.time()
+            # SerialReader 每 50 ms 一批
+            step = max(int(rate * 0.05), 1)
+            batches = [data[i:i + step].copy() for i in range(0, len(data), step)]
+            logger = CsvLogger(os.path.join(tmp, f'{rate}.csv'))
+            t0 = time.perf_counter()
+            for batch in batches:
+                logger.write(batch)
+            enqueue = time.perf_counter() - t0
+            logger.close()
+            total = time.perf_counter() - t0
+            throughput = len(data) / total
+            rows.append((rate, len(data), '%.2f' % (enqueue / len(batches) * 1e6), '%.0f' % throughput,
+                         '%.2f' % (rate / throughput * 100)))
+    common.print_table('csv：CsvLogger', ('rate/s', 'rows', 'enqueue us/batch', 'rows/s', 'load %'), rows)
+
+
+def stage_e2e(app, rates, args):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rate in rates:
+            path = os.path.join(tmp, f'{rate}.csv')
+            monitor, replayer, logger = run_live(app, rate, args.seconds, args.format, path)
+            with open(path, encoding='utf-8') as f:
+                on_disk = sum(1 for _ in f) - 1
+            rows.append((rate, replayer.records, on_disk, monitor.link_stats.dropped) +
+                        percentiles(logger.latencies))
+    common.print_table(f'e2e：设备时间戳 -> 落盘（{args.format}，毫秒；CsvLogger 每 500 行或 1 秒刷新）',
+                       ('rate/s', 'sent', 'on disk', 'dropped', 'p50', 'p99', 'max'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stage', action='append', choices=STAGES, help='只运行指定的段，可重复；缺省全部')
+    parser.add_argument('--rates', type=int, nargs='+', default=[10, 80, 320, 1280, 5120], help='输入速率（样本/秒）')
+    parser.add_argument('--seconds', type=float, default=3.0, help='每档速率的模拟时长（秒）')
+    parser.add_argument('--history', type=float, default=600, help='plot 段的历史长度（秒）')
+    parser.add_argument('--format', choices=('text', 'frames'), default='text', help='hop/e2e 段模拟秤的输出格式')
+    args = common.parse_args(parser)
+
+    app = QApplication.instance() or QApplication([])
+    stages = {'parse': stage_parse, 'hop': stage_hop, 'plot': stage_plot, 'csv': stage_csv, 'e2e': stage_e2e}
+    for name in args.stage or STAGES:
+        stages[name](app, args.rates, args)
+
+
+if __name__ == '__main__':
+    main()
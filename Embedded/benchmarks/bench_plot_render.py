@@ -0,0 +1,98 @@
+"""
+绘图每帧耗时 与 历史长度 的关系（offscreen）。
+
+对比直接 setData 全部历史 与 按像素宽度做最大/最小值降采样后再 setData，
+每帧包含一次 grab() 强制渲染。另外把视图放大到最后 1% 的时间段，核对只对可见段降采样时
+可见范围内的点数仍与像素宽度相当，且可见段的最小/最大值都画了出来。
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import time
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtWidgets import QApplication
+
+import common
+from plot_buffer import PlotBuffer, decimate_minmax, decimate_view
+
+
+def frame_time(widget, curve, buf, decimate, frames):
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        x = buf.column(0)
+        y = buf.column(1)
+        if decimate:
+            bins = max(int(widget.getPlotItem().getViewBox().width()), 100)
+            x, y = decimate_minmax(x, y, bins)
+        curve.setData(x, y)
+        widget.grab()
+    return (time.perf_counter() - t0) / frames
+
+
+def check_zoom(widget, buf, frames):
+    """放大到最后 1% 后，整段降采样与只对可见段降采样的对比"""
+    x = buf.column(0)
+    y = buf.column(1)
+    view = widget.getPlotItem().getViewBox()
+    view.setXRange(x[-1] - (x[-1] - x[0]) * 0.01, x[-1], padding=0)
+    x0, x1 = view.viewRange()[0]
+    bins = max(int(view.width()), 100)
+    visible = (x >= x0) & (x <= x1)
+    rows = []
+    for name, func in (('whole', lambda: decimate_minmax(x, y, bins)),
+                       ('visible', lambda: decimate_view(x, y, (x0, x1), bins))):
+        t = common.measure(func, frames)
+        dx, dy = func()
+        shown = (dx >= x0) & (dx <= x1)
+        kept = dy[shown].min() == y[visible].min() and dy[shown].max() == y[visible].max()
+        rows.append((name, int(np.count_nonzero(visible)), int(np.count_nonzero(shown)), kept, '%.3f' % (t * 1e3)))
+    view.enableAutoRange()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=10, help='每个长度渲染的帧数')
+    parser.add_argument('--lengths', default='1000,10000,100000,1000000', help='历史长度列表')
+    args = common.parse_args(parser)
+
+    app = QApplication.instance() or QApplication([])
+    widget = pg.PlotWidget()
+    widget.resize(800, 400)
+    widget.show()
+    curve = widget.plot([], [], pen=pg.mkPen('b', width=2))
+    widget.enableAutoRange()
+    app.processEvents()
+
+    rows = []
+    rng = np.random.default_rng(0)
+    for n in (int(v) for v in args.lengths.split(',')):
+        buf = PlotBuffer(n)
+        t = np.arange(n) / 80.0 / 60.0  # 80 SPS，单位分钟
+        buf.extend(t, 900 - t * 2 + rng.normal(0, 5, n))
+        full = frame_time(widget, curve, buf, False, args.frames)
+        dec = frame_time(widget, curve, buf, True, args.frames)
+        rows.append((n, '%.2f' % (full * 1e3), '%.2f' % (dec * 1e3)))
+    common.print_table('每帧耗时 ms', ('points', 'full', 'minmax'), rows)
+
+    zoom_rows = check_zoom(widget, buf, args.frames)
+    width = max(int(widget.getPlotItem().getViewBox().width()), 100)
+    rows = []
+    for name, visible, shown, kept, ms in zoom_rows:
+        if name == 'whole':
+            # 原做法作对照，不作判断
+            rows.append((name, visible, shown, 'yes' if kept else 'no', '--', ms))
+        else:
+            rows.append((name, visible, shown, common.verdict(kept, 'zoomed: visible extremes'),
+                         common.verdict(shown >= min(visible, width), f'zoomed: {shown} points drawn'), ms))
+    common.print_table(f'放大到最后 1%（{len(buf)} 点历史）',
+                       ('decimate', 'visible pts', 'drawn pts', 'extremes kept', 'enough pts', 'ms'), rows)
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+固件主循环分段计时（Project/profiler.py）的仿真验证。
+
+在仿真板上运行固件（文本行与二进制帧两种输出）：
+- 打开/关闭计时（关闭时换成空操作的 profiler）各跑一遍，比较每条输出的宿主 CPU 时间，得到计时本身的开销；
+- 通过管道向固件的命令输入写入 "stats"，取回固件打印的分段统计。
+
+仿真里的 ticks_us 是宿主 CPU 时间加上快进的休眠时间，各段占比反映的是 CPython 上的相对开销，
+绝对值与 ESP32 上不同；在设备上用串口发送 "stats" 看真实数值。
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import common
+import sim
+
+
+class NullProfiler:
+    """关闭计时的对照：接口相同，什么都不做"""
+
+    def lap(self, phase):
+        pass
+
+    def add(self, phase, us):
+        pass
+
+    def reset(self):
+        pass
+
+    def elapsed_ms(self):
+        return 0
+
+    def report(self, out=print):
+        pass
+
+
+def run_firmware(sps, binary, seconds, profiled, command=None):
+    board = sim.install()
+    rng = random.Random(1)
+    sim.HX711Chip(board, dout=1, sck=2, source=lambda t: 120000 + rng.randint(-50, 50), rate=sps)
+    sim.HX711Chip(board, dout=8, sck=9, source=lambda t: 80000 + rng.randint(-50, 50), rate=sps)
+    fw = sim.load_firmware('main')
+    fw.BINARY_OUTPUT = binary
+    fw.serial_out = io.BytesIO()
+    if not profiled:
+        fw.prof = NullProfiler()
+        for hx in fw.sensors:
+            hx.profiler = None
+    if command:
+        serial_in = sim.SerialInput()
+        fw.init_commands(serial_in)
+    text = io.StringIO()
+    for hx in fw.sensors:
+        hx.start()
+    fw.prof.reset()
+    end = board.clock.now_us() + int(seconds * 1e6)
+    steps = 0
+    c0 = time.process_time()
+    with contextlib.redirect_stdout(text):
+        while board.clock.now_us() < end:
+            fw.step()
+            steps += 1
+        if command:
+            serial_in.send(command + '\n')
+            for _ in range(10):
+                fw.step()
+            serial_in.close()
+    cpu = time.process_time() - c0
+    lines = text.getvalue().splitlines()
+    outputs = len(fw.serial_out.getvalue()) // fw.protocol.FRAME_SIZE if binary else \
+        sum(1 for line in lines if line.startswith('Weight:'))
+    stats = [line for line in lines if line.startswith('Stats:')]
+    return steps, outputs, cpu, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=20, help='仿真时长（虚拟秒）')
+    parser.add_argument('--sps', type=int, default=80, help='HX711 模型的转换速率')
+    args = common.parse_args(parser)
+
+    rows = []
+    for binary in (False, True):
+        mode = 'binary' if binary else 'text'
+        costs = {}
+        for profiled in (False, True):
+            steps, outputs, cpu, _ = run_firmware(args.sps, binary, args.seconds, profiled)
+            costs[profiled] = (cpu / steps, cpu / outputs)
+            rows.append((mode, 'on' if profiled else 'off', steps, outputs, '%.3f' % cpu,
+                         '%.1f' % (cpu / steps * 1e6), '%.1f' % (cpu / outputs * 1e6)))
+        rows.append((mode, 'overhead', '', '', '',
+                     '%+.1f' % ((costs[True][0] - costs[False][0]) * 1e6),
+                     '%+.1f' % ((costs[True][1] - costs[False][1]) * 1e6)))
+    common.print_table(f'仿真固件 {args.seconds:g} 虚拟秒，{args.sps} SPS（宿主 CPU 时间）',
+                       ('output', 'profiler', 'steps', 'outputs', 'cpu s', 'us/step', 'us/output'), rows)
+
+    for binary in (False, True):
+        _, _, _, stats = run_firmware(args.sps, binary, args.seconds, True, command='stats')
+        print(f"'stats' 命令（{'binary' if binary else 'text'} 输出）：")
+        print('\n'.join(stats) if stats else '  没有收到 Stats 输出')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+HX711 移位读取路径对比：basic / cached / viper（见 Project/main.py 的 READ_* 常量）。
+
+在仿真引脚上运行固件里的 HX711/DualHX711（芯片读完立即就绪），对每种路径：
+- 核对读数与芯片模型给出的原始值一致；
+- 统计每次转换的耗时（us）与引脚写入次数。
+另外模拟没有 native 代码发射器的固件（hx711_fast 导入失败）：main.py 仍能导入，
+cached 退回纯 Python 写法且读数正确，viper 在构造时报错。
+
+仿真里 viper 路径的寄存器访问由 Python 对象模拟、装饰器不生效，这里的耗时只反映
+CPython 上的相对开销；在 ESP32-C3 上改 main.py 的 READ_MODE，串口发送 "stats"，
+irq 一行的 avg 就是设备上每次转换的移位耗时。
+"""
+import argparse
+import random
+import sys
+
+import common
+import sim
+
+MODES = ('basic', 'cached', 'viper')
+
+
+def expected(value):
+    # 固件把 24 位补码按最高位取反输出
+    return (value & 0xFFFFFF) ^ 0x800000
+
+
+def load(native):
+    """重新导入固件；native=False 时让 hx711_fast 导入失败"""
+    board = sim.install()
+    if native:
+        return board, sim.load_firmware('main')
+    sys.modules['hx711_fast'] = None
+    try:
+        return board, sim.load_firmware('main')
+    finally:
+        del sys.modules['hx711_fast']
+
+
+def bench_single(mode, repeat, native=True):
+    board, fw = load(native)
+    rng = random.Random(1)
+    values = []
+
+    def source(t):
+        v = rng.randint(-(1 << 23), (1 << 23) - 1)
+        values.append(v)
+        return v
+
+    sim.HX711Chip(board, dout=20, sck=21, source=source, rate=None)
+    hx = fw.HX711(data_pin=20, clock_pin=21, read_mode=mode)
+    got = []
+    writes0 = board.line(21).writes
+    t = common.measure(lambda: got.append(hx.read_count()), repeat)
+    writes = (board.line(21).writes - writes0) / repeat
+    ok = all(g == expected(v) for g, v in zip(got, values))
+    return t, writes, ok
+
+
+def bench_dual(mode, repeat, native=True):
+    board, fw = load(native)
+    rng = random.Random(2)
+    values = ([], [])
+
+    def make_source(k):
+        def source(t):
+            v = rng.randint(-(1 << 23), (1 << 23) - 1)
+            values[k].append(v)
+            return v
+        return source
+
+    sim.HX711Chip(board, dout=20, sck=21, source=make_source(0), rate=None)
+    sim.HX711Chip(board, dout=22, sck=21, source=make_source(1), rate=None)
+    dual = fw.DualHX711(data_pin=20, data_pin2=22, clock_pin=21, read_mode=mode)
+    got = []
+    t = common.measure(lambda: got.append(tuple(dual.read_pair())), repeat)
+    ok = all(g == (expected(a), expected(b)) for g, a, b in zip(got, values[0], values[1]))
+    return t, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=2000, help='每种路径的读取次数')
+    args = common.parse_args(parser)
+
+    rows = []
+    for mode, native in [(mode, True) for mode in MODES] + [('cached', False)]:
+        t, writes, ok = bench_single(mode, args.repeat, native)
+        t_dual, ok_dual = bench_dual(mode, args.repeat, native)
+        name = mode if native else mode + ' (no native)'
+        rows.append((name, '%.1f' % (t * 1e6), '%.0f' % writes, common.verdict(ok, f'{name} single'),
+                     '%.1f' % (t_dual * 1e6), common.verdict(ok_dual, f'{name} dual')))
+    common.print_table('移位读取路径（仿真引脚，宿主 CPU 时间）',
+                       ('mode', 'us/conv', 'sck writes', 'match', 'dual us/pair', 'dual match'), rows)
+    board, fw = load(False)
+    try:
+        fw.HX711(data_pin=20, clock_pin=21, read_mode='viper')
+        rejected = False
+    except ValueError:
+        rejected = True
+    print(f"无 native 代码发射器时 viper 读取方式被拒绝: {common.verdict(rejected, 'viper without native')}")
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
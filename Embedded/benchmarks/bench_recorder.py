@@ -0,0 +1,123 @@
+"""
+无界面记录程序（recorder.py）的 pty 对测试。
+
+1. 导入检查：recorder 不应导入 PyQt5 / pyqtgraph，并测量从启动到开始记录的时间；
+2. 多秤记录：N 个 pty 模拟秤按给定速率输出 "Weight:" 行，结束后统计各文件行数，
+   核对无丢行，并给出记录进程的 CPU 占用；按行数切分验证文件轮转。
+"""
+import argparse
+import glob
+import os
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tty
+
+import common
+
+RECORDER = os.path.join(common.EMBEDDED_DIR, 'recorder.py')
+
+
+def import_check():
+    code = ("import sys, time; t = time.perf_counter(); import recorder; "
+            "print(time.perf_counter() - t); "
+            "print(','.join(sorted({m.split('.')[0] for m in sys.modules} & {'PyQt5', 'pyqtgraph'})))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=common.EMBEDDED_DIR,
+                         capture_output=True, text=True, check=True).stdout.split('\n')
+    return float(out[0]), out[1] or '无'
+
+
+def feed(master, rate, duration, stop):
+    # 按时间补齐应写出的行，写满时阻塞在 os.write 上
+    t0 = time.perf_counter()
+    sent = 0
+    while not stop.is_set():
+        elapsed = time.perf_counter() - t0
+        if elapsed >= duration:
+            break
+        due = int(elapsed * rate)
+        if due > sent:
+            os.write(master, b''.join(b'Weight: %.2f\r\n' % (800 + (i % 1000) * 0.01) for i in range(sent, due)))
+            sent = due
+        time.sleep(0.005)
+    return sent
+
+
+def count_rows(directory):
+    rows = 0
+    files = sorted(glob.glob(os.path.join(directory, '*.csv')))
+    for path in files:
+        with open(path, 'rb') as f:
+            rows += f.read().count(b'\n') - 1
+    return rows, len(files)
+
+
+def run_case(devices, rate, duration, rotate_rows):
+    ptys = []
+    for _ in range(devices):
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        ptys.append((master, slave))
+    with tempfile.TemporaryDirectory() as out_dir:
+        specs = [f"scale{i}={os.ttyname(slave)}" for i, (_, slave) in enumerate(ptys)]
+        usage0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+        t0 = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, RECORDER, *specs, '-o', out_dir, '--status', '0',
+                                 '--rotate-rows', str(rotate_rows)],
+                                cwd=common.EMBEDDED_DIR, stdout=subprocess.PIPE, text=True)
+        for line in proc.stdout:
+            if line.startswith('开始记录'):
+                break
+        startup = time.perf_counter() - t0
+
+        stop = threading.Event()
+        sent = [0] * devices
+
+        def writer(i):
+            sent[i] = feed(ptys[i][0], rate, duration, stop)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(devices)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        time.sleep(0.5)  # 等记录进程读完 pty 中剩余数据
+        proc.send_signal(signal.SIGINT)
+        proc.communicate(timeout=30)
+        usage1 = resource.getrusage(resource.RUSAGE_CHILDREN)
+        rows, files = count_rows(out_dir)
+    for master, slave in ptys:
+        os.close(master)
+        os.close(slave)
+    cpu = (usage1.ru_utime + usage1.ru_stime) - (usage0.ru_utime + usage0.ru_stime)
+    return startup, sum(sent), rows, files, cpu / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--rates', type=float, nargs='+', default=[80, 1000], help='每台秤每秒行数')
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = common.parse_args(parser)
+
+    seconds, qt = import_check()
+    print(f"import recorder: {seconds * 1000:.0f} ms，已导入的 GUI 模块: {qt}")
+
+    rows = []
+    for devices in args.devices:
+        for rate in args.rates:
+            rotate_rows = max(int(rate * args.duration / 3), 1)
+            startup, sent, logged, files, cpu = run_case(devices, rate, args.duration, rotate_rows)
+            rows.append((devices, int(rate), '%.0f' % (startup * 1000), sent, logged,
+                         'yes' if sent == logged else 'no', files, '%.1f%%' % (cpu * 100)))
+    common.print_table('多秤记录（pty）',
+                       ('devices', 'lines/s', 'startup ms', 'sent', 'logged', 'match', 'files', 'cpu'),
+                       rows)
+
+
+if __name__ == '__main__':
+    main()
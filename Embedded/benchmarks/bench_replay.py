@@ -0,0 +1,165 @@
+"""
+记录回放（replay.py）驱动的上位机管线回归测试。
+
+Test/*.csv 经 replay 写进 pty，上位机一侧与 WeightMonitor 相同：pyserial 读取 → SampleCollector 解析
+→ 中值+卡尔曼滤波 → ConsumptionEstimator（按设备时间）→ LinkStats。
+
+- 尽快回放（--speed 0）的吞吐量：文本行与二进制帧，每秒处理的样本数；
+- 准确度：收到的重量与记录逐点比较，无丢帧；估计器的结果与直接在记录上离线计算的一致，
+  说明经过串口、按任意倍速回放都不改变结果；
+- 定时：按 N 倍速回放时，样本到达上位机的时刻相对计划时刻的偏差。
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+import common
+import filters
+import replay
+from estimator import ConsumptionEstimator
+from link_stats import LinkStats
+from sample_source import SampleCollector
+
+import serial
+
+TICKS_PERIOD = 1 << 30
+
+
+class Pipeline:
+    """WeightMonitor.handle_batch 去掉界面后的处理"""
+
+    def __init__(self):
+        self.weight_filter = filters.FilterChain(filters.MovingMedian(5), filters.Kalman(0.01, 4.0))
+        self.estimator = ConsumptionEstimator(window=600, interval=1.0)
+        self.link_stats = LinkStats()
+        self.weights = []
+        self.arrivals = []
+        self.device_s = []
+        self._last_us = None
+        self._elapsed_us = 0
+
+    def handle_batch(self, batch):
+        update = self.weight_filter.update
+        filtered = [update(w) for w in batch['weight'].tolist()]
+        estimate = self.estimator.update
+        for us, w in zip(batch['device_us'].tolist(), filtered):
+            # 设备时间按 2**30 回绕，展开成开机后的秒数
+            if self._last_us is not None:
+                self._elapsed_us += (us - self._last_us) % TICKS_PERIOD
+            self._last_us = us
+            t = self._elapsed_us / 1e6
+            self.device_s.append(t)
+            estimate(t, w)
+        self.link_stats.update(batch)
+        self.weights.extend(batch['weight'].tolist())
+        self.arrivals.extend(batch['time'].tolist())
+
+
+def replay_through_pty(data, fmt, speed, loops=1):
+    """回放到 pty，由 pyserial 读取并送入 Pipeline；返回 (pipeline, replayer, 墙钟秒数)"""
+    write, port, _ = replay.open_pty()
+    pipeline = Pipeline()
+    collector = SampleCollector(pipeline.handle_batch, batch_interval=0.02)
+    ser = serial.Serial(port, timeout=collector.batch_interval)
+    replayer = replay.Replayer(data, fmt, speed)
+    expected = len(data) * loops
+    writer = threading.Thread(target=replayer.run, args=(write, loops))
+    t0 = time.perf_counter()
+    writer.start()
+    while collector.samples < expected:
+        # 与 SerialReader.run 相同：阻塞到至少 1 字节，再读出已到达的全部
+        chunk = ser.read(ser.in_waiting or 1)
+        if chunk:
+            collector.feed(chunk)
+        elif not writer.is_alive():
+            break  # 写完且读空：有样本没到
+    collector.flush()
+    elapsed = time.perf_counter() - t0
+    writer.join()
+    ser.close()
+    return pipeline, replayer, elapsed
+
+
+def offline_estimate(data):
+    chain = filters.FilterChain(filters.MovingMedian(5), filters.Kalman(0.01, 4.0))
+    est = ConsumptionEstimator(window=600, interval=1.0)
+    t0 = data['time'][0]
+    for t, w in zip(data['time'].tolist(), data['weight'].tolist()):
+        est.update(t - t0, chain.update(w))
+    return est.estimate()
+
+
+def throughput(data, loops):
+    rows = []
+    for fmt in ('text', 'frames'):
+        pipeline, replayer, elapsed = replay_through_pty(data, fmt, 0, loops)
+        n = len(pipeline.weights)
+        rows.append((fmt, n, replayer.bytes, '%.0f' % (n / elapsed), '%.2f' % (replayer.bytes / elapsed / 1e6),
+                     pipeline.link_stats.dropped))
+    common.print_table(f'尽快回放：全部 Test 记录 × {loops} 轮，pty → pyserial → 滤波/估计/链路统计',
+                       ('format', 'samples', 'bytes', 'samples/s', 'MB/s', 'dropped'), rows)
+
+
+def accuracy(paths):
+    rows = []
+    for path in paths:
+        data = replay.load(path)
+        offline = offline_estimate(data)
+        for fmt in ('text', 'frames'):
+            pipeline, _, _ = replay_through_pty(data, fmt, 0)
+            got = np.array(pipeline.weights)
+            diff = np.abs(got - data['weight'][:len(got)]).max() if len(got) else float('nan')
+            live = pipeline.estimator.estimate()
+            if offline is None or live is None:
+                same = 'both none' if offline is live else 'MISMATCH'
+                rate = '--'
+            else:
+                same = '%.1e' % abs(live[0] - offline[0])
+                rate = '%.2f' % live[0]
+            rows.append((os.path.basename(path), fmt, f'{len(got)}/{len(data)}', '%.1e' % diff,
+                         pipeline.link_stats.dropped, rate, same))
+    common.print_table('逐点比较（重量差，克）与消耗速率（g/min，回放 vs 离线）',
+                       ('trace', 'format', 'received', 'max diff', 'dropped', 'rate', 'rate diff'), rows)
+
+
+def pacing(data, speeds, wall_seconds):
+    rows = []
+    t = data['time'] - data['time'][0]
+    for speed in speeds:
+        part = data[t <= wall_seconds * speed]
+        pipeline, replayer, elapsed = replay_through_pty(part, 'text', speed)
+        # 到达时刻（SampleCollector 打的上位机时间）对齐第一个样本后，与计划时刻相减
+        arrivals = np.array(pipeline.arrivals)
+        planned = (part['time'] - part['time'][0])[:len(arrivals)] / speed
+        late = (arrivals - arrivals[0]) - planned
+        rows.append(('%gx' % speed, len(part), '%.2f' % elapsed, '%.1f' % (np.median(np.abs(late)) * 1e3),
+                     '%.1f' % (np.abs(late).max() * 1e3), '%.1f' % (replayer.max_late * 1e3)))
+    common.print_table('按倍速回放的定时（到达时刻 - 计划时刻，毫秒）',
+                       ('speed', 'samples', 'wall s', 'median', 'max', 'writer late'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loops', type=int, default=10, help='吞吐量测试的回放轮数')
+    parser.add_argument('--pacing-seconds', type=float, default=2.0, help='定时测试每个倍速的墙钟秒数')
+    args = common.parse_args(parser)
+
+    paths = common.traces()
+    sessions = [replay.load(path) for path in paths]
+    # 拼接后时间保持递增：每段接在前一段之后 1 秒
+    offset = 0.0
+    for seg in sessions:
+        seg['time'] += offset - seg['time'][0]
+        offset = seg['time'][-1] + 1.0
+    data = np.concatenate(sessions)
+
+    throughput(data, args.loops)
+    accuracy(paths)
+    pacing(replay.load(os.path.join(common.TEST_DIR, '动态测试_pcb盒子.csv')), (1, 10, 100), args.pacing_seconds)
+
+
+if __name__ == '__main__':
+    main()
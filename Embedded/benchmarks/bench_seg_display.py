@@ -0,0 +1,209 @@
+"""
+数码管动态扫描（Project/seg_driver.py）的仿真引脚基准。
+
+- 每位刷新的开销：定时器中断 SegDisplay._refresh 与原 run_display 每位的引脚操作
+  （set_digit + 经字典的 set_segments + 关位，去掉 sleep_ms(5)）对比，宿主 CPU 时间与引脚写入次数；
+- 正确性：每次刷新后按引脚电平解码，恰好一位点亮，且段码与显示内容一致；
+- 定时器扫描：主循环按 1 ms 节拍运行并每 100 ms 改一次内容，统计虚拟时间里的实际整屏刷新率与帧间隔抖动；
+- 接入固件：sim.run 跑 main.py 的完整主循环，比较开/关数码管时的采集吞吐量（读取、漏读、输出的样本数、
+  每秒主循环次数），以及显示的整屏刷新率与重新格式化的次数。
+
+耗时是 CPython 上的相对值；设备上的绝对值可以在中断里用 ticks_us 计时得到。
+"""
+import argparse
+
+import common
+import sim
+import protocol
+
+CONTENTS = ('1234', '8888', '12.34', '-5.0')
+
+
+def load_driver():
+    board = sim.install()
+    return board, sim.load_firmware('seg_driver')
+
+
+class LegacyScan:
+    """原 run_display 每一位的引脚操作"""
+
+    def __init__(self, seg, text):
+        machine = sim.machine
+        names = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'DP')
+        self.segments = {name: machine.Pin(p, machine.Pin.OUT) for name, p in zip(names, seg.SEGMENT_PINS)}
+        self.digits = [machine.Pin(p, machine.Pin.OUT) for p in seg.DIGIT_PINS]
+        self.digit_to_segments = {
+            ch: [name for k, name in enumerate(names[:7]) if mask >> k & 1] for ch, mask in seg.CHAR_SEGMENTS.items()
+        }
+        chars = []
+        for ch in text:
+            if ch == '.' and chars:
+                chars[-1] = (chars[-1][0], True)
+            else:
+                chars.append((ch, False))
+        self.current_display = [(' ', False)] * (4 - len(chars)) + chars[-4:]
+        self.index = 0
+
+    def set_segments(self, digit_char, dp=False):
+        for s in self.segments.values():
+            s.on()
+        for s in self.digit_to_segments.get(digit_char, []):
+            self.segments[s].off()
+        if dp:
+            self.segments['DP'].off()
+        else:
+            self.segments['DP'].on()
+
+    def set_digit(self, index):
+        for d in self.digits:
+            d.off()
+        if 0 <= index < len(self.digits):
+            self.digits[index].on()
+
+    def step(self):
+        i = self.index
+        self.set_digit(i)
+        char, dp = self.current_display[i]
+        self.set_segments(char, dp)
+        self.digits[i].off()
+        self.index = (i + 1) % 4
+
+
+def pin_writes(board, seg):
+    return sum(board.line(p).writes for p in seg.SEGMENT_PINS + seg.DIGIT_PINS)
+
+
+def expected_masks(seg, display):
+    # show() 存的是引脚电平，异或回段码
+    return [level ^ display._segment_invert for level in display._levels]
+
+
+def decode(board, seg, display):
+    """按当前引脚电平返回 (点亮的位列表, 段码)"""
+    lit = [i for i, p in enumerate(seg.DIGIT_PINS) if board.line(p).level == seg.DIGIT_ACTIVE]
+    mask = 0
+    for k, p in enumerate(seg.SEGMENT_PINS):
+        if board.line(p).level == seg.SEGMENT_ACTIVE:
+            mask |= 1 << k
+    return lit, mask
+
+
+def bench_refresh(repeat):
+    rows = []
+    for text in CONTENTS:
+        board, seg = load_driver()
+        display = seg.SegDisplay()
+        display.show(text)
+        masks = expected_masks(seg, display)
+        ok = True
+        for _ in range(4 * 4):
+            display._refresh(None)
+            lit, mask = decode(board, seg, display)
+            ok = ok and lit == [display._index] and mask == masks[display._index]
+        refresh = display._refresh
+        w0 = pin_writes(board, seg)
+        t = common.measure(lambda: refresh(None), repeat)
+        writes = (pin_writes(board, seg) - w0) / repeat
+        rows.append((text, 'timer isr', '%.2f' % (t * 1e6), '%.1f' % writes, common.verdict(ok, f'decode {text}')))
+
+        board, seg = load_driver()
+        legacy = LegacyScan(seg, text)
+        w0 = pin_writes(board, seg)
+        t = common.measure(legacy.step, repeat)
+        writes = (pin_writes(board, seg) - w0) / repeat
+        rows.append((text, 'run_display', '%.2f' % (t * 1e6), '%.1f' % writes, '--'))
+    common.print_table('每位刷新的开销（仿真引脚，宿主 CPU 时间）',
+                       ('content', 'path', 'us/digit', 'pin writes/digit', 'decoded ok'), rows)
+
+
+def bench_timer(refresh_rates, seconds):
+    rows = []
+    for hz in refresh_rates:
+        board, seg = load_driver()
+        clock = board.clock
+        display = seg.SegDisplay(refresh_hz=hz)
+        frames = []
+        board.line(seg.DIGIT_PINS[0]).listen(lambda level: level == seg.DIGIT_ACTIVE and frames.append(clock.now_us()))
+        display.show('0')
+        display.start()
+        t = sim.time
+        t0 = t.ticks_ms()
+        count = 0
+        while t.ticks_diff(t.ticks_ms(), t0) < seconds * 1000:
+            # 主循环：1 ms 节拍，每 100 ms 换一次内容
+            t.sleep_ms(1)
+            count += 1
+            if count % 100 == 0:
+                display.show(count // 100)
+        display.stop()
+        gaps = [b - a for a, b in zip(frames, frames[1:])]
+        period = 1e6 / hz
+        mean_hz = 1e6 * len(gaps) / sum(gaps) if gaps else 0
+        jitter = max(abs(g - period) for g in gaps) if gaps else 0
+        rows.append((hz, display._timer.fired, len(frames), '%.1f' % mean_hz, '%.0f' % jitter, count))
+    common.print_table(f'定时器扫描：{seconds:g} 秒虚拟时间，主循环 1 ms 节拍',
+                       ('target Hz', 'isr ticks', 'frames', 'frame Hz', 'max jitter us', 'loop iters'), rows)
+
+
+# 仿真里避开固件其他引脚（HX711 1/2/8/9、按键 10、LED 12/13）的接线
+SIM_SEGMENT_PINS = (0, 3, 4, 5, 6, 7, 18, 19)
+SIM_DIGIT_PINS = (20, 21, 14, 15)
+
+
+def count_samples(data):
+    """串口输出里的样本数（文本重量行与二进制帧）"""
+    lines = []
+    parser = protocol.StreamParser(lambda *frame: None, lambda line: lines.append(line))
+    parser.feed(bytes(data))
+    return parser.frames + sum(1 for line in lines if protocol.parse_weight_fields(line) is not None)
+
+
+def bench_acquisition(seconds):
+    rows = []
+    for rate in (10, 80):
+        for binary in (False, True):
+            for enabled in (False, True):
+                shows = []
+
+                def setup(fw):
+                    fw.DISPLAY_ENABLED = enabled
+                    fw.DISPLAY_SEGMENT_PINS = SIM_SEGMENT_PINS
+                    fw.DISPLAY_DIGIT_PINS = SIM_DIGIT_PINS
+                    fw.init_display()
+                    if fw.display is not None:
+                        show = fw.display.show
+                        fw.display.show = lambda *a: shows.append(a) or show(*a)
+
+                uart = sim.Uart()
+                fw, stats = sim.run(sim.LoadCells(sim.Constant(500) + sim.Vibration([(0.5, 3.0)])), seconds, rate, binary,
+                                    uart, setup=setup)
+                samples = count_samples(uart.output)
+                if fw.display is not None:
+                    fw.display.stop()
+                    frame_hz = '%.1f' % (fw.display._timer.fired / fw.display.digits / stats.virtual_s)
+                    formats = len(shows)
+                else:
+                    frame_hz = formats = '-'
+                rows.append((rate, 'binary' if binary else 'text', 'on' if enabled else 'off', stats.reads,
+                             stats.missed, samples, '%.0f' % (stats.steps / stats.wall_s), frame_hz, formats))
+    common.print_table(f'固件主循环开/关数码管（{seconds:g} 虚拟秒，振动 0.5 Hz 3 g）',
+                       ('sps', 'output', 'display', 'reads', 'missed', 'samples', 'step/s', 'frame Hz', 'formats'),
+                       rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20000, help='每种路径的刷新次数')
+    parser.add_argument('--seconds', type=float, default=2.0, help='定时器扫描的虚拟时长')
+    parser.add_argument('--refresh', type=int, nargs='+', default=[60, 125, 250], help='整屏刷新率（Hz）')
+    parser.add_argument('--run-seconds', type=float, default=30.0, help='固件主循环的虚拟时长')
+    args = common.parse_args(parser)
+
+    bench_refresh(args.repeat)
+    bench_timer(args.refresh, args.seconds)
+    bench_acquisition(args.run_seconds)
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
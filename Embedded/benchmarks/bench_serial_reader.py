@@ -0,0 +1,125 @@
+"""
+SerialReader 读取方式对比（pty 对模拟串口设备）。
+
+  polling   改造前：查 in_waiting，无数据时 sleep(10 ms)
+  blocking  现在：read 阻塞在文件描述符上（超时 = 批间隔），数据一到即读出
+
+写端按给定速率写 "Weight:" 行，行内数值是发送时刻（秒，对 100 取模），
+读端解析出样本时与之相减得到每行的读取延迟（不含批量发送的等待）。
+另测空闲（无数据）时进程的 CPU 占用与读循环每秒唤醒次数。
+"""
+import argparse
+import os
+import threading
+import time
+import tty
+
+import numpy as np
+
+import common
+import weight_monitor
+
+
+class PollingReader(weight_monitor.SerialReader):
+    """改造前的轮询读取循环，作为对照"""
+
+    def run(self):
+        self.ser = weight_monitor.serial.Serial(self.port, self.baudrate, timeout=1)
+        collector = self.collector
+        while self.running:
+            waiting = self.ser.in_waiting
+            if waiting:
+                collector.feed(self.ser.read(waiting))
+            else:
+                time.sleep(0.01)
+                collector.feed(b'')
+        collector.flush()
+        self.ser.close()
+
+
+class CountingSerial:
+    """包装串口对象，用 in_waiting 的访问次数统计读循环的唤醒次数"""
+
+    def __init__(self, ser):
+        self._ser = ser
+        self.wakeups = 0
+
+    @property
+    def in_waiting(self):
+        self.wakeups += 1
+        return self._ser.in_waiting
+
+    def __getattr__(self, name):
+        return getattr(self._ser, name)
+
+
+def run_case(cls, rate, duration, idle):
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    reader = cls(os.ttyname(slave))
+    latencies = []
+    # 不经过 Qt 信号，直接在读线程里收批
+    reader.collector.on_batch = lambda batch: latencies.append(
+        (batch['time'] % 100) - batch['weight'].astype(float))
+    serial_class = weight_monitor.serial.Serial
+    counters = []
+
+    def make_serial(*args, **kwargs):
+        ser = CountingSerial(serial_class(*args, **kwargs))
+        counters.append(ser)
+        return ser
+
+    weight_monitor.serial.Serial = make_serial
+    thread = threading.Thread(target=reader.run)
+    thread.start()
+    time.sleep(0.2)
+    weight_monitor.serial.Serial = serial_class
+    ser = counters[0]
+
+    # 空闲阶段
+    wakeups0 = ser.wakeups
+    c0 = time.process_time()
+    time.sleep(idle)
+    idle_cpu = (time.process_time() - c0) / idle
+    idle_wakeups = (ser.wakeups - wakeups0) / idle
+
+    # 负载阶段：按速率逐行写入
+    t0 = time.perf_counter()
+    sent = 0
+    while True:
+        elapsed = time.perf_counter() - t0
+        if elapsed >= duration:
+            break
+        if int(elapsed * rate) > sent:
+            os.write(master, b'Weight: %.5f\r\n' % (time.time() % 100))
+            sent += 1
+        time.sleep(0.0002)
+    time.sleep(0.2)
+    reader.stop()
+    thread.join()
+    os.close(master)
+    os.close(slave)
+
+    lat = np.concatenate(latencies) * 1000
+    lat[lat < 0] += 100000
+    return sent, len(lat), idle_cpu, idle_wakeups, np.median(lat), np.percentile(lat, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rate', type=float, default=80, help='每秒行数')
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--idle', type=float, default=2.0, help='空闲测量时长（秒）')
+    args = common.parse_args(parser)
+
+    rows = []
+    for name, cls in (('polling', PollingReader), ('blocking', weight_monitor.SerialReader)):
+        sent, got, idle_cpu, idle_wakeups, p50, p99 = run_case(cls, args.rate, args.duration, args.idle)
+        rows.append((name, sent, got, '%.2f%%' % (idle_cpu * 100), '%.0f' % idle_wakeups,
+                     '%.2f' % p50, '%.2f' % p99))
+    common.print_table(f'SerialReader，{args.rate:g} 行/秒',
+                       ('reader', 'sent', 'parsed', 'idle cpu', 'idle wakeups/s', 'p50 ms', 'p99 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+仿真器上的固件端到端吞吐量与准确度（sim.run + sim.LoadCells + 虚拟串口）。
+
+- 吞吐量：10/80 SPS × 文本/二进制 × 115200 波特率/不限速，比较快进倍数、每秒主循环次数、
+  漏读的转换与串口字节率；
+- 准确度：静态、上电漂移、振动、回放记录四种重量信号，固件输出与真实重量之差；
+- 虚拟串口：固件写到 pty，上位机一侧用 pyserial 打开从端，经 SampleCollector 解析，
+  核对收到的样本数与固件发出的一致。
+"""
+import argparse
+import os
+import threading
+
+import numpy as np
+
+import common
+import sim
+import protocol
+from sample_source import SampleCollector
+
+
+# 静态信号的输出与真实重量的最大允许偏差（克）
+STATIC_TOLERANCE = 1.0
+
+
+def parse_output(data):
+    """解析捕获的串口输出，返回 (ticks_us, 重量) 数组"""
+    ticks = []
+    weights = []
+
+    def on_line(line):
+        fields = protocol.parse_weight_fields(line)
+        if fields is not None and fields[1] >= 0:
+            weights.append(fields[0])
+            ticks.append(fields[2])
+
+    def on_frame(seq, timestamp_us, raw1, raw2, weight):
+        ticks.append(timestamp_us)
+        weights.append(weight)
+
+    parser = protocol.StreamParser(on_frame, on_line)
+    parser.feed(bytes(data))
+    return np.array(ticks, dtype=float), np.array(weights)
+
+
+def throughput(seconds):
+    rows = []
+    for rate in (10, 80):
+        for binary in (False, True):
+            for baud in (115200, None):
+                cells = sim.LoadCells(500)
+                _, stats = sim.run(cells, seconds, rate, binary, sim.Uart(baudrate=baud, capture=False))
+                rows.append((rate, 'binary' if binary else 'text', baud or '-', '%.1f' % stats.speedup,
+                             '%.0f' % (stats.steps / stats.wall_s), stats.missed,
+                             '%.0f' % (stats.bytes / stats.virtual_s)))
+    common.print_table(f'吞吐量（{seconds:g} 虚拟秒）',
+                       ('sps', 'output', 'baud', 'speedup', 'step/s', 'missed', 'B/s'), rows)
+
+
+def accuracy(seconds):
+    trace = os.path.join(common.TEST_DIR, '动态测试_pcb盒子.csv')
+    signals = [
+        ('静态 500 g', sim.Constant(500)),
+        ('漂移 2 g/240 s', sim.Constant(500) + sim.Drift(2.0, 240)),
+        ('振动 2 Hz 0.8 g', sim.Constant(500) + sim.Vibration([(2.0, 0.8)])),
+        ('回放 pcb盒子', sim.Trace.from_csv(trace)),
+    ]
+    rows = []
+    for name, signal in signals:
+        for binary in (False, True):
+            uart = sim.Uart()
+            sim.run(sim.LoadCells(signal), seconds, 10, binary, uart)
+            ticks, weights = parse_output(uart.output)
+            truth = np.array([signal(t / 1e6) for t in ticks])
+            err = weights - truth
+            # 前 5 秒是滤波器的启动过程
+            steady = ticks >= 5e6
+            worst = np.abs(err[steady]).max()
+            fmt = 'binary' if binary else 'text'
+            ok = '--'
+            if isinstance(signal, sim.Constant):
+                # 静态信号的输出应与真实重量一致（噪声只有几个计数）
+                ok = common.verdict(worst < STATIC_TOLERANCE, f'{name} {fmt}: max error {worst:.3f} g')
+            rows.append((name, fmt, len(ticks), '%+.3f' % err[steady].mean(),
+                         '%.3f' % err[steady].std(), '%.3f' % worst, ok))
+    common.print_table(f'准确度（{seconds:g} 虚拟秒，10 SPS，输出 - 真实重量，克）',
+                       ('signal', 'output', 'samples', 'mean', 'std', 'max', f'< {STATIC_TOLERANCE:g} g'), rows)
+
+
+def pty_roundtrip(seconds):
+    import serial
+
+    rows = []
+    for binary in (False, True):
+        uart = sim.PtyUart(capture=True)
+        received = []
+        collector = SampleCollector(received.append)
+        port = serial.Serial(uart.port, timeout=0.05)
+        done = threading.Event()
+
+        def reader():
+            while True:
+                data = port.read(4096)
+                if data:
+                    collector.feed(data)
+                elif done.is_set():
+                    break
+            collector.flush()
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            _, stats = sim.run(sim.LoadCells(500), seconds, 80, binary, uart)
+        finally:
+            done.set()
+            thread.join()
+            port.close()
+            uart.close()
+        sent = len(parse_output(uart.output)[0])
+        got = sum(len(b) for b in received)
+        fmt = 'binary' if binary else 'text'
+        rows.append((fmt, '%.1f' % stats.speedup, sent, got, stats.dropped,
+                     common.verdict(sent == got and not stats.dropped,
+                                    f'pty {fmt}: sent {sent}, received {got}, dropped {stats.dropped} bytes')))
+    common.print_table(f'虚拟串口 → pyserial → SampleCollector（{seconds:g} 虚拟秒，80 SPS）',
+                       ('output', 'speedup', 'sent', 'received', 'dropped bytes', 'match'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=60, help='每项运行的虚拟秒数')
+    args = common.parse_args(parser)
+
+    throughput(args.seconds)
+    accuracy(args.seconds)
+    pty_roundtrip(args.seconds)
+    common.finish()
+
+
+if __name__ == '__main__':
+    main()
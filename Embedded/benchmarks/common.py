@@ -0,0 +1,143 @@
+"""
+基准测试公共工具。各脚本可以单独运行：``python benchmarks/bench_xxx.py``
+
+脚本用 parse_args() 解析参数时自动带 ``--json 路径``：print_table 输出的每张表
+同时记录下来，退出时连同参数与环境写成 JSON，供 run_all.py 汇总、跟踪回归。
+正确性检查用 verdict() 记录，main() 末尾调用 finish()：有未通过的检查时退出码为 1。
+"""
+import atexit
+import csv
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+EMBEDDED_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(EMBEDDED_DIR, 'Project')
+TEST_DIR = os.path.join(EMBEDDED_DIR, 'Test')
+
+for _path in (PROJECT_DIR, EMBEDDED_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+
+def read_trace(path):
+    """读取 WeightMonitor 记录的 CSV，返回 (epoch 秒列表, 重量列表)"""
+    times = []
+    weights = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            times.append(datetime.strptime(row[0].strip(), '%Y-%m-%d %H:%M:%S').timestamp())
+            weights.append(float(row[1]))
+    return times, weights
+
+
+def traces(pattern='*.csv'):
+    """Embedded/Test 下匹配 pattern 的记录文件"""
+    return sorted(glob.glob(os.path.join(TEST_DIR, pattern)))
+
+
+def noise_std(values):
+    """一阶差分估计的噪声标准差，对缓慢的趋势不敏感"""
+    diffs = [b - a for a, b in zip(values, values[1:])]
+    if len(diffs) < 2:
+        return 0.0
+    mean = sum(diffs) / len(diffs)
+    var = sum((d - mean) ** 2 for d in diffs) / (len(diffs) - 1)
+    return (var / 2) ** 0.5
+
+
+def measure(func, repeat):
+    """调用 func() repeat 次，返回每次平均耗时（秒）"""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat
+
+
+# 本次运行输出过的表，写 JSON 用
+_tables = []
+
+
+def print_table(title, header, rows):
+    _tables.append((title, tuple(header), [tuple(row) for row in rows]))
+    print(title)
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    fmt = '  '.join('{:>%d}' % w for w in widths)
+    print(fmt.format(*header))
+    for row in rows:
+        print(fmt.format(*row))
+    print()
+
+
+# 本次运行未通过的检查，finish() 据此给出退出码
+_failures = []
+
+
+def verdict(ok, what):
+    """记录一项正确性检查，返回表格里的 'yes'/'no'；不通过的在 finish() 时使进程以 1 退出"""
+    if not ok:
+        _failures.append(what)
+    return 'yes' if ok else 'no'
+
+
+def finish():
+    """main() 结束时调用：有检查未通过则列出并 sys.exit(1)，run_all.py 因而报告失败"""
+    if _failures:
+        print('检查未通过：', file=sys.stderr)
+        for what in _failures:
+            print('  ' + what, file=sys.stderr)
+        sys.exit(1)
+
+
+def parse_args(parser):
+    """parser.parse_args()，并加上 --json：给出时退出前把所有表写成 JSON"""
+    parser.add_argument('--json', metavar='PATH', help='把结果另存为 JSON')
+    args = parser.parse_args()
+    if args.json:
+        name = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+        atexit.register(write_json, args.json, name, vars(args))
+    return args
+
+
+def _json_value(x):
+    # 表格里的数字多是格式化好的字符串，能转成数值的都转回去
+    if isinstance(x, (int, float)) or x is None:
+        return x
+    if hasattr(x, 'item'):
+        return x.item()  # numpy 标量
+    text = str(x).strip()
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def results(name, args=None):
+    """本次运行的结果：每张表的行按表头转成 dict"""
+    return {
+        'benchmark': name,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'args': {k: v for k, v in (args or {}).items() if k != 'json'},
+        'tables': [
+            {
+                'title': title,
+                'rows': [dict(zip(header, (_json_value(x) for x in row))) for row in rows],
+            }
+            for title, header, rows in _tables
+        ],
+    }
+
+
+def write_json(path, name, args=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results(name, args), f, ensure_ascii=False, indent=1, default=str)
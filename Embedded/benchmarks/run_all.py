@@ -0,0 +1,129 @@
+"""
+依次运行全部基准（每个在独立子进程中，互不影响仿真环境与 Qt 状态），汇总成一个 JSON。
+结果与机器相关，不指定 -o 时写到系统临时目录（文件名带时间），不放进源码树。
+
+    python benchmarks/run_all.py -o ~/bench/base.json
+    python benchmarks/run_all.py -k pipeline -k sim -o ~/bench/new.json --baseline ~/bench/base.json
+
+--baseline 给出上一次的结果时，列出数值变化超过 --threshold 的单元格（按表标题与行序号对齐），
+方便发现回归；计时类数值本身有噪声，阈值不宜设得过小。
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import common
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_one(path, timeout):
+    """返回 (结果 dict 或 None, 退出状态说明, 用时秒)"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    fd, json_path = tempfile.mkstemp(suffix='.json', prefix=name + '_')
+    os.close(fd)
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, path, '--json', json_path], cwd=BENCH_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        status = 'ok' if proc.returncode == 0 else f'exit {proc.returncode}'
+        output = proc.stdout.decode('utf-8', errors='replace')
+    except subprocess.TimeoutExpired as e:
+        status = 'timeout'
+        output = (e.stdout or b'').decode('utf-8', errors='replace')
+    elapsed = time.perf_counter() - t0
+    result = None
+    try:
+        with open(json_path, encoding='utf-8') as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        pass
+    finally:
+        os.remove(json_path)
+    if status != 'ok':
+        # 失败时给出输出末尾，便于排查
+        print('\n'.join(output.rstrip().splitlines()[-10:]))
+    return result, status, elapsed
+
+
+def compare(baseline, current, threshold):
+    """逐单元格比较两次结果中的数值，返回变化超过 threshold（相对值）的行"""
+    old = {b['benchmark']: b for b in baseline['benchmarks']}
+    changes = []
+    for bench in current['benchmarks']:
+        prev = old.get(bench['benchmark'])
+        if prev is None:
+            continue
+        prev_tables = {t['title']: t for t in prev.get('tables', [])}
+        for table in bench.get('tables', []):
+            prev_table = prev_tables.get(table['title'])
+            if prev_table is None:
+                continue
+            for i, (row, prev_row) in enumerate(zip(table['rows'], prev_table['rows'])):
+                for key, value in row.items():
+                    before = prev_row.get(key)
+                    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (value, before)):
+                        continue
+                    if before == value:
+                        continue
+                    rel = (value - before) / abs(before) if before else float('inf')
+                    if abs(rel) > threshold:
+                        changes.append((bench['benchmark'], table['title'][:30], i, key,
+                                        before, value, '%+.0f%%' % (rel * 100) if before else 'new'))
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', '--only', action='append', help='只运行文件名包含该字符串的基准，可重复')
+    parser.add_argument('--skip', action='append', default=[], help='跳过文件名包含该字符串的基准，可重复')
+    parser.add_argument('-o', '--output', help='汇总结果的路径（默认系统临时目录下的 bench_results_<时间>.json）')
+    parser.add_argument('--timeout', type=float, default=900, help='单个基准的超时（秒）')
+    parser.add_argument('--baseline', help='与之前的汇总结果比较')
+    parser.add_argument('--threshold', type=float, default=0.25, help='比较时报告的相对变化下限')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(BENCH_DIR, 'bench_*.py')))
+    if args.only:
+        paths = [p for p in paths if any(k in os.path.basename(p) for k in args.only)]
+    paths = [p for p in paths if not any(k in os.path.basename(p) for k in args.skip)]
+
+    summary = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': [],
+    }
+    output = args.output or os.path.join(tempfile.gettempdir(),
+                                          time.strftime('bench_results_%Y%m%d_%H%M%S.json'))
+    rows = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(f"== {name}", flush=True)
+        result, status, elapsed = run_one(path, args.timeout)
+        entry = result or {'benchmark': name, 'tables': []}
+        entry['status'] = status
+        entry['seconds'] = round(elapsed, 2)
+        summary['benchmarks'].append(entry)
+        rows.append((name, status, '%.1f' % elapsed, len(entry['tables'])))
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=1)
+    common.print_table(f'汇总（已写入 {output}）', ('benchmark', 'status', 'seconds', 'tables'), rows)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        changes = compare(baseline, summary, args.threshold)
+        common.print_table(f'与 {args.baseline} 相比变化超过 {args.threshold:.0%} 的数值',
+                           ('benchmark', 'table', 'row', 'column', 'before', 'after', 'change'), changes)
+
+    if any(status != 'ok' for _, status, _, _ in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
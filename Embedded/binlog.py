@@ -0,0 +1,224 @@
+"""
+长时间记录用的列式二进制日志（.wlog）。
+
+一个 .wlog 是一个目录：meta.json 描述列名和类型，每一列是一个只追加的
+小端原始数组文件（<列名>.bin）。写入按块追加，读取用 np.fromfile/np.memmap
+直接得到数组，不需要任何文本解析。进程中途退出时最多丢掉内存中未写出的块；
+写到一半的块会让各列长度不一致，读取时按最短列截断，重新打开追加前也先把各列截断到最短列，
+新数据才能按行对齐。
+
+命令行::
+
+    python binlog.py convert Test/*.csv            # CSV 转 .wlog（同目录）
+    python binlog.py convert Test/*.csv -o logs/   # 指定输出目录
+    python binlog.py info logs/xxx.wlog
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from csv_logger import BackgroundWriter
+
+FORMAT_VERSION = 1
+
+# 一个样本的全部字段；SerialReader 的批数据也使用这个类型
+SAMPLE_DTYPE = np.dtype([
+    ('time', '<f8'),       # 上位机接收时间，epoch 秒
+    ('seq', '<i4'),        # 设备序号，-1 表示未知（文本协议）
+    ('device_us', '<u4'),  # 设备时间戳 ticks_us
+    ('samples', '<u2'),    # 这个输出由每通道多少个原始样本平均而来，0 表示未知
+    ('raw1', '<i4'),       # 通道1原始计数
+    ('raw2', '<i4'),       # 通道2原始计数
+    ('weight', '<f4'),     # 设备输出的重量（g）
+    ('filtered', '<f4'),   # 上位机滤波后的重量（g）
+    ('temp', '<f4'),       # 设备温度（℃），nan 表示未知
+])
+
+META_FILE = 'meta.json'
+
+
+def new_batch(n):
+    batch = np.zeros(n, dtype=SAMPLE_DTYPE)
+    batch['seq'] = -1
+    batch['temp'] = np.nan
+    return batch
+
+
+class BinLogWriter:
+    def __init__(self, path, columns=SAMPLE_DTYPE.names, chunk_rows=4096, source=''):
+        """
+        :param path: .wlog 目录路径，已存在时截断到各列共同的行数后追加
+        :param columns: 要保存的列（SAMPLE_DTYPE 的字段子集）
+        :param chunk_rows: 内存中攒够多少行写出一块
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            columns = list(meta['columns'])
+            self.truncate_columns(path, meta['columns'])
+        else:
+            os.makedirs(path, exist_ok=True)
+            meta = {
+                'version': FORMAT_VERSION,
+                'columns': {name: SAMPLE_DTYPE[name].str for name in columns},
+                'created': time.time(),
+                'source': source,
+            }
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+        self.columns = list(columns)
+        self._files = {name: open(os.path.join(path, name + '.bin'), 'ab') for name in self.columns}
+        self._pending = []
+        self._pending_rows = 0
+
+    @staticmethod
+    def truncate_columns(path, columns):
+        """
+        把各列文件截断到最短列的整行数（上次写到一半退出时各列长度可能不同）
+
+        :param columns: {列名: dtype 字符串}，即 meta.json 中的 columns
+        :return: 截断后的行数
+        """
+        sizes = {}
+        for name, dtype in columns.items():
+            file_path = os.path.join(path, name + '.bin')
+            size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            sizes[file_path] = (size, np.dtype(dtype).itemsize)
+        rows = min((size // itemsize for size, itemsize in sizes.values()), default=0)
+        for file_path, (size, itemsize) in sizes.items():
+            if size > rows * itemsize:
+                os.truncate(file_path, rows * itemsize)
+        return rows
+
+    def append(self, batch):
+        """追加一批 SAMPLE_DTYPE 数组"""
+        self._pending.append(batch)
+        self._pending_rows += len(batch)
+        if self._pending_rows >= self.chunk_rows:
+            self.write_chunk()
+
+    def write_chunk(self):
+        if not self._pending:
+            return
+        chunk = np.concatenate(self._pending)
+        self._pending = []
+        self._pending_rows = 0
+        for name in self.columns:
+            np.ascontiguousarray(chunk[name]).tofile(self._files[name])
+
+    def flush(self):
+        self.write_chunk()
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+
+class BinLogger(BackgroundWriter):
+    """在后台线程写 .wlog，接口与 CsvLogger 相同"""
+
+    def __init__(self, path, flush_rows=4096, flush_interval=5.0):
+        super().__init__(flush_rows, flush_interval)
+        self.path = path
+        self._writer = BinLogWriter(path, chunk_rows=flush_rows)
+        self.start()
+
+    def _write_batch(self, batch):
+        self._writer.append(batch)
+
+    def _flush(self):
+        self._writer.flush()
+
+    def _close(self):
+        self._writer.close()
+
+
+def load(path, mmap=False):
+    """
+    读取 .wlog，返回 {列名: 数组}。
+
+    :param mmap: True 时以只读内存映射方式打开，适合远大于内存的记录
+    """
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    columns = {}
+    for name, dtype in meta['columns'].items():
+        file_path = os.path.join(path, name + '.bin')
+        dtype = np.dtype(dtype)
+        if mmap:
+            size = os.path.getsize(file_path) // dtype.itemsize
+            columns[name] = np.memmap(file_path, dtype=dtype, mode='r', shape=(size,)) if size else np.empty(0, dtype)
+        else:
+            columns[name] = np.fromfile(file_path, dtype=dtype)
+    rows = min((len(a) for a in columns.values()), default=0)
+    return {name: a[:rows] for name, a in columns.items()}
+
+
+def read_csv(path):
+    """读取 WeightMonitor 记录的 CSV，返回只含 time/weight 的 SAMPLE_DTYPE 数组"""
+    times = []
+    weights = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            times.append(datetime.strptime(row[0].strip(), '%Y-%m-%d %H:%M:%S').timestamp())
+            weights.append(float(row[1]))
+    batch = new_batch(len(times))
+    batch['time'] = times
+    batch['weight'] = weights
+    batch['filtered'] = weights
+    return batch
+
+
+def convert_csv(csv_path, out_path):
+    """CSV 转 .wlog；CSV 中没有的序号、原始计数等列不保存"""
+    batch = read_csv(csv_path)
+    writer = BinLogWriter(out_path, columns=('time', 'weight'), source=os.path.basename(csv_path))
+    writer.append(batch)
+    writer.close()
+    return len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列式二进制日志工具")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_convert = sub.add_parser('convert', help='CSV 转 .wlog')
+    p_convert.add_argument('csv', nargs='+', help='CSV 文件')
+    p_convert.add_argument('-o', '--output', help='输出目录，默认与 CSV 同目录')
+    p_info = sub.add_parser('info', help='显示 .wlog 概要')
+    p_info.add_argument('wlog', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        for csv_path in args.csv:
+            out_dir = args.output or os.path.dirname(os.path.abspath(csv_path))
+            out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(csv_path))[0] + '.wlog')
+            if os.path.exists(out_path):
+                print(f"已存在，跳过: {out_path}")
+                continue
+            rows = convert_csv(csv_path, out_path)
+            print(f"{csv_path} -> {out_path}（{rows} 行）")
+    else:
+        for path in args.wlog:
+            data = load(path, mmap=True)
+            rows = len(next(iter(data.values()))) if data else 0
+            print(f"{path}: {rows} 行，列 {', '.join(data)}")
+            if rows:
+                t = data['time']
+                print(f"  {datetime.fromtimestamp(t[0])} ~ {datetime.fromtimestamp(t[-1])}")
+
+
+if __name__ == '__main__':
+    main()
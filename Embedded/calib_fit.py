@@ -0,0 +1,104 @@
+"""
+多点标定（上位机）：与固件 Project/calibration.py 相同的模型，用 numpy 向量化拟合与求值，
+输出的 calib.json 可直接拷到设备上。
+
+    python calib_fit.py points.csv -o calib.json            # 分片增益，线性
+    python calib_fit.py points.csv --degree 2 --shared      # 共用增益 + 二次项
+
+points.csv 每行一个观测：raw1,raw2,weight（两片HX711的平均读数与已知重量，可有表头）。
+同一标定点可以有多行，全部参与拟合。砝码应在秤盘上换几个位置放，分片增益才能区分开。
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project'))
+from calibration import Calibration, NORM, SINGULAR_TOL
+
+
+def _features(ref, c1, c2, degree, per_cell, norm):
+    x1 = (np.asarray(c1, dtype=np.int64) - ref[0]) / norm
+    x2 = (np.asarray(c2, dtype=np.int64) - ref[1]) / norm
+    t = x1 + x2
+    cols = [np.ones_like(t), x1, x2] if per_cell else [np.ones_like(t), t]
+    cols += [t ** k for k in range(2, degree + 1)]
+    return np.column_stack(cols)
+
+
+def _solve(a, w):
+    # 与设备端相同的奇异判据：QR 分解的 R_kk² / ‖A_k‖² 即消元后主元与原对角元之比
+    r = np.linalg.qr(a, mode='r')
+    norms = (a * a).sum(axis=0)
+    if len(w) < a.shape[1] or np.any(np.diag(r) ** 2 <= SINGULAR_TOL * norms):
+        return None
+    return np.linalg.lstsq(a, w, rcond=None)[0]
+
+
+def fit(c1, c2, weight, degree=1, per_cell=True, norm=NORM):
+    """
+    返回 Calibration（含残差），无法求解时返回 None；与设备端 CalibrationFit.fit 相同，
+    点数不多于分片模型的未知数或分片增益不可辨识时退回共用增益
+    """
+    c1 = np.asarray(c1, dtype=np.int64)
+    c2 = np.asarray(c2, dtype=np.int64)
+    weight = np.asarray(weight, dtype=float)
+    ref = (int(c1[0]), int(c2[0]))
+    coeffs = None
+    if per_cell and len(weight) > 2 + degree:
+        coeffs = _solve(_features(ref, c1, c2, degree, True, norm), weight)
+    if coeffs is None:
+        solved = _solve(_features(ref, c1, c2, degree, False, norm), weight)
+        if solved is None:
+            return None
+        coeffs = np.concatenate((solved[:2], solved[1:]))
+    calib = Calibration([float(k) for k in coeffs], ref, norm)
+    calib.residuals = (evaluate(calib, c1, c2) - weight).tolist()
+    return calib
+
+
+def evaluate(calib, c1, c2):
+    """向量化的 Calibration.value"""
+    k = np.asarray(calib.coeffs)
+    x1 = (np.asarray(c1, dtype=np.int64) - calib.ref[0]) / calib.norm
+    x2 = (np.asarray(c2, dtype=np.int64) - calib.ref[1]) / calib.norm
+    w = k[0] + k[1] * x1 + k[2] * x2
+    if len(k) > 3:
+        t = x1 + x2
+        w = w + sum(d * t ** p for p, d in enumerate(k[3:], start=2))
+    return w
+
+
+def load_points(path):
+    data = np.genfromtxt(path, delimiter=',', dtype=float)
+    data = data[~np.isnan(data).any(axis=1)]  # 跳过表头
+    return data[:, 0].astype(np.int64), data[:, 1].astype(np.int64), data[:, 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('points', help='raw1,raw2,weight 的 CSV')
+    parser.add_argument('-o', '--output', help='写出 calib.json')
+    parser.add_argument('--degree', type=int, default=1, help='多项式阶数')
+    parser.add_argument('--shared', action='store_true', help='两片共用一个增益（旧模型）')
+    args = parser.parse_args()
+
+    c1, c2, weight = load_points(args.points)
+    calib = fit(c1, c2, weight, args.degree, not args.shared)
+    if calib is None:
+        sys.exit("标定点不足或线性相关，无法拟合")
+    residuals = np.asarray(calib.residuals)
+    print(f"{len(weight)} 个观测，系数 {calib.coeffs}")
+    if calib.coeffs[1] == calib.coeffs[2] and not args.shared:
+        print("摆放位置不够分散，无法区分两片增益，已按共用增益拟合")
+    print(f"残差 RMS {np.sqrt(np.mean(residuals ** 2)):.3f} g，最大 {np.abs(residuals).max():.3f} g")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(calib.to_dict(), f)
+        print(f"已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+后台记录线程：GUI 线程只把数据放进队列，格式化与写盘都在这里完成。
+"""
+import csv
+import queue
+import threading
+import time
+
+
+class BackgroundWriter(threading.Thread):
+    def __init__(self, flush_rows=500, flush_interval=1.0):
+        """
+        :param flush_rows: 累计多少行刷新一次
+        :param flush_interval: 最长多少秒刷新一次
+        """
+        super().__init__(name=type(self).__name__, daemon=True)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.rows_dropped = 0  # 后台线程出错退出后丢弃的行数
+        self.error = None
+        self._queue = queue.SimpleQueue()
+
+    @property
+    def failed(self):
+        """后台线程已因写入错误退出（原因见 error），之后的 write() 都会丢弃数据"""
+        return self.error is not None or not self.is_alive()
+
+    def write(self, batch):
+        """
+        放入一批样本（binlog.SAMPLE_DTYPE 结构化数组），不阻塞
+
+        :return: 后台线程已退出时丢弃这批数据并返回 False，否则返回 True
+        """
+        if self.failed:
+            self.rows_dropped += len(batch)
+            return False
+        self._queue.put(batch)
+        return True
+
+    def close(self, wait=True):
+        """
+        写完队列中剩余数据、刷新并关闭文件
+
+        :param wait: False 时只通知后台线程收尾，不等待（之后可再调用 close() 等待）
+        """
+        if self.is_alive():
+            self._queue.put(None)
+            if wait:
+                self.join()
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+    def _flush(self):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def run(self):
+        pending = 0
+        last_flush = time.monotonic()
+        try:
+            while True:
+                timeout = self.flush_interval - (time.monotonic() - last_flush)
+                try:
+                    batch = self._queue.get(timeout=max(timeout, 0.001))
+                except queue.Empty:
+                    batch = ()
+                if batch is None:
+                    break
+                if len(batch):
+                    self._write_batch(batch)
+                    pending += len(batch)
+                    self.rows_written += len(batch)
+                if pending >= self.flush_rows or (pending and time.monotonic() - last_flush >= self.flush_interval):
+                    self._flush()
+                    pending = 0
+                    last_flush = time.monotonic()
+                elif not pending:
+                    last_flush = time.monotonic()
+        except OSError as e:
+            self.error = e
+            print(f"记录写入失败: {e}")
+        finally:
+            self._close()
+
+
+class CsvLogger(BackgroundWriter):
+    def __init__(self, path, flush_rows=500, flush_interval=1.0):
+        """
+        :param path: CSV 文件路径，打开失败时在构造时抛出异常
+        """
+        super().__init__(flush_rows, flush_interval)
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['Timestamp', 'Weight(g)'])
+        self._last_sec = None
+        self._last_str = ''
+        self.start()
+
+    def _write_batch(self, batch):
+        # 时间戳只精确到秒，同一秒内的行复用格式化结果
+        rows = []
+        last_sec = self._last_sec
+        last_str = self._last_str
+        for t, w in zip(batch['time'].tolist(), batch['weight'].tolist()):
+            sec = int(t)
+            if sec != last_sec:
+                last_sec = sec
+                last_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+            rows.append((last_str, f"{w:.2f}"))
+        self._last_sec = last_sec
+        self._last_str = last_str
+        self._writer.writerows(rows)
+
+    def _flush(self):
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
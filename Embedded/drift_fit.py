@@ -0,0 +1,148 @@
+"""
+漂移补偿模型的离线拟合：用静态记录（秤上重量不变）拟合 Project/drift.py 的模型，写出 drift.json。
+
+    python drift_fit.py logs/static_*.wlog -o drift.json
+    python drift_fit.py Test/静态测试5分钟结果.csv --terms 1
+
+每个记录文件视为一次从上电开始的静态会话，真实重量未知，按会话各拟合一个截距；
+温度取 .wlog 的 temp 列（新固件的文本行带温度），CSV 与没有温度的记录只拟合时间项。
+指数项的时间常数在 [--min-tau, --max-tau] 的对数网格上搜索，其余系数是线性最小二乘。
+记录时设备上不要放 drift.json，否则拟合的是补偿后的残差。
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project'))
+import binlog
+from drift import DriftModel
+
+
+def reject_spikes(t, w, temp=None, window=9, k=6.0):
+    """去掉偏离滑动中值超过 k 倍 MAD（按正态折算）的尖峰样本，返回过滤后的 (t, w, temp)"""
+    if len(w) < window:
+        return t, w, temp
+    half = window // 2
+    padded = np.pad(w, half, mode='edge')
+    median = np.median(np.lib.stride_tricks.sliding_window_view(padded, window), axis=1)
+    dev = np.abs(w - median)
+    mad = 1.4826 * np.median(dev) or 1e-9
+    keep = dev <= k * mad
+    return t[keep], w[keep], None if temp is None else temp[keep]
+
+
+def load_session(path):
+    """返回 (开机后秒数, 重量, 温度或 None)，已去掉尖峰"""
+    if os.path.isdir(path):
+        data = binlog.load(path)
+    else:
+        data = binlog.read_csv(path)
+    t = np.asarray(data['time'], dtype=float)
+    w = np.asarray(data['weight'], dtype=float)
+    # binlog.load 返回按列的 dict，read_csv 返回结构化数组；旧记录没有 temp 列或全为 NaN
+    names = data.keys() if isinstance(data, dict) else data.dtype.names
+    temp = np.asarray(data['temp'], dtype=float) if 'temp' in names else None
+    if temp is not None and not np.isfinite(temp).all():
+        temp = None
+    return reject_spikes(t - t[0], w, temp)
+
+
+def _design(sessions, taus, use_temp, temp_ref):
+    # 列：各会话截距、温度项（可选）、各指数项
+    rows = sum(len(t) for t, _, _ in sessions)
+    cols = len(sessions) + int(use_temp) + len(taus)
+    a = np.zeros((rows, cols))
+    y = np.empty(rows)
+    start = 0
+    for k, (t, w, temp) in enumerate(sessions):
+        end = start + len(t)
+        a[start:end, k] = 1
+        c = len(sessions)
+        if use_temp:
+            a[start:end, c] = temp - temp_ref
+            c += 1
+        for tau in taus:
+            a[start:end, c] = 1 - np.exp(-t / tau)
+            c += 1
+        y[start:end] = w
+        start = end
+    return a, y
+
+
+def fit(sessions, terms=1, min_tau=60, max_tau=1800, grid=24):
+    """
+    :param sessions: [(开机后秒数, 重量, 温度或 None), ...]
+    :return: (DriftModel, 残差 RMS)
+    """
+    use_temp = all(temp is not None for _, _, temp in sessions)
+    temp_ref = float(np.mean(np.concatenate([temp for _, _, temp in sessions]))) if use_temp else 25.0
+    candidates = np.geomspace(min_tau, max_tau, grid)
+    best = None
+    for taus in itertools.combinations(candidates, terms):
+        a, y = _design(sessions, taus, use_temp, temp_ref)
+        coeffs, *_ = np.linalg.lstsq(a, y, rcond=None)
+        sse = float(np.sum((a @ coeffs - y) ** 2))
+        if best is None or sse < best[0]:
+            best = (sse, taus, coeffs)
+    sse, taus, coeffs = best
+    c = coeffs[len(sessions):]
+    temp_coeff = float(c[0]) if use_temp else 0.0
+    amplitudes = [float(x) for x in c[int(use_temp):]]
+    model = DriftModel(temp_coeff, temp_ref, amplitudes, [float(x) for x in taus])
+    rows = sum(len(t) for t, _, _ in sessions)
+    return model, (sse / rows) ** 0.5
+
+
+def compensate(model, t, w, temp=None):
+    """向量化的 w - model.offset(temp, t)"""
+    d = np.zeros_like(w, dtype=float)
+    if temp is not None and model.temp_coeff:
+        d += model.temp_coeff * (temp - model.temp_ref)
+    for a, tau in zip(model.amplitudes, model.taus):
+        d += a * (1 - np.exp(-t / tau))
+    return w - d
+
+
+def drift_metrics(t, w, window=30.0):
+    """(首尾差, 峰峰值)：两者都用 window 秒滑动中值，排除噪声"""
+    smooth = np.array([np.median(w[(t >= x - window / 2) & (t <= x + window / 2)]) for x in t])
+    head = smooth[t <= t[0] + window].mean()
+    tail = smooth[t >= t[-1] - window].mean()
+    return tail - head, smooth.max() - smooth.min()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sessions', nargs='+', help='静态记录（.wlog 目录或 CSV）')
+    parser.add_argument('-o', '--output', help='写出 drift.json')
+    parser.add_argument('--terms', type=int, default=1, help='指数项个数')
+    parser.add_argument('--min-tau', type=float, default=60)
+    parser.add_argument('--max-tau', type=float, default=1800)
+    args = parser.parse_args()
+
+    sessions = [load_session(path) for path in args.sessions]
+    model, rms = fit(sessions, args.terms, args.min_tau, args.max_tau)
+    print(f"模型 {json.dumps(model.to_dict(), ensure_ascii=False)}")
+    if not model.temp_coeff:
+        print("记录中没有温度，只拟合了时间项")
+    print(f"残差 RMS {rms:.3f} g；时间项饱和后的总修正 {sum(model.amplitudes):.2f} g")
+    for path, (t, w, temp) in zip(args.sessions, sessions):
+        before = drift_metrics(t, w)
+        after = drift_metrics(t, compensate(model, t, w, temp))
+        print(f"{os.path.basename(path)}: 首尾漂移 {before[0]:+.2f} -> {after[0]:+.2f} g，"
+              f"峰峰值 {before[1]:.2f} -> {after[1]:.2f} g")
+    longest = max(t[-1] for t, _, _ in sessions)
+    if max(model.taus) > longest:
+        print(f"注意：时间常数超过最长记录（{longest:.0f} s），长时间运行的修正量是外推值")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(model.to_dict(), f)
+        print(f"已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
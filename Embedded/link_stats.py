@@ -0,0 +1,123 @@
+"""
+串口链路统计：用设备端序号与 ticks_us 时间戳计算真实的输出频率、ADC 采样率、
+抖动和丢帧，不再依赖上位机接收时刻去猜。
+
+- 输出频率：设备时间戳跨度 / 序号跨度（丢帧不影响）；
+- ADC 采样率：输出频率 × 每个输出平均的样本数（每通道）；
+- 设备抖动：相邻输出的设备时间间隔的标准差；
+- 串口抖动：相邻输出的 上位机到达间隔 与 设备时间间隔 之差的标准差；
+- 丢帧：序号跳过的个数；
+- 设备重启：序号回退半圈以上，或设备时间间隔与 序号差 × 标称输出间隔 对不上（重启时序号与 ticks_us
+  都从头开始，序号在上半圈时看起来像向前跳了很多）。这样的输出对不计丢帧，也不计入频率与抖动。
+
+旧固件的输出没有序号（seq = -1），只能按上位机时间给出输出频率。
+"""
+from collections import deque
+
+import numpy as np
+
+TICKS_PERIOD = 1 << 30  # MicroPython ticks_us 的回绕周期
+SEQ_PERIOD = 1 << 16
+# 设备时间间隔偏离 序号差 × 标称间隔 超过这个比例（再加一个标称间隔的余量）时视为重启
+RESTART_TOLERANCE = 0.5
+# 标称输出间隔取最近这么多个相邻输出间隔的中位数（跨 update 调用累积，每批只有一个样本时也能判断）
+NOMINAL_WINDOW = 32
+
+
+class LinkStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.restarts = 0
+        self._nominal_us = None  # 标称输出间隔：最近相邻输出设备时间间隔的中位数
+        self._adjacent_us = deque(maxlen=NOMINAL_WINDOW)
+        self._last = None  # 上一个带序号输出的 (seq, device_us, time)
+        self._clear_window()
+
+    def _clear_window(self):
+        # 统计窗口（两次 report 之间）内的累加量
+        self._seq_span = 0
+        self._us_span = 0
+        self._intervals = []
+        self._skews = []
+        self._samples = 0
+        self._host_n = 0
+        self._host_first = None
+        self._host_last = None
+
+    def update(self, batch):
+        """送入一批 binlog.SAMPLE_DTYPE 样本"""
+        if not len(batch):
+            return
+        self.frames += len(batch)
+        stamped = batch[batch['seq'] >= 0]
+        if len(stamped) < len(batch):
+            # 没有序号的输出：记录上位机时间范围
+            times = batch['time'][batch['seq'] < 0]
+            if self._host_first is None:
+                self._host_first = times[0]
+            self._host_last = times[-1]
+            self._host_n += len(times)
+        if not len(stamped):
+            return
+
+        seq = stamped['seq'].astype(np.int64)
+        us = stamped['device_us'].astype(np.int64)
+        host = stamped['time']
+        self._samples = int(stamped['samples'][-1])
+        if self._last is not None:
+            seq = np.concatenate(([self._last[0]], seq))
+            us = np.concatenate(([self._last[1]], us))
+            host = np.concatenate(([self._last[2]], host))
+        self._last = (int(seq[-1]), int(us[-1]), float(host[-1]))
+        if len(seq) < 2:
+            return
+
+        dseq = np.diff(seq) % SEQ_PERIOD
+        dus = np.diff(us) % TICKS_PERIOD
+        dhost = np.diff(host)
+        adjacent = dseq == 1
+        if adjacent.any():
+            # 中位数不受个别重启对的影响，输出速率改变后也随之更新
+            window = self._adjacent_us
+            window.extend(dus[adjacent][-NOMINAL_WINDOW:].tolist())
+            if len(window) >= 3:
+                self._nominal_us = float(sorted(window)[len(window) // 2])
+        restart = dseq > SEQ_PERIOD // 2
+        if self._nominal_us:
+            expected = dseq * self._nominal_us
+            restart |= (dseq > 0) & (np.abs(dus - expected) > expected * RESTART_TOLERANCE + self._nominal_us)
+        self.restarts += int(np.count_nonzero(restart))
+        self.duplicates += int(np.count_nonzero(dseq == 0))
+        ok = (dseq > 0) & ~restart
+        self.dropped += int(dseq[ok].sum() - np.count_nonzero(ok))
+        self._seq_span += int(dseq[ok].sum())
+        self._us_span += int(dus[ok].sum())
+        # 抖动只用相邻（未丢帧、非重启）的输出对
+        single = adjacent & ~restart
+        self._intervals.append(dus[single] * 1e-6)
+        self._skews.append(dhost[single] - dus[single] * 1e-6)
+
+    def report(self):
+        """
+        返回并清空本窗口的统计：
+        (输出频率 Hz, ADC 采样率 Hz, 设备抖动 ms, 串口抖动 ms, 累计丢帧)，无法计算的项为 None
+        """
+        frame_rate = adc_rate = device_jitter = serial_jitter = None
+        if self._seq_span and self._us_span:
+            frame_rate = self._seq_span * 1e6 / self._us_span
+            if self._samples:
+                adc_rate = frame_rate * self._samples
+            intervals = np.concatenate(self._intervals)
+            skews = np.concatenate(self._skews)
+            if len(intervals) > 1:
+                device_jitter = float(intervals.std() * 1000)
+                serial_jitter = float(skews.std() * 1000)
+        elif self._host_n > 1 and self._host_last > self._host_first:
+            frame_rate = (self._host_n - 1) / (self._host_last - self._host_first)
+        self._clear_window()
+        return frame_rate, adc_rate, device_jitter, serial_jitter, self.dropped
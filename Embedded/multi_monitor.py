@@ -0,0 +1,245 @@
+"""
+多秤监视：一个进程监视多台秤，串口读取不另开线程（Windows 上每个串口一个读线程）。
+
+    python multi_monitor.py A1=/dev/ttyUSB0 A2=/dev/ttyUSB1 -o logs
+
+所有串口都在 GUI 线程的 Qt 事件循环中读取（每个串口一个 QSocketNotifier，
+会话逻辑与 recorder.py 相同的 ScaleSession），
+每台秤有独立的滤波器、绘图缓冲、消耗估计和记录文件，绘图按网格排列。
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QLabel, QVBoxLayout, QGridLayout, QComboBox, QHBoxLayout, QMessageBox
+)
+from PyQt5.QtCore import QObject, QSocketNotifier, pyqtSignal, QTimer
+import pyqtgraph as pg
+
+from weight_monitor import DEFAULT_FILTER, FILTER_OPTIONS, format_minutes
+from recorder import LOGGERS, RotatingLogger, ScaleSession, parse_device
+from estimator import ConsumptionEstimator
+from plot_buffer import PlotBuffer, decimate_view
+
+
+class QtEventLoop(QObject):
+    """
+    把 Qt 事件循环包装成 ScaleSession 需要的 asyncio 事件循环接口，
+    串口读取直接在 GUI 线程的事件循环里完成，不另开线程，也就没有 GIL 争用。
+    """
+    _call = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self._notifiers = {}
+        # 读线程回退模式下跨线程投递回调（排队连接，在 GUI 线程执行）
+        self._call.connect(lambda callback, args: callback(*args))
+
+    def add_reader(self, fd, callback):
+        if sys.platform == 'win32':
+            raise NotImplementedError  # Windows 串口句柄不能用 QSocketNotifier
+        notifier = QSocketNotifier(fd, QSocketNotifier.Read)
+        notifier.activated.connect(lambda _: callback())
+        self._notifiers[fd] = notifier
+
+    def remove_reader(self, fd):
+        notifier = self._notifiers.pop(fd, None)
+        if notifier is not None:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+
+    def call_later(self, delay, callback, *args):
+        QTimer.singleShot(int(delay * 1000), lambda: callback(*args))
+
+    def call_soon_threadsafe(self, callback, *args):
+        self._call.emit(callback, args)
+
+
+class ScalePanel(QWidget):
+    HISTORY_POINTS = 1 << 18
+
+    def __init__(self, name, logger=None, filter_name=DEFAULT_FILTER):
+        super().__init__()
+        self.name = name
+        self.logger = logger
+        self.weight_filter = FILTER_OPTIONS[filter_name]()
+        self.estimator = ConsumptionEstimator(window=600, interval=1.0)
+        self.plot_data = PlotBuffer(self.HISTORY_POINTS)
+        self.start_time = time.time()
+        self.samples = 0
+        self.dirty = False
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(2, 2, 2, 2)
+        self.weight_label = QLabel(f"{name}: -- g")
+        self.estimate_label = QLabel("消耗速率: --")
+        self.plot_widget = pg.PlotWidget()
+        self.plot_widget.setLabel('left', '重量 (g)')
+        self.plot_widget.setLabel('bottom', '时间 (分钟)')
+        self.plot_curve = self.plot_widget.plot([], [], pen=pg.mkPen('b', width=1))
+        self.plot_widget.getPlotItem().getViewBox().sigXRangeChanged.connect(self.on_view_changed)
+        layout.addWidget(self.weight_label)
+        layout.addWidget(self.estimate_label)
+        layout.addWidget(self.plot_widget)
+        self.setLayout(layout)
+
+    def set_filter(self, name):
+        self.weight_filter = FILTER_OPTIONS[name]()
+
+    def handle_batch(self, batch):
+        times = batch['time']
+        update = self.weight_filter.update
+        filtered = np.fromiter((update(w) for w in batch['weight'].tolist()), dtype=float, count=len(batch))
+        batch['filtered'] = filtered
+        update = self.estimator.update
+        for t, w in zip(times.tolist(), filtered.tolist()):
+            update(t, w)
+        self.plot_data.extend((times - self.start_time) / 60.0, filtered)
+        self.samples += len(batch)
+        self.dirty = True
+        # 记录文件写入失败时停止记录并提示，同 WeightMonitor.write_csv
+        if self.logger is not None and not self.logger.write(batch):
+            error = self.logger.error
+            self.close_log()
+            QMessageBox.critical(self, "错误", f"{self.name} 写入记录文件失败，已停止记录: {error}")
+
+    def on_view_changed(self, view, _range):
+        # 手动缩放/平移后按新的可见范围重新降采样
+        if not view.autoRangeEnabled()[0]:
+            self.dirty = True
+
+    def refresh(self):
+        # 文字与曲线都只在有新数据或视图变化时更新
+        if not self.dirty or not len(self.plot_data):
+            return
+        self.dirty = False
+        self.weight_label.setText(f"{self.name}: {self.plot_data.last(1):.2f} g")
+        # 手动缩放后只对可见时间段降采样
+        view = self.plot_widget.getPlotItem().getViewBox()
+        x_range = None if view.autoRangeEnabled()[0] else view.viewRange()[0]
+        times, weights = decimate_view(self.plot_data.column(0), self.plot_data.column(1), x_range,
+                                       max(int(view.width()), 100))
+        self.plot_curve.setData(times, weights)
+
+    def update_estimate(self):
+        result = self.estimator.estimate()
+        if result is None:
+            self.estimate_label.setText("消耗速率: --")
+            return
+        rate, ci, remaining, tte, tte_low, tte_high = result
+        self.estimate_label.setText(f"消耗速率: {rate:.2f} ± {ci:.2f} g/min  剩余时间: {format_minutes(tte)}")
+
+    def close_log(self):
+        if self.logger is not None:
+            self.logger.close()
+            self.logger = None
+
+
+class MultiWeightMonitor(QWidget):
+    PLOT_FPS = 10  # 多图时降低刷新帧率
+    BATCH_INTERVAL = 0.05  # 各秤攒批的间隔（秒）
+
+    def __init__(self, devices, log_dir=None, log_format='csv', rotate_seconds=3600, baudrate=115200):
+        """
+        :param devices: [(名称, 串口), ...]
+        :param log_dir: 记录目录，None 为不记录
+        """
+        super().__init__()
+        self.setWindowTitle(f"多秤监视（{len(devices)} 台）")
+        self.panels = {}
+        for name, _ in devices:
+            logger = RotatingLogger(log_dir, name, log_format, rotate_seconds) if log_dir else None
+            self.panels[name] = ScalePanel(name, logger)
+
+        layout = QVBoxLayout()
+        top = QHBoxLayout()
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItems(list(FILTER_OPTIONS))
+        self.filter_combo.setCurrentText(DEFAULT_FILTER)
+        self.filter_combo.currentTextChanged.connect(self.set_filter)
+        top.addWidget(QLabel("滤波:"))
+        top.addWidget(self.filter_combo)
+        top.addStretch()
+        layout.addLayout(top)
+        grid = QGridLayout()
+        columns = math.ceil(math.sqrt(len(devices)))
+        for i, panel in enumerate(self.panels.values()):
+            grid.addWidget(panel, i // columns, i % columns)
+        layout.addLayout(grid)
+        self.setLayout(layout)
+
+        self.loop = QtEventLoop()
+        self.sessions = [ScaleSession(name, port, baudrate=baudrate, on_batch=self.handle_batch,
+                                      batch_interval=self.BATCH_INTERVAL)
+                         for name, port in devices]
+        # 数据停止时也把缓冲中的样本交出
+        self.tick_timer = QTimer()
+        self.tick_timer.timeout.connect(self.tick)
+        self.tick_timer.start(int(self.BATCH_INTERVAL * 1000))
+
+        self.plot_timer = QTimer()
+        self.plot_timer.timeout.connect(self.refresh_plots)
+        self.plot_timer.start(int(1000 / self.PLOT_FPS))
+        self.estimate_timer = QTimer()
+        self.estimate_timer.timeout.connect(self.update_estimates)
+        self.estimate_timer.start(1000)
+
+        for session in self.sessions:
+            session.open(self.loop)
+
+    def set_filter(self, name):
+        for panel in self.panels.values():
+            panel.set_filter(name)
+
+    def handle_batch(self, name, batch):
+        self.panels[name].handle_batch(batch)
+
+    def tick(self):
+        for session in self.sessions:
+            session.tick()
+
+    def refresh_plots(self):
+        for panel in self.panels.values():
+            panel.refresh()
+
+    def update_estimates(self):
+        for panel in self.panels.values():
+            panel.update_estimate()
+
+    def closeEvent(self, event):
+        self.tick_timer.stop()
+        for session in self.sessions:
+            session.close()
+        for panel in self.panels.values():
+            panel.close_log()
+        event.accept()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多秤监视")
+    parser.add_argument('devices', nargs='+', help='串口，格式 PORT 或 NAME=PORT')
+    parser.add_argument('-o', '--output', help='记录目录，不指定则不记录')
+    parser.add_argument('-f', '--format', choices=sorted(LOGGERS), default='csv', help='记录格式')
+    parser.add_argument('-b', '--baudrate', type=int, default=115200)
+    parser.add_argument('--rotate-minutes', type=float, default=60, help='按时间切分文件，0 为不切分')
+    args = parser.parse_args()
+
+    devices = [parse_device(spec) for spec in args.devices]
+    if len({name for name, _ in devices}) != len(devices):
+        parser.error("秤名称重复，请用 NAME=PORT 指定")
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    app = QApplication(sys.argv[:1])
+    monitor = MultiWeightMonitor(devices, args.output,
+                                 args.format, args.rotate_minutes * 60, args.baudrate)
+    monitor.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
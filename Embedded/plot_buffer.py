@@ -0,0 +1,91 @@
+"""
+绘图数据的环形缓冲区（NumPy，预分配）。
+
+每个值同时写在 i 和 i + capacity 两处（双倍长度），这样最近 size 个点
+永远是一段连续切片，直接把视图交给 pyqtgraph 的 setData，无需复制。
+"""
+import numpy as np
+
+
+class PlotBuffer:
+    def __init__(self, capacity, columns=2, dtype=np.float64):
+        """
+        :param capacity: 保留的最多点数
+        :param columns: 列数（如 时间、重量）
+        """
+        self.capacity = capacity
+        self.data = np.zeros((columns, 2 * capacity), dtype=dtype)
+        self.pos = 0   # 下一个写入位置，[0, capacity)
+        self.size = 0  # 当前有效点数
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.pos = 0
+        self.size = 0
+
+    def extend(self, *columns):
+        """追加一批数据，每列一个等长数组"""
+        n = len(columns[0])
+        if n == 0:
+            return
+        cap = self.capacity
+        if n > cap:
+            columns = [col[-cap:] for col in columns]
+            n = cap
+        start = self.pos
+        first = min(n, cap - start)
+        rest = n - first
+        for row, col in zip(self.data, columns):
+            row[start:start + first] = col[:first]
+            row[start + cap:start + cap + first] = col[:first]
+            if rest:
+                row[:rest] = col[first:]
+                row[cap:cap + rest] = col[first:]
+        self.pos = (start + n) % cap
+        self.size = min(self.size + n, cap)
+
+    def column(self, index):
+        """第 index 列最近 size 个点的连续视图（按时间顺序）"""
+        end = self.pos + self.capacity
+        return self.data[index, end - self.size:end]
+
+    def last(self, index):
+        return self.data[index, self.pos + self.capacity - 1]
+
+
+def decimate_minmax(x, y, bins):
+    """
+    峰值保留的降采样：把数据均分为 bins 段，每段输出最小值和最大值两个点。
+
+    点数不超过 2 * bins 时原样返回。返回的数组长度为 2 * bins，
+    振动尖峰不会像隔点抽取那样被漏掉。
+    """
+    n = len(y)
+    if n <= 2 * bins:
+        return x, y
+    starts = np.linspace(0, n, bins + 1).astype(np.intp)
+    ends = starts[1:] - 1
+    starts = starts[:-1]
+    out_x = np.empty(2 * bins, dtype=x.dtype)
+    out_y = np.empty(2 * bins, dtype=y.dtype)
+    out_x[0::2] = x[starts]
+    out_x[1::2] = x[ends]
+    out_y[0::2] = np.minimum.reduceat(y, starts)
+    out_y[1::2] = np.maximum.reduceat(y, starts)
+    return out_x, out_y
+
+
+def decimate_view(x, y, x_range, bins):
+    """
+    只对 x_range = (x0, x1) 内的点做 decimate_minmax，放大后可见段仍有 2 * bins 个点。
+
+    两侧各多取一个点，曲线一直连到视图边缘。x 须递增；x_range 为 None 时取全部。
+    """
+    if x_range is not None:
+        lo = max(int(np.searchsorted(x, x_range[0], 'left')) - 1, 0)
+        hi = min(int(np.searchsorted(x, x_range[1], 'right')) + 1, len(x))
+        x = x[lo:hi]
+        y = y[lo:hi]
+    return decimate_minmax(x, y, bins)
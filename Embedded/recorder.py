@@ -0,0 +1,301 @@
+"""
+无界面记录程序：一个进程同时记录多台秤，不导入 PyQt5/pyqtgraph。
+
+    python recorder.py /dev/ttyUSB0 A1=/dev/ttyUSB1 -o logs --rotate-minutes 60
+
+每台秤一个 asyncio 读回调（POSIX 下 loop.add_reader，其余平台退回读线程），
+解析与批处理与 GUI 共用 sample_source.SampleCollector，写盘在各自的后台线程。
+串口断开后按间隔自动重连。Ctrl+C / SIGTERM 时写完剩余数据再退出。
+"""
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+
+import serial
+
+# 与固件共用的模块（协议解析等）放在 Project 目录下
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project'))
+from csv_logger import CsvLogger
+from link_stats import LinkStats
+from sample_source import SampleCollector
+import binlog
+
+LOGGERS = {
+    'csv': CsvLogger,
+    'wlog': binlog.BinLogger,
+}
+
+
+class RotatingLogger:
+    def __init__(self, directory, name, fmt='csv', rotate_seconds=3600, rotate_rows=0):
+        """
+        按时间/行数切分记录文件，文件名为 <name>_<开始时间>.<fmt>
+
+        :param rotate_seconds: 单个文件最长记录秒数，0 表示不按时间切分
+        :param rotate_rows: 单个文件最多行数，0 表示不按行数切分
+        """
+        self.directory = directory
+        self.name = name
+        self.fmt = fmt
+        self.rotate_seconds = rotate_seconds
+        self.rotate_rows = rotate_rows
+        self.files = []
+        self.error = None  # 打开或写入记录文件失败的原因；出错后停止记录
+        self.rows_dropped = 0  # 出错后丢弃的行数
+        self._logger = None
+        self._opened = 0.0
+        self._rows = 0
+        self._closing = []
+
+    def _open(self, t):
+        stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(t))
+        path = os.path.join(self.directory, f"{self.name}_{stamp}.{self.fmt}")
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{self.name}_{stamp}_{n}.{self.fmt}")
+            n += 1
+        self._logger = LOGGERS[self.fmt](path)
+        self._opened = t
+        self._rows = 0
+        self.files.append(path)
+
+    def _rotate(self):
+        # 旧文件的收尾交给它自己的后台线程，不阻塞事件循环
+        self._logger.close(wait=False)
+        self._closing = [w for w in self._closing if w.is_alive()]
+        self._closing.append(self._logger)
+        self._logger = None
+
+    def write(self, batch):
+        """
+        写入一批样本
+
+        :return: 记录已因出错停止时丢弃这批数据并返回 False（原因见 error），否则返回 True
+        """
+        if self.error is not None:
+            self.rows_dropped += len(batch)
+            return False
+        t = batch['time'][0]
+        if self._logger is not None:
+            if ((self.rotate_seconds and t - self._opened >= self.rotate_seconds)
+                    or (self.rotate_rows and self._rows >= self.rotate_rows)):
+                self._rotate()
+        try:
+            if self._logger is None:
+                self._open(t)
+        except OSError as e:
+            return self._fail(batch, e)
+        if not self._logger.write(batch):
+            error = self._logger.error or "后台写入线程已退出"
+            self._rotate()
+            return self._fail(batch, error)
+        self._rows += len(batch)
+        return True
+
+    def _fail(self, batch, error):
+        self.error = error
+        self.rows_dropped += len(batch)
+        print(f"[{self.name}] 记录文件写入失败，停止记录: {error}")
+        return False
+
+    def close(self):
+        if self._logger is not None:
+            self._rotate()
+        for writer in self._closing:
+            writer.close()
+        self._closing = []
+
+
+class ScaleSession:
+    def __init__(self, name, port, logger=None, baudrate=115200, retry_interval=2.0,
+                 on_batch=None, batch_interval=0.2):
+        """
+        :param logger: RotatingLogger，收到的批直接写入，关闭时一并关闭；None 为不记录
+        :param on_batch: 额外的批回调 on_batch(name, batch)，在事件循环线程中调用
+        """
+        self.name = name
+        self.port = port
+        self.baudrate = baudrate
+        self.retry_interval = retry_interval
+        self.logger = logger
+        self.batch_callback = on_batch
+        self.collector = SampleCollector(self.on_batch, batch_interval=batch_interval)
+        self.link_stats = LinkStats()
+        self.last_weight = None
+        self.reconnects = 0
+        self.ser = None
+        self._fd = None
+        self._thread = None
+        self._loop = None
+        self._closed = False
+
+    def on_batch(self, batch):
+        self.last_weight = float(batch['weight'][-1])
+        self.link_stats.update(batch)
+        if self.logger is not None:
+            self.logger.write(batch)
+        if self.batch_callback is not None:
+            self.batch_callback(self.name, batch)
+
+    def open(self, loop):
+        self._loop = loop
+        try:
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=0)
+        except (serial.SerialException, OSError) as e:
+            print(f"[{self.name}] 打开 {self.port} 失败: {e}，{self.retry_interval} 秒后重试")
+            self._schedule_reopen()
+            return
+        print(f"[{self.name}] 已打开 {self.port}")
+        try:
+            self._fd = self.ser.fileno()
+            loop.add_reader(self._fd, self._on_readable)
+        except (NotImplementedError, AttributeError):
+            # Windows 的 Proactor 事件循环不支持 add_reader：用读线程转交给事件循环
+            self._fd = None
+            self.ser.timeout = 0.1
+            self._thread = threading.Thread(target=self._read_thread, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 65536)
+        except OSError as e:
+            self._lost(e)
+            return
+        if not data:
+            self._lost("EOF")
+            return
+        self.collector.feed(data)
+
+    def _read_thread(self):
+        ser = self.ser
+        while not self._closed and ser is self.ser:
+            try:
+                data = ser.read(ser.in_waiting or 1)
+            except (serial.SerialException, OSError) as e:
+                self._loop.call_soon_threadsafe(self._lost, e)
+                return
+            if data:
+                self._loop.call_soon_threadsafe(self.collector.feed, data)
+
+    def _lost(self, reason):
+        if self.ser is None:
+            return
+        print(f"[{self.name}] 连接断开: {reason}")
+        self.collector.flush()
+        self._release()
+        self.reconnects += 1
+        self._schedule_reopen()
+
+    def _schedule_reopen(self):
+        if not self._closed:
+            self._loop.call_later(self.retry_interval, self._reopen)
+
+    def _reopen(self):
+        if not self._closed and self.ser is None:
+            self.open(self._loop)
+
+    def _release(self):
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        ser, self.ser = self.ser, None
+        if ser is not None:
+            ser.close()
+
+    def tick(self):
+        # 数据停止时也把缓冲中的样本写出
+        self.collector.feed(b'')
+
+    def close(self):
+        self._closed = True
+        if self._loop is not None:
+            self._release()
+        self.collector.flush()
+        if self.logger is not None:
+            self.logger.close()
+
+
+def parse_device(spec):
+    """"NAME=PORT" 或 "PORT"（名称取端口名）"""
+    if '=' in spec:
+        name, port = spec.split('=', 1)
+    else:
+        port = spec
+        name = os.path.basename(port.rstrip('/\\')) or port
+    return name, port
+
+
+async def record(sessions, status_interval=0.0, tick_interval=0.5):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+    for session in sessions:
+        session.open(loop)
+    print(f"开始记录 {len(sessions)} 台秤", flush=True)
+
+    last_status = time.monotonic()
+    last_counts = [s.collector.samples for s in sessions]
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), tick_interval)
+            except asyncio.TimeoutError:
+                pass
+            for session in sessions:
+                session.tick()
+            now = time.monotonic()
+            if status_interval and now - last_status >= status_interval:
+                for i, session in enumerate(sessions):
+                    count = session.collector.samples
+                    rate = (count - last_counts[i]) / (now - last_status)
+                    last_counts[i] = count
+                    weight = '--' if session.last_weight is None else f"{session.last_weight:.2f} g"
+                    _, adc_rate, _, _, dropped = session.link_stats.report()
+                    adc = '--' if adc_rate is None else f"{adc_rate:.1f} Hz"
+                    failed = '' if session.logger is None or session.logger.error is None else '，记录已停止'
+                    print(f"[{session.name}] {rate:.1f} 样本/s，ADC {adc}，当前 {weight}，共 {count} 样本，"
+                          f"丢帧 {dropped}，校验错误 {session.collector.parser.checksum_errors}，"
+                          f"重连 {session.reconnects}{failed}")
+                last_status = now
+    finally:
+        for session in sessions:
+            session.close()
+        for session in sessions:
+            files = session.logger.files if session.logger is not None else []
+            print(f"[{session.name}] 已关闭，共 {session.collector.samples} 样本: {', '.join(files) or '无文件'}")
+            if session.logger is not None and session.logger.error is not None:
+                print(f"[{session.name}] 记录失败后丢弃 {session.logger.rows_dropped} 样本: {session.logger.error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面多秤记录程序")
+    parser.add_argument('devices', nargs='+', help='串口，格式 PORT 或 NAME=PORT')
+    parser.add_argument('-o', '--output', default='.', help='记录目录')
+    parser.add_argument('-f', '--format', choices=sorted(LOGGERS), default='csv', help='记录格式')
+    parser.add_argument('-b', '--baudrate', type=int, default=115200)
+    parser.add_argument('--rotate-minutes', type=float, default=60, help='按时间切分文件，0 为不切分')
+    parser.add_argument('--rotate-rows', type=int, default=0, help='按行数切分文件，0 为不切分')
+    parser.add_argument('--status', type=float, default=10, help='状态输出间隔（秒），0 为不输出')
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    sessions = []
+    for spec in args.devices:
+        name, port = parse_device(spec)
+        logger = RotatingLogger(args.output, name, args.format, args.rotate_minutes * 60, args.rotate_rows)
+        sessions.append(ScaleSession(name, port, logger, args.baudrate))
+    asyncio.run(record(sessions, args.status))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+记录回放：把 Test/*.csv 或 .wlog 记录当作秤的串口输出，写到 pty（或已有串口、文件），
+WeightMonitor / recorder 直接打开打印出的路径，和接真实的秤一样。
+
+    python replay.py Test/动态测试_pcb盒子.csv                    # 实时，文本行
+    python replay.py Test/动态测试_pcb盒子.csv --speed 20 --format frames
+    python replay.py logs/a.wlog --speed 0 -o /dev/ttyUSB1       # 尽快写完，写到已有串口
+
+输出与固件完全相同（文本行 "Weight: <重量> <序号> <ticks_us> <样本数>" 或 protocol.py 的二进制帧），
+ticks_us 取自记录时间（按 2**30 回绕），序号连续，所以上位机按设备时间算出的频率、
+消耗速率与记录时一致，不受回放倍速影响。CSV 没有原始计数，帧中的 raw1/raw2 为 0。
+写入阻塞时等待读端（不丢数据），--speed 0 的吞吐量因此就是上位机的处理能力。
+"""
+import argparse
+import os
+import pty
+import sys
+import time
+import tty
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project'))
+import binlog
+import protocol
+
+TICKS_MASK = (1 << 30) - 1
+# 固件文本模式每行平均的样本数（main.AVERAGE_TIMES），记录中没有 samples 列时使用
+AVERAGE_TIMES = 10
+
+
+def load(path):
+    """读取 CSV 或 .wlog，返回 binlog.SAMPLE_DTYPE 数组（缺的列为默认值）"""
+    if not os.path.isdir(path):
+        return binlog.read_csv(path)
+    columns = binlog.load(path)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    data = binlog.new_batch(rows)
+    for name, values in columns.items():
+        data[name] = values
+    return data
+
+
+def encode(data, fmt='text', seq=0, time_offset=0.0):
+    """
+    把记录编码成固件的串口输出，返回每个样本一条的 bytes 列表。
+
+    :param seq: 起始序号（循环回放时接着上一轮）
+    :param time_offset: 加到记录时间上的秒数，同上
+    """
+    times = data['time'] - data['time'][0] + time_offset
+    ticks = (np.round(times * 1e6).astype(np.int64) & TICKS_MASK).tolist()
+    weights = data['weight'].tolist()
+    records = []
+    if fmt == 'frames':
+        encoder = protocol.FrameEncoder()
+        encoder.seq = seq & 0xFFFF
+        for t, w, r1, r2 in zip(ticks, weights, data['raw1'].tolist(), data['raw2'].tolist()):
+            records.append(bytes(encoder.encode(t, r1, r2, w)))
+        return records
+    samples = data['samples'].tolist()
+    for i, (t, w, n) in enumerate(zip(ticks, weights, samples)):
+        records.append(b"Weight: %.2f %d %d %d\n" % (w, (seq + i) & 0xFFFF, t, n or AVERAGE_TIMES))
+    return records
+
+
+class Replayer:
+    def __init__(self, data, fmt='text', speed=1.0):
+        """
+        :param data: binlog.SAMPLE_DTYPE 数组（load() 的结果）
+        :param fmt: 'text' 或 'frames'
+        :param speed: 回放倍速，0 为尽快
+        """
+        self.data = data
+        self.fmt = fmt
+        self.speed = speed
+        self.duration = float(data['time'][-1] - data['time'][0]) if len(data) else 0.0
+        # 一轮的时长：最后一个样本之后再隔一个平均间隔开始下一轮
+        self.period = self.duration * len(data) / (len(data) - 1) if len(data) > 1 else 1.0
+        self.records = 0
+        self.bytes = 0
+        self.max_late = 0.0  # 最大的实际写出时刻晚于计划的秒数
+        self.started = None  # run() 开始的 perf_counter 时刻：设备时间 t 的样本计划在 started + t/speed 写出
+
+    def run(self, write, loops=1, seq=0, time_offset=0.0):
+        """
+        按记录时间把样本交给 write(bytes)；loops 为 0 时无限循环。
+        seq/time_offset 为起始序号与设备时间（秒），依次回放多个记录时接着上一个，上位机看到的是一次连续的会话。
+        """
+        start = self.started = time.perf_counter()
+        loop = 0
+        while not loops or loop < loops:
+            offset = loop * self.period
+            records = encode(self.data, self.fmt, seq + self.records, time_offset + offset)
+            if self.speed <= 0:
+                self._write(write, b''.join(records), len(records))
+            else:
+                due = (self.data['time'] - self.data['time'][0] + offset) / self.speed
+                for t, record in zip(due.tolist(), records):
+                    wait = start + t - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                    else:
+                        self.max_late = max(self.max_late, -wait)
+                    self._write(write, record, 1)
+            loop += 1
+        return time.perf_counter() - start
+
+    def _write(self, write, data, n):
+        write(data)
+        self.records += n
+        self.bytes += len(data)
+
+
+def open_pty():
+    """返回 (写入函数, 从端路径, 主端 fd)"""
+    master, slave = pty.openpty()
+    # 原始模式：帧里的 0x0A/0x0D 原样传输
+    tty.setraw(slave)
+    return _writer(master), os.ttyname(slave), master
+
+
+def _writer(fd):
+    def write(data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    return write
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('records', nargs='+', help='CSV 或 .wlog，多个时依次回放')
+    parser.add_argument('-o', '--output', help='写到已有串口/文件，"-" 为标准输出；缺省新建 pty')
+    parser.add_argument('--format', choices=('text', 'frames'), default='text')
+    parser.add_argument('--speed', type=float, default=1.0, help='回放倍速，0 为尽快')
+    parser.add_argument('--loops', type=int, default=1, help='回放轮数，0 为无限循环')
+    parser.add_argument('--no-wait', action='store_true', help='新建 pty 后不等回车直接开始')
+    args = parser.parse_args()
+
+    if args.output == '-':
+        write = _writer(sys.stdout.fileno())
+    elif args.output:
+        fd = os.open(args.output, os.O_WRONLY | os.O_NOCTTY | os.O_CREAT, 0o644)
+        write = _writer(fd)
+    else:
+        write, port, _ = open_pty()
+        print(f"虚拟串口 {port}", file=sys.stderr)
+        if not args.no_wait:
+            print("打开后按回车开始", file=sys.stderr)
+            input()
+
+    seq = 0
+    time_offset = 0.0
+    try:
+        for path in args.records:
+            replayer = Replayer(load(path), args.format, args.speed)
+            elapsed = replayer.run(write, args.loops, seq, time_offset)
+            seq += replayer.records
+            time_offset += replayer.period * args.loops
+            print(f"{os.path.basename(path)}: {replayer.records} 条 {replayer.bytes} 字节，"
+                  f"记录 {replayer.duration:.0f} s，用时 {elapsed:.2f} s，最大延迟 {replayer.max_late * 1000:.1f} ms",
+                  file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+串口数据 -> 样本批：不依赖 Qt，GUI 的 SerialReader 与无界面的 recorder 共用。
+"""
+import logging
+import time
+
+import binlog
+import protocol
+
+log = logging.getLogger(__name__)
+
+
+class SampleCollector:
+    def __init__(self, on_batch, batch_interval=0.05, max_batch=4096):
+        """
+        :param on_batch: 回调 on_batch(batch)，batch 为 binlog.SAMPLE_DTYPE 结构化数组（副本）
+        :param batch_interval: 两次回调的最小间隔（秒）
+        :param max_batch: 单批最大样本数，攒满立即回调
+        """
+        self.on_batch = on_batch
+        self.batch_interval = batch_interval
+        self.samples = 0
+        self._batch = binlog.new_batch(max_batch)
+        self._count = 0
+        self._last_emit = time.time()
+        # 文本行与二进制帧（固件 BINARY_OUTPUT 模式）自动识别
+        self.parser = protocol.StreamParser(self.handle_frame, self.handle_line)
+
+    def feed(self, data):
+        """送入串口读到的字节，到达批间隔时回调"""
+        self.parser.feed(data)
+        if time.time() - self._last_emit >= self.batch_interval:
+            self.flush()
+
+    def handle_line(self, raw_line):
+        # 格式为 "Weight: 123.45 [序号 ticks_us 样本数 [温度]]"；逐行输出只在 DEBUG 级别打开
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received line: %s", raw_line.decode('utf-8', errors='ignore'))
+        if raw_line.startswith(b"Weight:"):
+            fields = protocol.parse_weight_fields(raw_line)
+            if fields is None:
+                log.warning("Error parsing line: %r", raw_line)
+            else:
+                weight, seq, timestamp_us, samples, temp = fields
+                self.add_sample(weight, seq, timestamp_us, samples=samples, temp=temp)
+        elif raw_line.startswith(b"Stats:"):
+            # 固件的分段计时输出（串口发送 "stats" 命令或定期输出）
+            log.info("%s", raw_line.decode('utf-8', errors='ignore').rstrip())
+
+    def handle_frame(self, seq, timestamp_us, raw1, raw2, weight):
+        # 每帧是一对未平均的原始样本
+        self.add_sample(weight, seq, timestamp_us, raw1, raw2, samples=1)
+
+    def add_sample(self, weight, seq=-1, timestamp_us=0, raw1=0, raw2=0, samples=0, temp=protocol.NAN):
+        if self._count == len(self._batch):
+            self.flush()
+        self._batch[self._count] = (time.time(), seq, timestamp_us, samples, raw1, raw2, weight, weight, temp)
+        self._count += 1
+        self.samples += 1
+
+    def flush(self):
+        self._last_emit = time.time()
+        n = self._count
+        if not n:
+            return
+        self._count = 0
+        # 复制一份交给回调，缓冲区继续复用
+        self.on_batch(self._batch[:n].copy())
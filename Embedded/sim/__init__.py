@@ -0,0 +1,93 @@
+"""
+桌面仿真环境：在 CPython 上运行 Embedded/Project 下的 MicroPython 固件。
+
+用法::
+
+    import sim
+    board = sim.install()
+    sim.HX711Chip(board, dout=1, sck=2, source=lambda t: 100000)
+    fw = sim.load_firmware('main')
+
+重量信号与两片传感器模型见 signals.py，虚拟串口见 uart.py；
+sim.run()（runner.py）跑完整的固件主循环并统计吞吐量，命令行入口 ``python -m sim``。
+"""
+import builtins
+import importlib
+import os
+import sys
+
+from .board import Board
+from .clock import Clock, time_module
+from .hx711 import HX711Chip
+from .signals import Constant, Drift, LoadCells, Steps, Trace, Vibration
+from .uart import PtyUart, Uart
+from . import machine
+from . import micropython
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Project')
+
+board = None
+time = None
+
+
+def install(realtime=False):
+    """创建一块新的仿真板，并把 machine/micropython 替身注册到 sys.modules"""
+    global board, time
+    board = Board(Clock(realtime=realtime))
+    time = time_module(board.clock)
+    machine._bind(board)
+    sys.modules['machine'] = machine
+    sys.modules['micropython'] = micropython
+    # viper 代码里的 ptr32 是内建函数，这里以寄存器模型代替
+    builtins.ptr32 = machine.ptr32
+    return board
+
+
+def load_firmware(name='main', project_dir=PROJECT_DIR):
+    """
+    以仿真 time 模块重新导入固件模块。
+
+    导入期间临时把 sys.modules['time'] 换成仿真版本，固件里的 ``import time``
+    因此绑定到虚拟时钟；导入结束后恢复，宿主代码不受影响。
+    """
+    if board is None:
+        install()
+    if project_dir not in sys.path:
+        sys.path.insert(0, project_dir)
+    real_time = sys.modules['time']
+    sys.modules['time'] = time
+    try:
+        # 固件依赖的其他模块也要重新导入，才能绑定到这块板的时钟
+        for mod_name, mod in list(sys.modules.items()):
+            if os.path.dirname(getattr(mod, '__file__', None) or '') == project_dir:
+                del sys.modules[mod_name]
+        return importlib.import_module(name)
+    finally:
+        sys.modules['time'] = real_time
+
+
+class SerialInput:
+    """
+    串口输入替身，行为同 MicroPython 的 sys.stdin：无缓冲，按字符读取，可以注册到 select.poll。
+    宿主用 send() 写入命令，交给固件的 init_commands()。
+    """
+
+    def __init__(self):
+        self._read_fd, self._write_fd = os.pipe()
+
+    def fileno(self):
+        return self._read_fd
+
+    def read(self, n=1):
+        return os.read(self._read_fd, n).decode()
+
+    def send(self, text):
+        os.write(self._write_fd, text.encode())
+
+    def close(self):
+        for fd in (self._read_fd, self._write_fd):
+            os.close(fd)
+
+
+# runner 依赖上面的 install/load_firmware，放在最后导入
+from .runner import RunStats, run  # noqa: E402
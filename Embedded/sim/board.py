@@ -0,0 +1,66 @@
+"""
+仿真电路板：保存所有 GPIO 线路的电平、监听者与中断登记。
+"""
+from .clock import Clock
+
+IRQ_RISING = 1
+IRQ_FALLING = 2
+
+
+class Line:
+    """一根 GPIO 线路，可由固件（输出引脚）或外设模型驱动"""
+
+    def __init__(self, board, pin_id):
+        self.board = board
+        self.id = pin_id
+        self.level = 0
+        self.writes = 0  # 写入次数，基准测试用来统计引脚翻转开销
+        self.on_read = None  # 外设模型可挂接读取钩子（如忙等快进）
+        self._listeners = []
+        self._irq_pin = None
+        self._irq_handler = None
+        self._irq_trigger = 0
+
+    def listen(self, callback):
+        """电平变化时调用 callback(level)，外设模型用它感知时钟脉冲"""
+        self._listeners.append(callback)
+
+    def set_irq(self, pin, handler, trigger):
+        self._irq_pin = pin
+        self._irq_handler = handler
+        self._irq_trigger = trigger if handler is not None else 0
+
+    def write(self, level):
+        level = 1 if level else 0
+        self.writes += 1
+        old = self.level
+        if old == level:
+            return
+        self.level = level
+        for callback in self._listeners:
+            callback(level)
+        trigger = self._irq_trigger
+        if trigger:
+            if (level == 0 and trigger & IRQ_FALLING) or (level == 1 and trigger & IRQ_RISING):
+                self.board.clock.raise_irq(self._irq_handler, self._irq_pin)
+
+    def read(self):
+        return self.level
+
+
+class Board:
+    def __init__(self, clock=None):
+        self.clock = clock or Clock()
+        self.lines = {}
+        self.chips = []
+
+    def line(self, pin_id):
+        line = self.lines.get(pin_id)
+        if line is None:
+            line = Line(self, pin_id)
+            self.lines[pin_id] = line
+        return line
+
+    def attach(self, chip):
+        self.chips.append(chip)
+        return chip
@@ -0,0 +1,153 @@
+"""
+虚拟时钟与 MicroPython ``time`` 模块替身。
+
+默认工作在“快进”模式：固件中的 sleep 不真正休眠，而是把虚拟时间向前拨，
+CPU 实际消耗的时间仍然计入，因此可以比实时更快地跑完固件循环。
+硬件事件（如 HX711 转换完成）按到期时间排队，软中断（引脚中断、定时器回调）
+在固件下一次访问时间或引脚时分发，近似 MicroPython 在字节码间隙执行软中断的行为。
+"""
+import heapq
+import time as _time
+import types
+from collections import deque
+
+# MicroPython 的 ticks_ms/ticks_us 在 2**30 处回绕
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD >> 1
+
+
+class Clock:
+    def __init__(self, realtime=False):
+        """
+        :param realtime: True 时 sleep 真实休眠；False（默认）时跳过空闲时间
+        """
+        self.realtime = realtime
+        self._t0 = _time.perf_counter()
+        self._skipped_us = 0
+        self.advances = 0  # sleep/快进次数，用于识别忙等
+        self._events = []  # 硬件事件堆 (到期时间us, 序号, 回调)
+        self._seq = 0
+        self._pending = deque()  # 待分发的软中断 (handler, arg)
+        self.irq_enabled = True
+        self.in_irq = False
+
+    def now_us(self):
+        return int((_time.perf_counter() - self._t0) * 1000000) + self._skipped_us
+
+    def schedule(self, due_us, callback):
+        """登记一个硬件事件，到期后以 callback(due_us) 调用"""
+        self._seq += 1
+        heapq.heappush(self._events, (due_us, self._seq, callback))
+
+    def next_event_us(self):
+        return self._events[0][0] if self._events else None
+
+    def raise_irq(self, handler, arg):
+        """把软中断放入队列，等待下一次分发"""
+        self._pending.append((handler, arg))
+
+    def poll(self):
+        """执行所有已到期的硬件事件，并在允许时分发软中断"""
+        now = self.now_us()
+        events = self._events
+        while events and events[0][0] <= now:
+            due, _, callback = heapq.heappop(events)
+            callback(due)
+        if self._pending and self.irq_enabled and not self.in_irq:
+            self._dispatch()
+
+    def _dispatch(self):
+        self.in_irq = True
+        try:
+            pending = self._pending
+            while pending:
+                handler, arg = pending.popleft()
+                handler(arg)
+        finally:
+            self.in_irq = False
+
+    def advance_to(self, target_us):
+        """快进到 target_us，期间到期的事件按时间顺序执行"""
+        self.advances += 1
+        if self.realtime:
+            while True:
+                remaining = target_us - self.now_us()
+                if remaining <= 0:
+                    break
+                _time.sleep(remaining / 1000000)
+                self.poll()
+            self.poll()
+            return
+        while True:
+            due = self.next_event_us()
+            if due is None or due > target_us:
+                break
+            now = self.now_us()
+            if due > now:
+                self._skipped_us += due - now
+            self.poll()
+        now = self.now_us()
+        if target_us > now:
+            self._skipped_us += target_us - now
+        self.poll()
+
+    def sleep_us(self, us):
+        self.advance_to(self.now_us() + int(us))
+
+    def skip_to_next_event(self):
+        """忙等无事可做时直接跳到下一个硬件事件（仅快进模式）"""
+        due = self.next_event_us()
+        if self.realtime or due is None:
+            self.poll()
+        else:
+            self.advance_to(due)
+
+
+def ticks_diff(end, start):
+    return ((end - start + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def time_module(clock):
+    """构造一个绑定到 clock 的 MicroPython 风格 time 模块"""
+    mod = types.ModuleType('time')
+    epoch0 = _time.time()
+
+    def ticks_us():
+        clock.poll()
+        return clock.now_us() & TICKS_MAX
+
+    def ticks_ms():
+        clock.poll()
+        return (clock.now_us() // 1000) & TICKS_MAX
+
+    def sleep_us(us):
+        clock.sleep_us(us)
+
+    def sleep_ms(ms):
+        clock.sleep_us(ms * 1000)
+
+    def sleep(seconds):
+        clock.sleep_us(seconds * 1000000)
+
+    def time_():
+        return epoch0 + clock.now_us() / 1000000
+
+    mod.ticks_us = ticks_us
+    mod.ticks_ms = ticks_ms
+    mod.ticks_cpu = ticks_us
+    mod.ticks_diff = ticks_diff
+    mod.ticks_add = ticks_add
+    mod.sleep_us = sleep_us
+    mod.sleep_ms = sleep_ms
+    mod.sleep = sleep
+    mod.time = time_
+    mod.time_ns = lambda: int(time_() * 1000000000)
+    mod.localtime = lambda secs=None: _time.localtime(time_() if secs is None else secs)
+    mod.gmtime = lambda secs=None: _time.gmtime(time_() if secs is None else secs)
+    mod.mktime = _time.mktime
+    return mod
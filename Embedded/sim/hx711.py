@@ -0,0 +1,119 @@
+"""
+HX711 芯片行为模型。
+
+- 每个转换周期结束时 DOUT 拉低（下降沿），表示数据就绪；
+- PD_SCK 每个上升沿移出一位（高位在前），共 24 位补码；
+- 第 25 个脉冲把 DOUT 拉高，直到下一次转换完成；
+- 读取的脉冲总数（25/26/27）选择下一次转换的通道与增益（A128 / B32 / A64）；
+- RATE 引脚低电平 10 SPS、高电平 80 SPS；
+- 数据未被读走时新结果直接覆盖，DOUT 保持低电平，不会产生新的下降沿。
+"""
+
+# 一次读取的脉冲总数 -> 下一次转换的增益（32 为通道B）
+GAIN_BY_PULSES = {25: 128, 26: 32, 27: 64}
+# rate=None 时读完到下一个结果就绪的间隔（虚拟时间，快进跳过）：留给第 26、27 个脉冲，宿主偶尔卡顿也不会漏掉
+IMMEDIATE_DELAY_US = 10000
+
+
+class HX711Chip:
+    def __init__(self, board, dout, sck, source=None, rate=10, rate_pin=None, source_b=None):
+        """
+        :param board: sim.board.Board
+        :param dout: DOUT 引脚编号
+        :param sck: PD_SCK 引脚编号（多个芯片可以共用同一时钟线）
+        :param source: 调用 source(t_us) 返回通道A在增益128下的原始计数值（有符号整数），增益64时减半
+        :param rate: 输出速率（SPS）；None 表示读完立即有下一个数据，用于测量读取开销
+        :param rate_pin: RATE 引脚编号；给出时忽略 rate，每个周期按该引脚电平取 10/80 SPS
+        :param source_b: 通道B（增益32）的 source，缺省为通道A信号的 1/4
+        """
+        self.clock = board.clock
+        self.dout = board.line(dout)
+        self.sck = board.line(sck)
+        self.source = source or (lambda t_us: 0)
+        self.source_b = source_b
+        self.rate = rate
+        self.rate_line = board.line(rate_pin) if rate_pin is not None else None
+        self.gain = 128  # 上电默认通道A、增益128
+        self.last_pulses = 0  # 最近一次读取的脉冲总数
+        self.conversions = 0
+        self.reads = 0
+        self.last_read_us = 0  # 最近一次读完（第25个脉冲）的时刻
+        self._data = 0
+        self._ready = False
+        self._pulses = 0
+        self._idle_mark = -1
+        self.dout.write(1)
+        self.dout.on_read = self._on_dout_read
+        self.sck.listen(self._on_sck)
+        board.attach(self)
+        self._schedule_next(self.clock.now_us())
+
+    def current_rate(self):
+        if self.rate_line is not None:
+            return 80 if self.rate_line.level else 10
+        return self.rate
+
+    def _period_us(self):
+        return 1000000 // self.current_rate()
+
+    def _schedule_next(self, now_us):
+        if self.current_rate() is None:
+            self.clock.schedule(now_us + IMMEDIATE_DELAY_US, self._convert)
+        else:
+            self.clock.schedule(now_us + self._period_us(), self._convert)
+
+    def _sample(self, t_us):
+        gain = self.gain
+        if gain == 32:
+            if self.source_b is not None:
+                return int(self.source_b(t_us))
+            return int(self.source(t_us)) >> 2
+        value = int(self.source(t_us))
+        return value >> 1 if gain == 64 else value
+
+    def _convert(self, due_us):
+        self.conversions += 1
+        if self.current_rate() is not None:
+            self._schedule_next(due_us)
+        if 0 < self._pulses < 25:
+            # 正在移位，本次结果丢弃
+            return
+        self._data = self._sample(due_us) & 0xFFFFFF
+        self._pulses = 0
+        self._ready = True
+        self.dout.write(0)
+
+    def _on_sck(self, level):
+        if not level:
+            return
+        if not self._ready:
+            if self._pulses >= 25:
+                # 第 26、27 个脉冲：改选下一次转换的通道与增益
+                self._pulses += 1
+                self.last_pulses = self._pulses
+                self.gain = GAIN_BY_PULSES.get(self._pulses, self.gain)
+            return  # 数据未就绪时的其他脉冲不影响输出
+        self._pulses += 1
+        pulses = self._pulses
+        if pulses <= 24:
+            self.dout.write((self._data >> (24 - pulses)) & 1)
+        else:
+            self._ready = False
+            self.reads += 1
+            self.last_pulses = pulses
+            self.gain = GAIN_BY_PULSES[pulses]
+            self.last_read_us = self.clock.now_us()
+            self.dout.write(1)
+            if self.current_rate() is None:
+                self._schedule_next(self.clock.now_us())
+
+    def _on_dout_read(self):
+        """两次读到未就绪之间固件没有 sleep，视为忙等：快进模式下直接跳到下一个事件"""
+        clock = self.clock
+        if self._ready or not self.dout.level or clock.in_irq:
+            clock.poll()
+        elif self._idle_mark == clock.advances:
+            clock.skip_to_next_event()
+        else:
+            self._idle_mark = clock.advances
+            clock.poll()
@@ -0,0 +1,193 @@
+"""
+MicroPython ``machine`` 模块的桌面替身，引脚操作落到 sim.board 的线路上。
+"""
+from . import board as _board_mod
+
+_board = None
+
+
+def _bind(board):
+    global _board
+    _board = board
+
+
+def _current():
+    if _board is None:
+        raise RuntimeError("sim not installed, call sim.install() first")
+    return _board
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = _board_mod.IRQ_RISING
+    IRQ_FALLING = _board_mod.IRQ_FALLING
+
+    def __init__(self, pin_id, mode=-1, pull=-1, value=None):
+        board = _current()
+        self._clock = board.clock
+        self._line = board.line(pin_id)
+        self.id = pin_id
+        self.init(mode, pull, value)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.mode = mode
+        if pull == Pin.PULL_UP and not self._line.writes:
+            # 上拉且尚无驱动时默认读到高电平
+            self._line.level = 1
+        if value is not None:
+            self._line.write(value)
+
+    def value(self, v=None):
+        if v is None:
+            line = self._line
+            if line.on_read is None:
+                self._clock.poll()
+            else:
+                line.on_read()
+            return line.level
+        self._line.write(v)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def on(self):
+        self._line.write(1)
+
+    def off(self):
+        self._line.write(0)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._line.set_irq(self, handler, trigger)
+
+    def __repr__(self):
+        return "Pin(%s)" % (self.id,)
+
+
+# ESP32-C3 GPIO 寄存器模型，供固件的 viper 读取路径（ptr32）使用
+GPIO_BASE = 0x60004000
+GPIO_OUT_W1TS = GPIO_BASE + 0x08
+GPIO_OUT_W1TC = GPIO_BASE + 0x0C
+GPIO_IN = GPIO_BASE + 0x3C
+
+
+class _Ptr32:
+    """viper ``ptr32(地址)`` 的替身：按 32 位字下标读写寄存器，落到仿真线路上"""
+
+    def __init__(self, addr):
+        self.addr = addr
+
+    def __getitem__(self, index):
+        addr = self.addr + 4 * index
+        if addr != GPIO_IN:
+            raise ValueError("unsupported register read 0x%08x" % addr)
+        board = _current()
+        board.clock.poll()
+        bits = 0
+        for pin_id, line in board.lines.items():
+            if line.level and isinstance(pin_id, int) and pin_id < 32:
+                bits |= 1 << pin_id
+        return bits
+
+    def __setitem__(self, index, value):
+        addr = self.addr + 4 * index
+        if addr == GPIO_OUT_W1TS:
+            level = 1
+        elif addr == GPIO_OUT_W1TC:
+            level = 0
+        else:
+            raise ValueError("unsupported register write 0x%08x" % addr)
+        board = _current()
+        pin_id = 0
+        while value:
+            if value & 1:
+                board.line(pin_id).write(level)
+            value >>= 1
+            pin_id += 1
+
+
+def ptr32(target):
+    """整数地址返回寄存器视图；数组等缓冲区原样返回（下标读写语义相同）"""
+    if isinstance(target, int):
+        return _Ptr32(target)
+    return target
+
+
+class Timer:
+    """
+    硬件定时器：到期时间登记为时钟事件，回调按软中断分发（与 ESP32 移植相同，回调经 mp_sched_schedule 执行）。
+    周期按浮点累加，频率不整除 1 MHz 时长期平均仍准确。
+    """
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, timer_id=0, **kwargs):
+        self._clock = _current().clock
+        self.id = timer_id
+        self._generation = 0
+        self._callback = None
+        self.fired = 0  # 到期次数
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=-1, period=-1, callback=None):
+        self.deinit()
+        if freq > 0:
+            self._period_us = 1000000 / freq
+        elif period > 0:
+            self._period_us = period * 1000
+        else:
+            raise ValueError("freq or period must be given")
+        self._mode = mode
+        self._callback = callback
+        self._due = self._clock.now_us() + self._period_us
+        self._schedule(self._generation)
+
+    def _schedule(self, generation):
+        self._clock.schedule(int(self._due), lambda due_us: self._expire(generation))
+
+    def _expire(self, generation):
+        if generation != self._generation:
+            return  # deinit/重新 init 之前登记的事件
+        self.fired += 1
+        if self._callback is not None:
+            self._clock.raise_irq(self._callback, self)
+        if self._mode == Timer.PERIODIC:
+            self._due += self._period_us
+            self._schedule(generation)
+
+    def deinit(self):
+        # 已登记的事件留在堆里，到期时按代号识别后丢弃
+        self._generation += 1
+
+    def __repr__(self):
+        return "Timer(%s)" % (self.id,)
+
+
+def disable_irq():
+    clock = _current().clock
+    state = clock.irq_enabled
+    clock.irq_enabled = False
+    return state
+
+
+def enable_irq(state=True):
+    clock = _current().clock
+    clock.irq_enabled = state
+    clock.poll()
+
+
+def idle():
+    _current().clock.skip_to_next_event()
+
+
+def freq(hz=None):
+    return 160000000
+
+
+def reset():
+    raise SystemExit("machine.reset()")
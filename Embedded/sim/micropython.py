@@ -0,0 +1,28 @@
+"""
+MicroPython ``micropython`` 模块的桌面替身：代码发射器装饰器退化为普通 Python。
+"""
+from . import machine as _machine
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(func, arg):
+    _machine._current().clock.raise_irq(func, arg)
+
+
+def opt_level(level=None):
+    return 0
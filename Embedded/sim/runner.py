@@ -0,0 +1,135 @@
+"""
+在仿真板上跑完整的固件主循环，并统计吞吐量。
+
+    python -m sim --seconds 600 --weight 500 --vibration 2:0.8 --drift 2:240
+    python -m sim --trace Test/动态测试_pcb盒子.csv --rate 80 --binary --pty --realtime
+
+--pty 时打印虚拟串口的路径，WeightMonitor/recorder 直接打开它；
+默认快进运行（sleep 跳过、CPU 时间照算），--realtime 按真实时间运行，方便上位机界面观察。
+"""
+import argparse
+import contextlib
+import sys
+import time
+
+from . import install, load_firmware
+from .signals import Constant, Drift, LoadCells, Trace, Vibration
+from .uart import BAUDRATE, PtyUart, Uart
+
+
+class RunStats:
+    def __init__(self, virtual_s, wall_s, steps, chips, uart):
+        self.virtual_s = virtual_s
+        self.wall_s = wall_s
+        self.steps = steps
+        self.conversions = sum(chip.conversions for chip in chips)
+        self.reads = sum(chip.reads for chip in chips)
+        self.bytes = uart.written
+        self.dropped = uart.dropped
+
+    @property
+    def speedup(self):
+        """虚拟时间 / 墙钟时间，大于 1 即快于实时"""
+        return self.virtual_s / self.wall_s if self.wall_s else float('inf')
+
+    @property
+    def missed(self):
+        """芯片完成了转换、固件没有读走的次数（被下一次结果覆盖）"""
+        return self.conversions - self.reads
+
+    def summary(self):
+        return (f"虚拟 {self.virtual_s:.1f} s / 墙钟 {self.wall_s:.2f} s = {self.speedup:.1f}x，"
+                f"{self.steps / self.wall_s:.0f} step/s，"
+                f"转换 {self.conversions}、读取 {self.reads}（漏读 {self.missed}），"
+                f"输出 {self.bytes} 字节（{self.bytes / self.virtual_s:.0f} B/虚拟秒，丢弃 {self.dropped}）")
+
+
+def run(cells, seconds, rate=10, binary=False, uart=None, realtime=False, setup=None):
+    """
+    :param cells: sim.LoadCells，按固件默认接线挂两片 HX711
+    :param seconds: 运行的虚拟秒数
+    :param rate: HX711 输出速率（SPS）
+    :param binary: 固件的 BINARY_OUTPUT
+    :param uart: sim.Uart/PtyUart，固件的 print 与二进制帧都写到这里；缺省为按 115200 计时的 Uart
+    :param setup: 开始前调用 setup(fw)，修改固件配置
+    :return: (固件模块, RunStats)
+    """
+    board = install(realtime=realtime)
+    chips = cells.attach(board, rate=rate)
+    fw = load_firmware('main')
+    # 与传感器模型一致的标定，固件输出即为真实重量
+    fw.calib = fw.calibration.Calibration.from_dict(cells.calibration())
+    fw.BINARY_OUTPUT = binary
+    if uart is None:
+        uart = Uart()
+    uart.clock = board.clock
+    fw.serial_out = uart
+    if isinstance(uart, PtyUart):
+        fw.init_commands(uart)
+    if setup is not None:
+        setup(fw)
+
+    clock = board.clock
+    step = fw.step
+    steps = 0
+    wall0 = time.perf_counter()
+    start = clock.now_us()
+    end = start + int(seconds * 1000000)
+    with contextlib.redirect_stdout(uart):
+        for hx in fw.sensors:
+            hx.start()
+        while clock.now_us() < end:
+            step()
+            steps += 1
+    wall_s = time.perf_counter() - wall0
+    return fw, RunStats((clock.now_us() - start) / 1000000, wall_s, steps, chips, uart)
+
+
+def _pair(text):
+    a, b = text.split(':')
+    return float(a), float(b)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sim', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=60, help='运行的虚拟秒数')
+    parser.add_argument('--weight', type=float, default=500, help='秤盘上的重量（克）')
+    parser.add_argument('--trace', help='回放记录的 CSV 作为重量信号（代替 --weight）')
+    parser.add_argument('--trace-vibration', metavar='CSV', help='从记录中提取振动分量叠加上去')
+    parser.add_argument('--vibration', type=_pair, action='append', default=[], metavar='HZ:G',
+                        help='叠加正弦振动，可重复')
+    parser.add_argument('--drift', type=_pair, metavar='G:TAU', help='上电漂移：幅度（克）与时间常数（秒）')
+    parser.add_argument('--noise', type=float, default=30, help='每次转换的噪声（计数）')
+    parser.add_argument('--share', type=float, default=0.5, help='落在第一片传感器上的比例')
+    parser.add_argument('--rate', type=int, default=10, choices=(10, 80), help='HX711 输出速率')
+    parser.add_argument('--binary', action='store_true', help='二进制帧输出')
+    parser.add_argument('--baud', type=int, default=BAUDRATE, help='串口波特率，0 为不限速')
+    parser.add_argument('--pty', action='store_true', help='输出到虚拟串口（打印路径后等待回车再开始）')
+    parser.add_argument('--realtime', action='store_true', help='按真实时间运行')
+    args = parser.parse_args()
+
+    signal = Trace.from_csv(args.trace) if args.trace else Constant(args.weight)
+    if args.trace_vibration:
+        signal = signal + Vibration.from_trace(args.trace_vibration)
+    if args.vibration:
+        signal = signal + Vibration(args.vibration)
+    if args.drift:
+        signal = signal + Drift(*args.drift)
+    cells = LoadCells(signal, share=args.share, noise=args.noise)
+
+    if args.pty:
+        uart = PtyUart(baudrate=args.baud or None)
+        print(f"虚拟串口 {uart.port}，打开后按回车开始", file=sys.stderr)
+        input()
+    else:
+        uart = Uart(baudrate=args.baud or None, capture=False)
+    try:
+        _, stats = run(cells, args.seconds, args.rate, args.binary, uart, args.realtime)
+    finally:
+        uart.close()
+    print(stats.summary(), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+秤盘上的重量信号与称重传感器模型，给 HX711Chip 提供原始计数。
+
+重量信号是以秒为自变量、返回克的可调用对象，可以相加组合::
+
+    w = sim.Constant(500) + sim.Vibration([(2.0, 0.8)]) + sim.Drift(2.0, 240)
+    cells = sim.LoadCells(w)
+    cells.attach(board)                      # 按固件默认接线挂两片 HX711
+
+Trace.from_csv 回放 Test/ 下的记录，Vibration.from_trace 从记录中提取振动分量。
+记录约 1 秒一个点，只能看到 0.5 Hz 以下的扰动；更高频的振动（电机、风扇）用 Vibration 直接给出。
+"""
+import bisect
+import csv
+import math
+import random
+from datetime import datetime
+
+from .hx711 import HX711Chip
+
+
+class Signal:
+    def __call__(self, t):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Sum(self, other)
+
+
+class Sum(Signal):
+    def __init__(self, *parts):
+        self.parts = []
+        for part in parts:
+            # 展开嵌套的 Sum，求值时少一层调用
+            self.parts.extend(part.parts if isinstance(part, Sum) else (part,))
+
+    def __call__(self, t):
+        return sum(part(t) for part in self.parts)
+
+
+class Constant(Signal):
+    def __init__(self, weight):
+        self.weight = weight
+
+    def __call__(self, t):
+        return self.weight
+
+
+class Steps(Signal):
+    """分段常值：steps 为 [(起始秒, 重量), ...]，按时间升序；第一段之前为 0"""
+
+    def __init__(self, steps):
+        self.times = [t for t, _ in steps]
+        self.weights = [w for _, w in steps]
+
+    def __call__(self, t):
+        i = bisect.bisect_right(self.times, t)
+        return self.weights[i - 1] if i else 0.0
+
+
+class Vibration(Signal):
+    """正弦分量之和：components 为 [(频率Hz, 幅度g[, 相位rad]), ...]"""
+
+    def __init__(self, components):
+        self.components = [(2 * math.pi * c[0], c[1], c[2] if len(c) > 2 else 0.0) for c in components]
+
+    def __call__(self, t):
+        return sum(amp * math.sin(omega * t + phase) for omega, amp, phase in self.components)
+
+    @classmethod
+    def from_trace(cls, path, count=5, window=15):
+        """
+        从记录中提取最强的 count 个振动分量：先减去 window 点滑动中值（去掉放料、漂移等慢变化），
+        再对重采样到等间隔的残差做 DFT。
+        """
+        times, weights = _read_trace(path)
+        t, w = _resample(times, weights)
+        half = window // 2
+        residual = [w[i] - _median(w[max(0, i - half):i + half + 1]) for i in range(len(w))]
+        n = len(residual)
+        dt = t[1] - t[0] if n > 1 else 1.0
+        peaks = []
+        for k in range(1, n // 2):
+            re = sum(r * math.cos(2 * math.pi * k * i / n) for i, r in enumerate(residual))
+            im = -sum(r * math.sin(2 * math.pi * k * i / n) for i, r in enumerate(residual))
+            amp = 2 * math.hypot(re, im) / n
+            peaks.append((amp, k / (n * dt), math.atan2(im, re) + math.pi / 2))
+        peaks.sort(reverse=True)
+        return cls([(freq, amp, phase) for amp, freq, phase in peaks[:count]])
+
+
+class Drift(Signal):
+    """上电漂移：amplitude*(1 - exp(-t/tau)) + slope*t，与 Project/drift.py 的时间项同形"""
+
+    def __init__(self, amplitude=0.0, tau=300.0, slope=0.0):
+        self.amplitude = amplitude
+        self.tau = tau
+        self.slope = slope
+
+    def __call__(self, t):
+        return self.amplitude * (1 - math.exp(-t / self.tau)) + self.slope * t
+
+
+class Trace(Signal):
+    """按 (时间, 重量) 序列回放（线性插值），loop=True 时循环播放"""
+
+    def __init__(self, times, weights, loop=True, offset=0.0):
+        self.times = [x - times[0] for x in times]
+        self.weights = list(weights)
+        self.duration = self.times[-1]
+        self.loop = loop
+        self.offset = offset
+
+    def __call__(self, t):
+        if self.loop and self.duration > 0:
+            t %= self.duration
+        times = self.times
+        i = bisect.bisect_right(times, t)
+        if i == 0:
+            return self.weights[0] + self.offset
+        if i == len(times):
+            return self.weights[-1] + self.offset
+        t0, t1 = times[i - 1], times[i]
+        w0, w1 = self.weights[i - 1], self.weights[i]
+        w = w0 if t1 == t0 else w0 + (w1 - w0) * (t - t0) / (t1 - t0)
+        return w + self.offset
+
+    @classmethod
+    def from_csv(cls, path, loop=True, offset=0.0):
+        """WeightMonitor 记录的 CSV（如 Test/ 下的文件）"""
+        times, weights = _read_trace(path)
+        return cls(times, weights, loop, offset)
+
+
+class LoadCells:
+    """
+    两片称重传感器：重量按 share 分到两片上（share 可以是随时间变化的信号），
+    各自按增益、零点换算成 HX711 增益 128 下的计数，并加上高斯噪声。
+    """
+
+    def __init__(self, weight, gains=(400.0, 397.0), offsets=(152000, -48000), share=0.5, noise=30, seed=0):
+        """
+        :param weight: 重量信号（克），也可以是常数
+        :param gains: 每克对应的计数
+        :param offsets: 空载读数
+        :param share: 落在第一片上的比例
+        :param noise: 每次转换的噪声标准差（计数）
+        """
+        self.weight = weight if callable(weight) else Constant(weight)
+        self.gains = gains
+        self.offsets = offsets
+        self.share = share if callable(share) else Constant(share)
+        self.noise = noise
+        self.rng = random.Random(seed)
+
+    def counts(self, cell, t_us):
+        t = t_us / 1000000
+        w = self.weight(t)
+        p = self.share(t)
+        part = w * p if cell == 0 else w * (1 - p)
+        value = self.offsets[cell] + self.gains[cell] * part
+        if self.noise:
+            value += self.rng.gauss(0, self.noise)
+        # 24 位补码的量程
+        return max(-0x800000, min(0x7FFFFF, int(value)))
+
+    def source(self, cell):
+        return lambda t_us: self.counts(cell, t_us)
+
+    def calibration(self, norm=100000):
+        """与本模型一致的 calib.json 内容（Project/calibration.py 格式），固件输出即为真实重量"""
+        # 固件读数是偏移二进制（count ^ 0x800000），比补码值大 2**23
+        return {
+            'coeffs': [0.0, norm / self.gains[0], norm / self.gains[1]],
+            'ref': [offset + 0x800000 for offset in self.offsets],
+            'norm': norm,
+        }
+
+    def attach(self, board, pins=((1, 2), (8, 9)), rate=10, rate_pin=None):
+        """按固件的接线挂两片 HX711，返回两个 HX711Chip"""
+        return tuple(HX711Chip(board, dout, sck, self.source(cell), rate=rate, rate_pin=rate_pin)
+                     for cell, (dout, sck) in enumerate(pins))
+
+
+def _read_trace(path):
+    times = []
+    weights = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            times.append(datetime.strptime(row[0].strip(), '%Y-%m-%d %H:%M:%S').timestamp())
+            weights.append(float(row[1]))
+    return times, weights
+
+
+def _resample(times, weights):
+    # 记录的时间戳只到秒且间隔不匀，按平均间隔重采样
+    n = len(times)
+    dt = (times[-1] - times[0]) / (n - 1) if n > 1 else 1.0
+    trace = Trace(times, weights, loop=False)
+    t = [i * dt for i in range(n)]
+    return t, [trace(x) for x in t]
+
+
+def _median(values):
+    s = sorted(values)
+    n = len(s)
+    return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2
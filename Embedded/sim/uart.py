@@ -0,0 +1,121 @@
+"""
+虚拟串口。
+
+Uart 按波特率给发送计时：每字节 10 位（8N1），发送缓冲满了写入会阻塞到虚拟时钟走过足够的时间，
+与 MicroPython 的 UART/USB-CDC 写满缓冲时的行为一致，固件的输出开销因此能反映串口带宽。
+发出的字节保存在 output 中供检查。
+
+PtyUart 把固件一侧的读写落到 pty 主端，上位机程序（WeightMonitor、recorder）打开从端 port，
+和打开真实的 /dev/ttyUSB0 一样；从端的输入作为串口命令交给固件。
+没有程序在读从端时数据直接丢弃（计入 dropped），不会卡住仿真。
+"""
+import errno
+import os
+import pty
+import tty
+
+# 固件串口（ESP32-C3 USB-CDC / UART0）的默认参数
+BAUDRATE = 115200
+TX_BUFFER = 256
+
+
+class Uart:
+    def __init__(self, clock=None, baudrate=BAUDRATE, tx_buffer=TX_BUFFER, capture=True):
+        """
+        :param clock: sim.clock.Clock；可以之后再赋值（sim.run 在装好仿真板后绑定）
+        :param baudrate: 波特率；None 表示不限速
+        :param tx_buffer: 发送缓冲（字节），超出部分按波特率阻塞
+        :param capture: 是否把发出的字节保存到 output
+        """
+        self.clock = clock
+        self.baudrate = baudrate
+        self.tx_buffer = tx_buffer
+        self.output = bytearray() if capture else None
+        self.written = 0
+        self.dropped = 0
+        self._tx_done_us = 0  # 发送缓冲排空的虚拟时刻
+
+    def write(self, data):
+        # print() 写入 str，serial_out.write() 写入 bytes
+        if isinstance(data, str):
+            data = data.encode()
+        n = len(data)
+        if self.baudrate:
+            self._pace(n)
+        self.written += n
+        self._send(data)
+        return n
+
+    def _send(self, data):
+        if self.output is not None:
+            self.output += data
+
+    def _pace(self, n):
+        clock = self.clock
+        now = clock.now_us()
+        byte_us = 10000000 / self.baudrate
+        start = max(now, self._tx_done_us)
+        self._tx_done_us = start + n * byte_us
+        wait = self._tx_done_us - self.tx_buffer * byte_us - now
+        if wait > 0:
+            clock.sleep_us(wait)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PtyUart(Uart):
+    def __init__(self, clock=None, baudrate=BAUDRATE, tx_buffer=TX_BUFFER, capture=False):
+        super().__init__(clock, baudrate, tx_buffer, capture)
+        self.master, self.slave = pty.openpty()
+        # 原始模式：不做换行转换与回显，帧里的 0x0A/0x0D 原样传输
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        os.set_blocking(self.slave, False)  # 只影响本进程的 host_read，pyserial 打开 port 是另一个描述符
+        self.port = os.ttyname(self.slave)
+
+    def _send(self, data):
+        super()._send(data)
+        view = memoryview(data)
+        while view:
+            try:
+                sent = os.write(self.master, view)
+            except OSError as e:
+                if e.errno not in (errno.EAGAIN, errno.EIO):
+                    raise
+                # 没人读从端、内核缓冲已满：丢弃，同真实串口没接上位机时一样
+                self.dropped += len(view)
+                return
+            view = view[sent:]
+
+    # 命令输入：接口同 sim.SerialInput，交给固件的 init_commands()
+
+    def fileno(self):
+        return self.master
+
+    def read(self, n=1):
+        try:
+            return os.read(self.master, n).decode(errors='replace')
+        except OSError:
+            return ''
+
+    # 上位机一侧：测试代码不开 pyserial 时直接读写从端
+
+    def host_read(self, n=4096):
+        try:
+            return os.read(self.slave, n)
+        except BlockingIOError:
+            return b''
+
+    def host_write(self, data):
+        return os.write(self.slave, data)
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
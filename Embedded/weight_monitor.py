@@ -1,9 +1,21 @@
+import logging
+import os
 import sys
 import serial
 import serial.tools.list_ports
 import time
-import csv
-from collections import deque
+
+import numpy as np
+
+# 与固件共用的模块（滤波器等）放在 Project 目录下
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project'))
+import filters
+from estimator import ConsumptionEstimator
+from link_stats import LinkStats
+from plot_buffer import PlotBuffer, decimate_view
+from csv_logger import CsvLogger
+from sample_source import SampleCollector
+import binlog
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
@@ -12,54 +24,78 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QThread, pyqtSignal, QTimer
 import pyqtgraph as pg
 
+log = logging.getLogger(__name__)
+
+# 显示用的滤波选项，CSV 始终记录收到的原始值（.wlog 两者都记录）
+FILTER_OPTIONS = {
+    "无": lambda: filters.FilterChain(),
+    "中值": lambda: filters.FilterChain(filters.MovingMedian(5)),
+    "低通": lambda: filters.FilterChain(filters.LowPass(0.1, 1.0)),
+    "卡尔曼": lambda: filters.FilterChain(filters.Kalman(0.01, 4.0)),
+    "中值+卡尔曼": lambda: filters.FilterChain(filters.MovingMedian(5), filters.Kalman(0.01, 4.0)),
+}
+# 默认不再滤波：设备输出已经过中值滤波；卡尔曼在换料盘等阶跃时滞后明显，需要时手动选择
+DEFAULT_FILTER = "无"
+
+
+def format_minutes(minutes):
+    if minutes == float('inf'):
+        return "∞"
+    hours, mins = divmod(int(minutes), 60)
+    return f"{hours}:{mins:02d}"
 
-class SerialReader(QThread):
-    data_received = pyqtSignal(float)
 
-    def __init__(self, port, baudrate=115200):
+class SerialReader(QThread):
+    # 一批样本：binlog.SAMPLE_DTYPE 结构化数组
+    batch_received = pyqtSignal(object)
+
+    def __init__(self, port, baudrate=115200, batch_interval=0.05, max_batch=4096):
+        """
+        :param batch_interval: 两次发送批数据的最小间隔（秒），限制跨线程信号的频率
+        :param max_batch: 单批最大样本数，攒满立即发送
+        """
         super().__init__()
         self.port = port
         self.baudrate = baudrate
         self.running = True
         self.ser = None
+        self.collector = SampleCollector(self.batch_received.emit, batch_interval, max_batch)
 
     def run(self):
+        collector = self.collector
         try:
-            self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-            print(f"Opened serial port: {self.port} at {self.baudrate} baud.")
+            # 读超时取批间隔：无数据时最多这么久醒来一次，把已攒的样本发出并检查停止标志
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=collector.batch_interval)
+            log.info("Opened serial port: %s at %d baud.", self.port, self.baudrate)
         except serial.SerialException as e:
-            print(f"Error opening serial port: {e}")
+            log.error("Error opening serial port: %s", e)
             return
 
+        ser = self.ser
         while self.running:
             try:
-                if self.ser.in_waiting:
-                    line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    # 假设每行数据格式为 "Weight: 123.45"
-                    print(f"Received line: {line}")
-                    if line.startswith("Weight:"):
-                        try:
-                            weight_str = line.split(":")[1].strip()
-                            weight = float(weight_str)
-                            self.data_received.emit(weight)
-                        except (IndexError, ValueError) as e:
-                            print(f"Error parsing line: '{line}' - {e}")
-                else:
-                    time.sleep(0.01)
+                # 阻塞到至少 1 字节到达（或超时），再把已到达的全部读出
+                collector.feed(ser.read(ser.in_waiting or 1))
             except serial.SerialException as e:
-                print(f"Serial exception: {e}")
+                log.error("Serial exception: %s", e)
                 break
+        collector.flush()
 
-        if self.ser and self.ser.is_open:
-            self.ser.close()
-            print(f"Closed serial port: {self.port}")
+        if ser.is_open:
+            ser.close()
+            log.info("Closed serial port: %s", self.port)
 
     def stop(self):
         self.running = False
+        if self.ser is not None and hasattr(self.ser, 'cancel_read'):
+            self.ser.cancel_read()  # 立即唤醒阻塞中的 read（POSIX）
         self.wait()
 
 
 class WeightMonitor(QWidget):
+    HISTORY_POINTS = 1 << 20
+    PLOT_FPS = 20  # 绘图刷新帧率上限，与数据到达速率无关
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("重量监测系统")
@@ -68,27 +104,30 @@ class WeightMonitor(QWidget):
         # 初始化UI组件
         self.init_ui()
 
-        # 数据存储
-        self.weight_data = deque(maxlen=6000)  # 存储最近100分钟的数据，假设每秒采样一次
-        self.time_data = deque(maxlen=6000)
+        # 数据存储：第0列为时间（分钟），第1列为重量；80 SPS 下约可保存3.5小时
+        self.plot_data = PlotBuffer(self.HISTORY_POINTS)
         self.start_time = time.time()
-        self.last_time = self.start_time
-        self.interval_times = deque(maxlen=100)  # 用于计算读取频率
+        # 按设备序号/时间戳统计输出频率、采样率、抖动与丢帧
+        self.link_stats = LinkStats()
+        # 基于滤波后重量的消耗速率/剩余时间估计（10分钟窗口）
+        self.estimator = ConsumptionEstimator(window=600, interval=1.0)
 
         # 串口线程
         self.serial_thread = None
 
-        # 读取频率与采样频率参数
-        self.samples_per_read = 100  # 每次读取的样本数，基于微控制器的read_average(times=10)
+        # 定时刷新绘图，有新数据时才重绘
+        self.plot_dirty = False
+        self.plot_timer = QTimer()
+        self.plot_timer.timeout.connect(self.refresh_plot)
+        self.plot_timer.start(int(1000 / self.PLOT_FPS))
 
         # 定时器用于更新读取频率和采样频率
         self.freq_timer = QTimer()
         self.freq_timer.timeout.connect(self.update_frequencies)
         self.freq_timer.start(1000)  # 每秒更新一次频率
 
-        # 初始化CSV记录
-        self.csv_file = None
-        self.csv_writer = None
+        # 初始化CSV记录（后台线程写盘）
+        self.logger = None
         self.init_csv()
 
     def init_ui(self):
@@ -102,11 +141,18 @@ class WeightMonitor(QWidget):
         self.refresh_button.clicked.connect(self.refresh_ports)
         self.connect_button = QPushButton("连接")
         self.connect_button.clicked.connect(self.connect_serial)
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItems(list(FILTER_OPTIONS))
+        self.filter_combo.setCurrentText(DEFAULT_FILTER)
+        self.filter_combo.currentTextChanged.connect(self.set_filter)
+        self.set_filter(self.filter_combo.currentText())
 
         port_layout.addWidget(QLabel("串口:"))
         port_layout.addWidget(self.port_combo)
         port_layout.addWidget(self.refresh_button)
         port_layout.addWidget(self.connect_button)
+        port_layout.addWidget(QLabel("滤波:"))
+        port_layout.addWidget(self.filter_combo)
 
         layout.addLayout(port_layout)
 
@@ -115,16 +161,26 @@ class WeightMonitor(QWidget):
         self.weight_label = QLabel("当前重量: -- g")
         self.read_freq_label = QLabel("读取频率: -- 次/秒")
         self.sampling_freq_label = QLabel("采样频率: -- Hz")
+        self.link_label = QLabel("抖动: --  丢帧: 0")
+        self.consumption_label = QLabel("消耗速率: -- g/min")
+        self.remaining_label = QLabel("剩余时间: --")
         display_layout.addWidget(self.weight_label)
         display_layout.addWidget(self.read_freq_label)
         display_layout.addWidget(self.sampling_freq_label)
+        display_layout.addWidget(self.link_label)
         layout.addLayout(display_layout)
+        estimate_layout = QHBoxLayout()
+        estimate_layout.addWidget(self.consumption_label)
+        estimate_layout.addWidget(self.remaining_label)
+        layout.addLayout(estimate_layout)
 
         # 绘图区域
         self.plot_widget = pg.PlotWidget(title="重量随时间变化")
         self.plot_widget.setLabel('left', '重量 (g)')
         self.plot_widget.setLabel('bottom', '时间 (分钟)')
         self.plot_curve = self.plot_widget.plot([], [], pen=pg.mkPen('b', width=2))
+        self.plot_widget.enableAutoRange()
+        self.plot_widget.getPlotItem().getViewBox().sigXRangeChanged.connect(self.on_view_changed)
         layout.addWidget(self.plot_widget)
 
         self.setLayout(layout)
@@ -135,6 +191,9 @@ class WeightMonitor(QWidget):
         for port in ports:
             self.port_combo.addItem(port.device)
 
+    def set_filter(self, name):
+        self.weight_filter = FILTER_OPTIONS[name]()
+
     def connect_serial(self):
         if self.serial_thread and self.serial_thread.isRunning():
             # 断开连接
@@ -149,90 +208,125 @@ class WeightMonitor(QWidget):
             if not selected_port:
                 QMessageBox.warning(self, "警告", "请选择一个串口。")
                 return
+            self.estimator.reset()
+            self.link_stats.reset()
             self.serial_thread = SerialReader(selected_port)
-            self.serial_thread.data_received.connect(self.handle_data)
+            self.serial_thread.batch_received.connect(self.handle_batch)
             self.serial_thread.start()
             self.connect_button.setText("断开")
             QMessageBox.information(self, "信息", f"已连接到串口 {selected_port}。")
             self.init_csv()  # 初始化CSV记录
 
-    def handle_data(self, weight):
-        current_time = time.time()
-        elapsed_time = current_time - self.start_time
-        elapsed_minutes = elapsed_time / 60.0
-        self.weight_data.append(weight)
-        self.time_data.append(elapsed_minutes)
-        self.interval_times.append(current_time - self.last_time)
-        self.last_time = current_time
+    def handle_batch(self, batch):
+        times = batch['time']
+        # 逐样本滤波（滤波器有状态），其余按整批处理
+        update = self.weight_filter.update
+        filtered = np.fromiter((update(w) for w in batch['weight'].tolist()), dtype=float, count=len(batch))
+        batch['filtered'] = filtered
+        update = self.estimator.update
+        for t, w in zip(times.tolist(), filtered.tolist()):
+            update(t, w)
+        self.plot_data.extend((times - self.start_time) / 60.0, filtered)
+        self.link_stats.update(batch)
 
         # 更新重量显示
-        self.weight_label.setText(f"当前重量: {weight:.2f} g")
+        self.weight_label.setText(f"当前重量: {filtered[-1]:.2f} g")
+
+        # 绘图由 plot_timer 按帧率刷新
+        self.plot_dirty = True
 
-        # 更新绘图
-        self.update_plot()
+        # 写入记录文件
+        self.write_csv(batch)
 
-        # 写入CSV
-        self.write_csv(current_time, weight)
+    def refresh_plot(self):
+        if self.plot_dirty:
+            self.plot_dirty = False
+            self.update_plot()
+
+    def on_view_changed(self, view, _range):
+        # 手动缩放/平移后按新的可见范围重新降采样；自动跟随数据时由新数据触发重绘
+        if not view.autoRangeEnabled()[0]:
+            self.plot_dirty = True
 
     def update_plot(self):
-        if not self.time_data:
+        if not len(self.plot_data):
             return
-        times = list(self.time_data)
-        weights = list(self.weight_data)
+        # 按绘图区像素宽度做最大/最小值降采样，点数与历史长度无关；
+        # 手动缩放后只对可见时间段降采样，放大时细节不丢
+        view = self.plot_widget.getPlotItem().getViewBox()
+        x_range = None if view.autoRangeEnabled()[0] else view.viewRange()[0]
+        times, weights = decimate_view(self.plot_data.column(0), self.plot_data.column(1), x_range,
+                                       max(int(view.width()), 100))
         self.plot_curve.setData(times, weights)
-        self.plot_widget.enableAutoRange()
 
-    def update_frequencies(self):
-        # 计算读取频率
-        if not self.interval_times:
-            self.read_freq_label.setText("读取频率: -- 次/秒")
-            self.sampling_freq_label.setText("采样频率: -- Hz")
+    def update_estimate(self):
+        result = self.estimator.estimate()
+        if result is None:
+            self.consumption_label.setText("消耗速率: -- g/min")
+            self.remaining_label.setText("剩余时间: --")
             return
-        avg_interval = sum(self.interval_times) / len(self.interval_times)
-        if avg_interval > 0:
-            read_freq = 1.0 / avg_interval
-            self.read_freq_label.setText(f"读取频率: {read_freq:.2f} 次/秒")
-            # 计算采样频率
-            sampling_freq = read_freq * self.samples_per_read
-            self.sampling_freq_label.setText(f"采样频率: {sampling_freq:.2f} Hz")
+        rate, ci, remaining, tte, tte_low, tte_high = result
+        self.consumption_label.setText(f"消耗速率: {rate:.2f} ± {ci:.2f} g/min")
+        if tte == float('inf'):
+            self.remaining_label.setText(f"剩余 {remaining:.0f} g，未检测到消耗")
         else:
+            self.remaining_label.setText(
+                f"剩余时间: {format_minutes(tte)}（{format_minutes(tte_low)} ~ {format_minutes(tte_high)}）")
+
+    def update_frequencies(self):
+        self.update_estimate()
+        frame_rate, adc_rate, device_jitter, serial_jitter, dropped = self.link_stats.report()
+        # 输出频率：设备每秒发出的重量行/帧数；采样频率：每通道 ADC 转换速率
+        if frame_rate is None:
             self.read_freq_label.setText("读取频率: -- 次/秒")
+        else:
+            self.read_freq_label.setText(f"读取频率: {frame_rate:.2f} 次/秒")
+        if adc_rate is None:
             self.sampling_freq_label.setText("采样频率: -- Hz")
+        else:
+            self.sampling_freq_label.setText(f"采样频率: {adc_rate:.2f} Hz")
+        if device_jitter is None:
+            self.link_label.setText(f"抖动: --  丢帧: {dropped}")
+        else:
+            self.link_label.setText(
+                f"抖动: 设备 {device_jitter:.2f} ms / 串口 {serial_jitter:.2f} ms  丢帧: {dropped}")
 
     def init_csv(self):
-        if self.csv_file is not None:
+        if self.logger is not None:
             return  # 已经初始化
         # 选择保存CSV的位置
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "保存CSV文件", "", "CSV Files (*.csv);;All Files (*)", options=options)
+            self, "保存记录文件", "",
+            "CSV Files (*.csv);;Binary Log (*.wlog);;All Files (*)", options=options)
         if file_path:
             try:
-                self.csv_file = open(file_path, 'w', newline='', encoding='utf-8')
-                self.csv_writer = csv.writer(self.csv_file)
-                self.csv_writer.writerow(['Timestamp', 'Weight(g)'])
+                # .wlog 为列式二进制日志（含序号、原始计数、滤波值），其余按CSV记录
+                if file_path.endswith('.wlog'):
+                    self.logger = binlog.BinLogger(file_path)
+                else:
+                    self.logger = CsvLogger(file_path)
                 print(f"CSV记录已初始化，文件: {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"无法创建CSV文件: {e}")
-                self.csv_file = None
-                self.csv_writer = None
+                self.logger = None
         else:
             QMessageBox.warning(self, "警告", "未选择CSV文件，将不会记录数据。")
 
-    def write_csv(self, timestamp, weight):
-        if self.csv_writer:
-            # 格式化时间为可读格式
-            time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
-            self.csv_writer.writerow([time_str, f"{weight:.2f}"])
-            self.csv_file.flush()  # 确保数据写入文件
+    def write_csv(self, batch):
+        if self.logger:
+            # 只入队，格式化和写盘在后台线程；后台线程写入失败后停止记录并提示
+            if not self.logger.write(batch):
+                error = self.logger.error or "后台写入线程已退出"
+                self.close_csv()
+                QMessageBox.critical(self, "错误", f"写入记录文件失败，已停止记录: {error}")
 
     def close_csv(self):
-        if self.csv_file:
-            self.csv_file.close()
-            print("CSV记录已关闭。")
-            self.csv_file = None
-            self.csv_writer = None
+        if self.logger:
+            self.logger.close()  # 等待剩余数据写完并刷新
+            print("记录文件已关闭。")
+            self.logger = None
 
     def closeEvent(self, event):
         if self.serial_thread and self.serial_thread.isRunning():
@@ -242,6 +336,9 @@ class WeightMonitor(QWidget):
 
 
 def main():
+    # --debug 打开逐行输出
+    logging.basicConfig(level=logging.DEBUG if '--debug' in sys.argv else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     app = QApplication(sys.argv)
     monitor = WeightMonitor()
     monitor.show()